@@ -1,12 +1,15 @@
 """Benchmark device-to-subscriber latency for CereLinkSignalSource.
 
-Requires a running Blackrock device or nPlayServer.
+Requires a running Blackrock device or nPlayServer, or ``--fake-channels N``
+for an in-process FakeSession with N channels at 30 kHz.
 Collects latency statistics and optionally plots a histogram.
 
 Usage:
     python examples/latency_bench.py [--device-type NPLAY] [--n-messages 10000]
+    python examples/latency_bench.py --fake-channels 1024 [--fake-loss 0.001] [--fake-drift-ppm 20]
 """
 
+import contextlib
 import json
 import tempfile
 import time
@@ -24,6 +27,7 @@ from pycbsdk import DeviceType, SampleRate
 from typing_extensions import Annotated
 
 from ezmsg.blackrock.cerelink import CereLinkSignalSettings, CereLinkSignalSource, SliceConfig
+from ezmsg.blackrock.fake import fake_sessions
 
 
 class _LatencyEncoder(mc.MessageEncoder):
@@ -50,6 +54,18 @@ def main(
         int,
         typer.Option(help="Messages to skip at the start (warm-up)."),
     ] = 3_000,
+    fake_channels: Annotated[
+        int,
+        typer.Option(help="Use an in-process FakeSession with this many channels (0 = real device)."),
+    ] = 0,
+    fake_loss: Annotated[
+        float,
+        typer.Option(help="FakeSession: probability that a batch is lost."),
+    ] = 0.0,
+    fake_drift_ppm: Annotated[
+        float,
+        typer.Option(help="FakeSession: device clock drift in parts per million."),
+    ] = 0.0,
 ):
     original_log_object = ml.log_object
     ml.log_object = _log_object
@@ -74,7 +90,13 @@ def main(
             (comps["SOURCE"].OUTPUT_SIGNAL, comps["LOGGER"].INPUT_MESSAGE),
             (comps["LOGGER"].OUTPUT_MESSAGE, comps["TERM"].INPUT_MESSAGE),
         )
-        ez.run(components=comps, connections=conns)
+        if fake_channels:
+            # The fake is installed in this process, so the source must run here too.
+            fake = fake_sessions(n_channels=fake_channels, packet_loss=fake_loss, drift_ppm=fake_drift_ppm)
+        else:
+            fake = contextlib.nullcontext()
+        with fake:
+            ez.run(components=comps, connections=conns, force_single_process=bool(fake_channels))
 
         # Parse log
         log_data = []
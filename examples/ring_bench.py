@@ -0,0 +1,63 @@
+"""Microbenchmark for the SPSCRing between a producer and a consumer thread.
+
+Mimics the CereLink hand-off: a "receive" thread commits fixed-size int16
+batches with uint64 timestamps while a consumer thread bulk-reads everything
+committed. No device is required.
+
+Usage:
+    python examples/ring_bench.py [--n-ch 256] [--batch 30] [--seconds 5]
+"""
+
+import threading
+import time
+
+import numpy as np
+import typer
+from typing_extensions import Annotated
+
+from ezmsg.blackrock.buffers import OverflowPolicy, SPSCRing
+
+
+def main(
+    n_ch: Annotated[int, typer.Option(help="Channels per sample.")] = 256,
+    batch: Annotated[int, typer.Option(help="Samples per producer batch.")] = 30,
+    capacity: Annotated[int, typer.Option(help="Ring capacity in samples.")] = 30_000,
+    seconds: Annotated[float, typer.Option(help="Benchmark duration.")] = 5.0,
+    policy: Annotated[str, typer.Option(help="Overflow policy: DROP_OLDEST, GROW, ERROR.")] = "DROP_OLDEST",
+):
+    ring = SPSCRing(capacity, [((n_ch,), np.int16), ((), np.uint64)], policy=OverflowPolicy[policy.upper()])
+    samples = np.random.randint(-1000, 1000, size=(batch, n_ch), dtype=np.int16)
+    timestamps = np.arange(batch, dtype=np.uint64)
+    stop = threading.Event()
+    written = [0]
+    read = [0, 0]  # rows, reads
+
+    def produce():
+        while not stop.is_set():
+            written[0] += ring.write(samples, timestamps)
+
+    def consume():
+        while not stop.is_set() or len(ring):
+            got = ring.read()
+            if got is not None:
+                read[0] += len(got.columns[1])
+                read[1] += 1
+
+    threads = [threading.Thread(target=produce), threading.Thread(target=consume)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    mb = written[0] * n_ch * 2 / 1e6
+    print(f"Produced {written[0]:,} samples ({mb / elapsed:.1f} MB/s, {written[0] / elapsed / 1e6:.2f} Msamples/s)")
+    print(f"Consumed {read[0]:,} samples in {read[1]:,} reads ({read[0] / max(read[1], 1):.1f} samples/read)")
+    print(f"Overruns: {ring.overruns:,}; dropped: {ring.dropped:,}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
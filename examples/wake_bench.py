@@ -0,0 +1,82 @@
+"""Event-loop cost of receive-thread wake-ups, with and without coalescing.
+
+A "receive" thread delivers SR_RAW-like traffic (one callback per 30 kHz
+sample, in bursts every millisecond) and wakes an asyncio consumer after
+each callback, either with a bare ``call_soon_threadsafe(event.set)`` or
+through a wake-pending flag that only the consumer clears (what the CereLink
+producers do). Reports the loop thread's CPU time and how many loop
+callbacks ran. No device is required.
+
+Usage:
+    python examples/wake_bench.py [--rate 30000] [--seconds 5]
+"""
+
+import asyncio
+import threading
+import time
+
+import typer
+from typing_extensions import Annotated
+
+
+async def _run(rate: int, seconds: float, coalesce: bool) -> tuple[float, int, int]:
+    loop = asyncio.get_running_loop()
+    event = asyncio.Event()
+    pending = [False]
+    wakes = [0]
+    stop = threading.Event()
+
+    def set_event():
+        wakes[0] += 1
+        event.set()
+
+    def wake():
+        if coalesce:
+            if pending[0]:
+                return
+            pending[0] = True
+        loop.call_soon_threadsafe(set_event)
+
+    def receive():
+        per_ms = max(1, rate // 1000)
+        next_t = time.perf_counter()
+        while not stop.is_set():
+            for _ in range(per_ms):
+                wake()
+            next_t += 1e-3
+            time.sleep(max(0.0, next_t - time.perf_counter()))
+
+    thread = threading.Thread(target=receive)
+    cpu0 = time.thread_time()
+    thread.start()
+    deadline = loop.time() + seconds
+    reads = 0
+    while loop.time() < deadline:
+        pending[0] = False
+        event.clear()
+        reads += 1  # stands in for draining the ring
+        try:
+            await asyncio.wait_for(event.wait(), deadline - loop.time())
+        except asyncio.TimeoutError:
+            break
+    stop.set()
+    thread.join()
+    await asyncio.sleep(0.01)  # let already-scheduled callbacks run
+    return time.thread_time() - cpu0, wakes[0], reads
+
+
+def main(
+    rate: Annotated[int, typer.Option(help="Receive callbacks per second (30000 ~ SR_RAW).")] = 30_000,
+    seconds: Annotated[float, typer.Option(help="Duration of each run.")] = 5.0,
+):
+    for coalesce in (False, True):
+        cpu, wakes, reads = asyncio.run(_run(rate, seconds, coalesce))
+        label = "coalesced" if coalesce else "per-callback"
+        print(
+            f"{label:>12}: loop CPU {cpu / seconds * 100:5.1f}% | "
+            f"{wakes / seconds:8.0f} loop callbacks/s | {reads / seconds:6.0f} consumer passes/s"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
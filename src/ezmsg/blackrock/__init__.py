@@ -2,7 +2,12 @@ from pycbsdk import DeviceType
 
 from .__version__ import __version__ as __version__
 from .cerelink import (
+    BufferOverrun,
+    BufferOverrunError,
     CcfConfig,
+    CereLinkMultiRateProducer,
+    CereLinkMultiRateSettings,
+    CereLinkMultiRateSource,
     CereLinkSignalProducer,
     CereLinkSignalSettings,
     CereLinkSignalSource,
@@ -10,9 +15,14 @@ from .cerelink import (
     CereLinkSpikeSettings,
     CereLinkSpikeSource,
     ChannelSelection,
+    ChunkPolicy,
     DeviceConfig,
     DeviceStatus,
+    GapPolicy,
+    OutputDType,
+    OverflowPolicy,
     SliceConfig,
+    SpikeFormat,
 )
 from .cereplex_impedance import (
     CerePlexImpedance,
@@ -30,21 +40,41 @@ from .clock import (
     CbtimeToMonotonic,
     CbtimeToMonotonicSettings,
     CbtimeToMonotonicTransformer,
+    LinearClockModel,
     device_to_monotonic_batch_offsets,
     device_to_monotonic_offset,
 )
+from .fake import FakeSession, fake_sessions
+from .replay import (
+    NevFile,
+    NevReplayProducer,
+    NevReplaySettings,
+    NevReplaySource,
+    NsxFile,
+    NsxReplayProducer,
+    NsxReplaySettings,
+    NsxReplaySource,
+    ReplayPacing,
+)
 from .sampling_delay_alignment import (
     SamplingDelayAlignment,
     SamplingDelayAlignmentSettings,
     SamplingDelayAlignmentTransformer,
 )
+from .sessions import SessionLease, acquire_session, set_session_factory
+from .stats import LatencyHistogram, LatencyStats, SourceStats, StageLatency
 
 __all__ = [
     "__version__",
+    "BufferOverrun",
+    "BufferOverrunError",
     "CbtimeToMonotonic",
     "CbtimeToMonotonicSettings",
     "CbtimeToMonotonicTransformer",
     "CcfConfig",
+    "CereLinkMultiRateProducer",
+    "CereLinkMultiRateSettings",
+    "CereLinkMultiRateSource",
     "CereLinkSignalProducer",
     "CereLinkSignalSettings",
     "CereLinkSignalSource",
@@ -60,13 +90,37 @@ __all__ = [
     "ChannelMapSettings",
     "ChannelMapUnit",
     "ChannelMapUnitSettings",
+    "ChunkPolicy",
     "DeviceConfig",
     "DeviceStatus",
     "DeviceType",
     "device_to_monotonic_batch_offsets",
     "device_to_monotonic_offset",
+    "FakeSession",
+    "GapPolicy",
+    "LatencyHistogram",
+    "LatencyStats",
+    "LinearClockModel",
+    "NevFile",
+    "NevReplayProducer",
+    "NevReplaySettings",
+    "NevReplaySource",
+    "NsxFile",
+    "NsxReplayProducer",
+    "NsxReplaySettings",
+    "NsxReplaySource",
+    "OutputDType",
+    "OverflowPolicy",
+    "acquire_session",
+    "fake_sessions",
+    "ReplayPacing",
     "SamplingDelayAlignment",
     "SamplingDelayAlignmentSettings",
     "SamplingDelayAlignmentTransformer",
+    "SessionLease",
+    "set_session_factory",
     "SliceConfig",
+    "SourceStats",
+    "SpikeFormat",
+    "StageLatency",
 ]
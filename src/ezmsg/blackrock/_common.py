@@ -0,0 +1,40 @@
+"""Constants and helpers shared by the live CereLink units (:mod:`.cerelink`)
+and the file replay units (:mod:`.replay`). Internal; not part of the API."""
+
+from __future__ import annotations
+
+import numpy as np
+
+SPIKE_FS = 30000  # device spike clock — fixed by the protocol
+NS_PER_SECOND = 1_000_000_000
+UNIT_LABELS = np.array(["unsorted", "1", "2", "3", "4", "5", "noise"], dtype="U8")
+
+
+def store_samples(dst: np.ndarray, samples: np.ndarray, scale: np.ndarray | None) -> None:
+    """Convert int16 *samples* into *dst* (the output dtype), scaling by the
+    ``[1, n_ch]`` row *scale* in the same pass — no intermediate arrays."""
+    if scale is None:
+        dst[...] = samples
+    else:
+        np.multiply(samples, scale, out=dst)
+
+
+def check_unit_groups(unit_groups: tuple[tuple[int, ...], ...] | None) -> None:
+    if unit_groups is None:
+        return
+    flat = [u for group in unit_groups for u in group]
+    if not unit_groups or not all(unit_groups):
+        raise ValueError("unit_groups must hold at least one non-empty group")
+    if any(u not in range(7) for u in flat) or len(set(flat)) != len(flat):
+        raise ValueError(f"unit_groups must use each unit index 0..6 at most once, got {unit_groups}")
+
+
+def build_unit_lut(unit_groups: tuple[tuple[int, ...], ...] | None) -> tuple[np.ndarray, np.ndarray]:
+    """See :meth:`~ezmsg.blackrock.cerelink.CereLinkSpikeSettings.unit_lut`."""
+    if unit_groups is None:
+        return np.arange(7), UNIT_LABELS.copy()
+    lut = np.full(7, -1)
+    for i, group in enumerate(unit_groups):
+        lut[list(group)] = i
+    labels = np.array(["+".join(UNIT_LABELS[u] for u in group) for group in unit_groups])
+    return lut, labels
@@ -0,0 +1,372 @@
+"""Sample storage shared between the pycbsdk receive thread and the asyncio loop.
+
+:class:`SPSCRing` is the single-producer / single-consumer ring both CereLink
+producers hand samples through: the receive thread commits whole batches, the
+loop bulk-reads everything committed, and neither side takes a lock.
+
+:class:`EventBuffer` collects per-event records (e.g. spike time row, channel,
+unit) in struct-of-arrays form, so a consumer's cost scales with the number of
+events rather than with a dense window.
+
+:class:`ChunkPool` backs the signal source's ``zero_copy`` mode: the receive
+thread writes each sample exactly once into a pooled chunk buffer, and the
+emitted :class:`~ezmsg.util.messages.axisarray.AxisArray` carries a read-only
+view of that same memory. A chunk buffer is recycled only after every view of
+it (held by any subscriber, or derived from one) has been released.
+"""
+
+from __future__ import annotations
+
+import enum
+import sys
+import typing
+
+import numpy as np
+
+
+class OverflowPolicy(enum.Enum):
+    """What a ring does when a batch arrives and the unread samples leave no
+    room for it (the consumer stalled for longer than the ring holds)."""
+
+    DROP_OLDEST = "drop_oldest"
+    """Overwrite the oldest unread samples. The consumer skips them and reports
+    how many it skipped with its next read."""
+
+    GROW = "grow"
+    """Reallocate the ring (at least doubling it) so nothing is lost."""
+
+    ERROR = "error"
+    """Discard the batch and latch :attr:`SPSCRing.error` for the consumer."""
+
+
+class RingRead(typing.NamedTuple):
+    """One bulk read from an :class:`SPSCRing`."""
+
+    columns: tuple[np.ndarray, ...]
+    """Fresh copies, one per ring column, ``len(rows)`` along axis 0."""
+    start: int
+    """Sequence number (total samples ever committed before it) of row 0."""
+    skipped: int
+    """Samples lost to ``DROP_OLDEST`` since the previous read, just before row 0."""
+
+
+class _RingStore:
+    """One generation of ring storage; replaced wholesale under ``GROW``."""
+
+    __slots__ = ("capacity", "columns")
+
+    def __init__(self, capacity: int, specs: typing.Sequence[tuple[tuple[int, ...], np.dtype]]) -> None:
+        self.capacity = capacity
+        self.columns = tuple(np.zeros((capacity, *shape), dtype=dtype) for shape, dtype in specs)
+
+
+class SPSCRing:
+    """Lock-free single-producer / single-consumer ring of fixed-shape rows.
+
+    The ring stores one or more *columns* (e.g. samples ``[n_ch]`` int16 and a
+    uint64 timestamp) that advance together. Positions are absolute sequence
+    numbers — ``head`` counts rows ever committed, ``tail`` rows ever consumed —
+    so full and empty are unambiguous and a lap is just ``head - tail >
+    capacity``.
+
+    Ownership and publication:
+
+    * Only the producer stores ``_head``, ``_frontier`` and ``_store``; only the
+      consumer stores ``_tail``. Each is a single attribute store of an
+      immutable object, which is atomic with or without the GIL.
+    * The producer writes rows first and publishes them by storing ``_head``
+      once per batch (:meth:`commit`), so a batch becomes visible atomically.
+      The consumer loads ``_head`` before touching rows and stores ``_tail``
+      only after its copy is complete, so the producer never reuses a row the
+      consumer is still reading — except under ``DROP_OLDEST``.
+    * Under ``DROP_OLDEST`` the producer announces how far it is about to write
+      (``_frontier``) before overwriting unread rows, and the consumer re-checks
+      the frontier after copying, discarding any prefix that may have been torn
+      (a seqlock-style validation). No row is ever both emitted and corrupt.
+    * ``GROW`` publishes a new storage generation before any ``_head`` that
+      refers to it; the consumer re-checks the generation after loading
+      ``_head`` and retries if it changed.
+
+    Reads always return copies, so the ring's memory never escapes.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        columns: typing.Sequence[tuple[tuple[int, ...], np.dtype | type]],
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self._specs = tuple((tuple(shape), np.dtype(dtype)) for shape, dtype in columns)
+        self.policy = policy
+        self._store = _RingStore(capacity, self._specs)
+        self._head = 0
+        self._tail = 0
+        self._frontier = 0
+        self._reserved = 0  # producer-private: sequence numbers claimed but not committed
+        self._skip_unreported = 0  # consumer-private
+        self.overruns = 0
+        """Batches that did not fit in the unread space (producer-owned)."""
+        self.dropped = 0
+        """Rows the consumer skipped because they were overwritten (consumer-owned)."""
+        self.error: str | None = None
+        """Set (once) by the producer under ``ERROR``; the consumer should stop."""
+
+    # --- introspection (either side; values are snapshots) ---
+
+    @property
+    def capacity(self) -> int:
+        return self._store.capacity
+
+    @property
+    def head(self) -> int:
+        return self._head
+
+    @property
+    def tail(self) -> int:
+        return self._tail
+
+    def __len__(self) -> int:
+        """Committed rows not yet consumed, capped at the capacity."""
+        return min(self._head - self._tail, self._store.capacity)
+
+    # --- producer side ---
+
+    def reserve(self, n: int) -> list[tuple[slice, slice]]:
+        """Claim space for a batch of *n* rows.
+
+        Returns ``(batch_slice, ring_slice)`` pairs (two when the batch wraps):
+        copy ``batch[batch_slice]`` into ``column[ring_slice]`` for every column
+        of :meth:`columns`, then call :meth:`commit`. When the batch alone is
+        larger than the ring only its newest rows are placed (the rest still
+        consume sequence numbers, so the consumer sees them as skipped); under
+        ``ERROR`` an overflow returns ``[]`` and the batch is discarded.
+        """
+        store = self._store
+        head = self._head
+        free = store.capacity - (head - self._tail)
+        keep = n
+        if n > free:
+            self.overruns += 1
+            if self.policy is OverflowPolicy.ERROR:
+                if self.error is None:
+                    self.error = f"ring overrun: {n} new rows, {max(free, 0)} free of {store.capacity}"
+                self._reserved = 0
+                return []
+            if self.policy is OverflowPolicy.GROW:
+                store = self._grow(head - self._tail + n)
+            else:
+                keep = min(n, store.capacity)
+        # Announce the write extent before touching any row (DROP_OLDEST's
+        # consumer validates against it).
+        self._frontier = head + n
+        self._reserved = n
+        cap = store.capacity
+        pos = (head + n - keep) % cap
+        first = min(keep, cap - pos)
+        skip = n - keep
+        regions = [(slice(skip, skip + first), slice(pos, pos + first))]
+        if first < keep:
+            regions.append((slice(skip + first, n), slice(0, keep - first)))
+        return regions
+
+    def columns(self) -> tuple[np.ndarray, ...]:
+        """Producer view of the current storage (valid until the next :meth:`reserve`)."""
+        return self._store.columns
+
+    def commit(self) -> None:
+        """Publish the rows placed since :meth:`reserve`."""
+        if self._reserved:
+            self._head += self._reserved
+            self._reserved = 0
+
+    def write(self, *batch: np.ndarray) -> int:
+        """Convenience: :meth:`reserve`, copy each column of *batch*, :meth:`commit`.
+        Returns the number of rows placed."""
+        regions = self.reserve(len(batch[0]))
+        cols = self.columns()
+        for src, dst in regions:
+            for col, arr in zip(cols, batch):
+                col[dst] = arr[src]
+        placed = sum(src.stop - src.start for src, _ in regions)
+        self.commit()
+        return placed
+
+    def _grow(self, min_capacity: int) -> _RingStore:
+        old = self._store
+        new = _RingStore(max(min_capacity, 2 * old.capacity), self._specs)
+        # The consumer may be copying from ``old`` concurrently; both sides only
+        # read it now, and it stays intact until the consumer drops it.
+        tail, head = self._tail, self._head
+        idx = np.arange(tail, head)
+        for src, dst in zip(old.columns, new.columns):
+            dst[idx % new.capacity] = src[idx % old.capacity]
+        self._store = new
+        return new
+
+    # --- consumer side ---
+
+    def read(self, max_n: int | None = None, *, stop_at_wrap: bool = True) -> RingRead | None:
+        """Copy out committed rows (all of them, or at most *max_n*) and
+        consume them. Returns None when nothing is available.
+
+        With *stop_at_wrap* a read ends at the physical end of the ring and the
+        next read continues from its start. Without it, rows that straddle the
+        end come back as one contiguous array, still copied exactly once (two
+        slice copies into a single allocation).
+        """
+        while True:
+            store = self._store
+            head = self._head
+            if self._store is not store:
+                continue  # grew between the two loads; retry on the new generation
+            cap = store.capacity
+            tail = self._tail
+            # Only DROP_OLDEST ever overwrites unread rows; GROW/ERROR skip the
+            # frontier checks (under GROW it may already refer to a newer store).
+            overwrites = self.policy is OverflowPolicy.DROP_OLDEST
+            start = max(tail, self._frontier - cap) if overwrites else tail
+            if start >= head:
+                if start > tail:
+                    # Everything unread was overwritten; remember the loss for
+                    # the next read that returns rows.
+                    self._skip_unreported += start - tail
+                    self.dropped += start - tail
+                    self._tail = start
+                return None
+            stop = head if max_n is None else min(head, start + max_n)
+            if stop_at_wrap:
+                stop = min(stop, start - start % cap + cap)
+            out = self._gather(store, start, stop)
+            # Seqlock check: anything below the producer's current frontier minus
+            # capacity may have been overwritten while we copied.
+            valid_from = self._frontier - cap
+            if overwrites and valid_from > start:
+                cut = min(valid_from, stop) - start
+                out = tuple(c[cut:] for c in out)
+                start += cut
+                if start >= stop:
+                    continue
+            skipped = self._skip_unreported + start - tail
+            self._skip_unreported = 0
+            self.dropped += start - tail
+            self._tail = stop
+            return RingRead(out, start, skipped)
+
+    @staticmethod
+    def _gather(store: _RingStore, start: int, stop: int) -> tuple[np.ndarray, ...]:
+        cap = store.capacity
+        pos = start % cap
+        n = stop - start
+        first = min(n, cap - pos)
+        if first == n:
+            return tuple(col[pos : pos + n].copy() for col in store.columns)
+        out = []
+        for col in store.columns:
+            dst = np.empty((n, *col.shape[1:]), dtype=col.dtype)
+            dst[:first] = col[pos:]
+            dst[first:] = col[: n - first]
+            out.append(dst)
+        return tuple(out)
+
+
+class EventBuffer:
+    """Growable struct-of-arrays append buffer, one column per field.
+
+    Columns are preallocated and doubled when full, so appending is amortized
+    O(1) with no per-event allocation. Not thread-safe; the caller serializes
+    :meth:`append` against :meth:`take`.
+    """
+
+    def __init__(self, capacity: int, fields: typing.Sequence[tuple[str, np.dtype | type]]) -> None:
+        self.names = tuple(name for name, _ in fields)
+        self.columns = [np.empty(max(1, capacity), dtype=dtype) for _, dtype in fields]
+        self.n = 0
+
+    def __len__(self) -> int:
+        return self.n
+
+    def append(self, *values) -> None:
+        """Append one event (one value per field)."""
+        n = self.n
+        if n == len(self.columns[0]):
+            self._grow(n + 1)
+        for col, value in zip(self.columns, values):
+            col[n] = value
+        self.n = n + 1
+
+    def extend(self, *columns: np.ndarray) -> None:
+        """Append a batch of events (one equal-length array per field)."""
+        n, k = self.n, len(columns[0])
+        if n + k > len(self.columns[0]):
+            self._grow(n + k)
+        for col, values in zip(self.columns, columns):
+            col[n : n + k] = values
+        self.n = n + k
+
+    def _grow(self, min_capacity: int) -> None:
+        capacity = max(min_capacity, 2 * len(self.columns[0]))
+        for i, col in enumerate(self.columns):
+            new = np.empty(capacity, dtype=col.dtype)
+            new[: self.n] = col[: self.n]
+            self.columns[i] = new
+
+    def take(self) -> tuple[np.ndarray, ...]:
+        """Copies of every column's appended events; empties the buffer."""
+        n, self.n = self.n, 0
+        return tuple(col[:n].copy() for col in self.columns)
+
+
+class ChunkPool:
+    """A growable set of reference-counted ``[capacity, n_ch]`` chunk buffers.
+
+    Every slot is its own ndarray, so any numpy view taken from it — including
+    views of views, which numpy collapses onto the owning array — keeps the slot
+    as its ``.base``. The pool therefore knows a slot is free when nothing but the
+    pool itself references it. This relies on CPython reference counts, which are
+    exact for ndarrays (they are never immortal or deferred, even on free-threaded
+    builds).
+
+    The pool is not thread-safe on its own; the caller serializes
+    :meth:`acquire` against the creation of views.
+    """
+
+    def __init__(self, n_slots: int, capacity: int, n_ch: int, dtype: np.dtype | type) -> None:
+        self.capacity = capacity
+        self.n_ch = n_ch
+        self.dtype = np.dtype(dtype)
+        self.data: list[np.ndarray] = []
+        self.timestamps: list[np.ndarray] = []
+        for _ in range(max(1, n_slots)):
+            self._add_slot()
+
+    def _add_slot(self) -> int:
+        self.data.append(np.empty((self.capacity, self.n_ch), dtype=self.dtype))
+        self.timestamps.append(np.empty(self.capacity, dtype=np.uint64))
+        return len(self.data) - 1
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def is_free(self, slot: int) -> bool:
+        """True if no view of *slot* is alive outside the pool."""
+        # One reference from ``self.data`` plus the getrefcount argument.
+        return sys.getrefcount(self.data[slot]) <= 2
+
+    def n_free(self, exclude: int = -1) -> int:
+        return sum(1 for i in range(len(self.data)) if i != exclude and self.is_free(i))
+
+    def acquire(self, exclude: int = -1) -> int:
+        """Index of a free slot other than *exclude*, growing the pool when
+        every slot is still held downstream."""
+        for i in range(len(self.data)):
+            if i != exclude and self.is_free(i):
+                return i
+        return self._add_slot()
+
+    def view(self, slot: int, start: int, stop: int) -> np.ndarray:
+        """Read-only view of rows ``[start, stop)`` of *slot*."""
+        out = self.data[slot][start:stop]
+        out.flags.writeable = False
+        return out
@@ -5,21 +5,29 @@ from __future__ import annotations
 import asyncio
 import enum
 import logging
+import queue
 import threading
 import time
 import typing
 from dataclasses import dataclass
+from dataclasses import replace as dc_replace
 
+import cffi
 import ezmsg.core as ez
 import numpy as np
+import sparse
 from ezmsg.baseproc import processor_state
 from ezmsg.baseproc.stateful import BaseStatefulProducer
 from ezmsg.baseproc.units import BaseProducerUnit
 from ezmsg.util.messages.axisarray import AxisArray, replace
-from pycbsdk import ChanInfoField, ChannelType, DeviceType, SampleRate, Session
+from pycbsdk import ChanInfoField, ChannelType, DeviceType, SampleRate
 
+from ._common import NS_PER_SECOND, SPIKE_FS, build_unit_lut, check_unit_groups, store_samples
+from .buffers import ChunkPool, EventBuffer, OverflowPolicy, SPSCRing
 from .channel_map import CHANNEL_DTYPE, ChannelMapSettings
-from .clock import device_to_monotonic_batch_offsets
+from .clock import LinearClockModel
+from .sessions import SessionLease, acquire_session
+from .stats import LatencyStats, LatencyTracker, SourceStats
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +53,27 @@ class DeviceStatus:
     error: str = ""
 
 
+class BufferOverrunError(RuntimeError):
+    """Raised by the signal producer under :attr:`OverflowPolicy.ERROR`."""
+
+
+@dataclass
+class BufferOverrun:
+    """Cumulative overrun counters, emitted on
+    ``CereLinkSignalSource.OUTPUT_OVERRUN`` whenever they change.
+
+    Counts are monotonic for the lifetime of one subscription (they restart
+    when the device is reopened)."""
+
+    policy: OverflowPolicy
+    overruns: int
+    """Number of batches that did not fit in the unread space."""
+    dropped_samples: int
+    """Samples discarded so far (always 0 under ``GROW``)."""
+    buffer_samples: int
+    """Current buffer capacity in samples (increases under ``GROW``)."""
+
+
 # --- Device-configuration types ------------------------------------------
 
 
@@ -129,6 +158,76 @@ DeviceConfig = CcfConfig | SliceConfig | None
 or component owns the device config; this source only subscribes."""
 
 
+class OutputDType(enum.Enum):
+    """Sample dtype of the signal source's emitted ``data``."""
+
+    FLOAT32 = "float32"
+    """Half the bytes of ``FLOAT64``; ample precision for µV-scaled int16 counts."""
+
+    FLOAT64 = "float64"
+
+    INT16 = "int16"
+    """Raw device counts, unscaled. Requires ``microvolts=False``."""
+
+
+class GapPolicy(enum.Enum):
+    """What the signal source does when consecutive device timestamps are not
+    one sample period apart (dropped packets, a device clock reset)."""
+
+    IGNORE = "ignore"
+    """Don't check; every message assumes a regular grid from its first sample."""
+
+    ANNOTATE = "annotate"
+    """Emit as usual, listing the row indices that follow a gap in
+    ``attrs["discontinuities"]`` (index 0 = gap since the previous message),
+    with the running total in ``attrs["discontinuity_count"]``."""
+
+    SPLIT = "split"
+    """Like ``ANNOTATE``, but also end the message at each gap, so every
+    message's time axis is exact. The remainder starts the next message."""
+
+
+@dataclass(frozen=True)
+class ChunkPolicy:
+    """When :class:`CereLinkSignalSource` emits the samples it has buffered.
+
+    The default (all fields unset) emits whatever has arrived as soon as the
+    loop wakes, i.e. one message per device batch when the pipeline keeps up.
+    Larger chunks trade latency for lower per-message overhead. Any chunking
+    implies contiguous reads (a ring wrap never splits a chunk).
+    """
+
+    min_samples: int = 0
+    """Wait until at least this many samples are buffered, then emit all of them."""
+
+    max_latency: float | None = None
+    """Seconds. Emit whatever is buffered once the oldest buffered sample has
+    waited this long, even if ``min_samples`` is not reached. Alone, this
+    batches by time."""
+
+    fixed_samples: int = 0
+    """Emit blocks of exactly this many samples; the remainder is carried into
+    the next block. Exclusive with the other two. A block that follows a
+    ``DROP_OLDEST`` gap (``attrs["dropped_samples"]``) may be short."""
+
+    def __post_init__(self):
+        if self.min_samples < 0 or self.fixed_samples < 0:
+            raise ValueError("ChunkPolicy sample counts must be non-negative.")
+        if self.max_latency is not None and self.max_latency <= 0:
+            raise ValueError(f"ChunkPolicy.max_latency must be positive, got {self.max_latency}.")
+        if self.fixed_samples and (self.min_samples or self.max_latency is not None):
+            raise ValueError("ChunkPolicy.fixed_samples cannot be combined with min_samples or max_latency.")
+
+    @property
+    def active(self) -> bool:
+        return bool(self.min_samples or self.fixed_samples or self.max_latency is not None)
+
+    @property
+    def block(self) -> int:
+        """Samples that make a chunk ready (0 = any)."""
+        return self.fixed_samples or self.min_samples
+
+
 class CereLinkSignalSettings(ez.Settings):
     """Settings for :class:`CereLinkSignalSource` — emits one continuous
     sample-group as :class:`AxisArray`."""
@@ -150,26 +249,173 @@ class CereLinkSignalSettings(ez.Settings):
     microvolts: bool = True
     """Convert int16 → µV using channel scale factors."""
 
+    output_dtype: OutputDType | None = None
+    """Dtype of the emitted samples. ``None`` keeps the historical behavior:
+    ``FLOAT64`` with ``microvolts``, ``INT16`` without. Samples are converted
+    (and scaled) once, on the receive thread, into storage of this dtype."""
+
     cont_buffer_dur: float = 0.5
     """Ring buffer duration in seconds."""
 
+    overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+    """What to do when samples arrive faster than they are emitted and the
+    buffer would be overwritten. See :class:`OverflowPolicy`."""
+
+    contiguous_reads: bool = False
+    """Emit samples that straddle the end of the ring buffer as one message
+    instead of two (the tail of the ring, then its head on the next call), so
+    chunk sizes depend only on arrival timing. Costs nothing extra: the two
+    regions are copied straight into the single output array. Has no effect
+    with ``zero_copy``, whose chunks never wrap."""
+
+    chunking: ChunkPolicy = ChunkPolicy()
+    """How many samples go into each emitted message. See :class:`ChunkPolicy`."""
+
+    gap_policy: GapPolicy = GapPolicy.ANNOTATE
+    """How timestamp discontinuities are surfaced. See :class:`GapPolicy`."""
+
+    gap_tolerance: float = 0.5
+    """A timestamp step that differs from the nominal sample period by more
+    than this fraction of a period counts as a discontinuity."""
+
+    rate_correction: bool = False
+    """With ``cbtime=False``, emit a drift-corrected time-axis ``gain`` (the
+    effective sample period in host seconds, from the clock model's fitted
+    drift) instead of the nominal ``1 / rate.hz``. Each message then starts
+    exactly where the previous one ended (``offset + n * gain``), and the
+    residual error against the device timestamps is slewed out by bending
+    ``gain`` at most ``max_rate_slew`` away from the estimate. No effect with
+    ``cbtime=True``, whose time axis is device time."""
+
+    max_rate_slew: float = 1e-3
+    """Largest fractional adjustment of ``gain`` used to pull the tiled
+    timeline back onto the device timestamps (1e-3 = 1 ms per second)."""
+
+    zero_copy: bool = False
+    """Emit read-only views into a pool of reusable chunk buffers instead of a
+    fresh copy per message. The receive thread writes each sample (already
+    scaled when ``microvolts``) exactly once; a chunk buffer is recycled only
+    after every subscriber has released every view of it. Consumers must not
+    write to the emitted ``data``."""
+
+    assembly_queue: int = 0
+    """``0`` = build each message on the event loop when ``_produce`` runs.
+    ``N > 0`` = a worker thread reads the buffer, converts the clock and
+    builds complete messages as data arrives, handing them over through a
+    queue of at most ``N``; ``_produce`` only takes the next one, so its
+    event-loop cost is constant. A full queue stalls the worker and the
+    buffer's ``overflow_policy`` takes over; the depth is
+    :attr:`CereLinkSignalProducer.queue_depth`."""
+
+    latency_stats: float | None = None
+    """Seconds between :class:`~ezmsg.blackrock.stats.LatencyStats` reports on
+    :attr:`CereLinkSignalSource.OUTPUT_LATENCY`, from histograms of the
+    intervals between the device timestamp, the receive callback, the buffer
+    commit, the read that wakes on it and the message leaving ``_produce``.
+    ``None`` = not instrumented (no timestamps are taken)."""
+
+    stats_interval: float | None = None
+    """Seconds between :class:`~ezmsg.blackrock.stats.SourceStats` health
+    reports on :attr:`CereLinkSignalSource.OUTPUT_STATS`. The receive thread
+    only bumps two counters per batch; everything else is read when the
+    report is built. ``None`` = no reports."""
+
     cmp_configs: tuple[ChannelMapSettings, ...] = ()
     """One :class:`ChannelMapSettings` per headstage applied after connection."""
 
     def __post_init__(self):
+        if self.latency_stats is not None and self.latency_stats <= 0:
+            raise ValueError(f"latency_stats must be positive or None, got {self.latency_stats}")
+        if self.stats_interval is not None and self.stats_interval <= 0:
+            raise ValueError(f"stats_interval must be positive or None, got {self.stats_interval}")
+        if self.assembly_queue < 0:
+            raise ValueError(f"assembly_queue must be >= 0, got {self.assembly_queue}")
         if self.subscribe_rate == SampleRate.NONE:
             raise ValueError(
                 "subscribe_rate=SampleRate.NONE is not allowed; pass a real "
                 "SampleRate (SR_500, SR_1kHz, SR_2kHz, SR_10kHz, SR_30kHz, or "
                 "SR_RAW), or omit the argument to use the SR_RAW default."
             )
+        if self.output_dtype is OutputDType.INT16 and self.microvolts:
+            raise ValueError(
+                "output_dtype=OutputDType.INT16 carries raw device counts; set "
+                "microvolts=False, or pick FLOAT32/FLOAT64 for µV output."
+            )
+        if self.zero_copy and self.overflow_policy is OverflowPolicy.GROW:
+            raise ValueError(
+                "overflow_policy=OverflowPolicy.GROW is not supported with zero_copy "
+                "(pool slots are fixed-size); raise cont_buffer_dur instead."
+            )
+        # Checked here rather than at subscription: ``chunking`` is applied
+        # live, and a block the buffer cannot hold would never become ready.
+        if self.chunking.block > self.buffer_samples:
+            raise ValueError(
+                f"ChunkPolicy block of {self.chunking.block} samples exceeds the "
+                f"{self.buffer_samples}-sample buffer; raise cont_buffer_dur."
+            )
+
+    @property
+    def buffer_samples(self) -> int:
+        """Ring (or pool slot) capacity in samples, from ``cont_buffer_dur``."""
+        return max(2, int(self.cont_buffer_dur * self.subscribe_rate.hz))
+
+    @property
+    def sample_dtype(self) -> np.dtype:
+        """The resolved :attr:`output_dtype`."""
+        if self.output_dtype is None:
+            return np.dtype(np.float64 if self.microvolts else np.int16)
+        return np.dtype(self.output_dtype.value)
+
+
+class CereLinkMultiRateSettings(ez.Settings):
+    """Settings for :class:`CereLinkMultiRateSource` — several continuous
+    sample-groups from one Session, each published on its own output."""
+
+    device_type: DeviceType | None = None
+    """Device to connect to. ``None`` = idle (no Session opened)."""
+
+    streams: tuple[CereLinkSignalSettings, ...] = ()
+    """One entry per sample group, each with a distinct ``subscribe_rate``.
+    Everything per-stream — buffer, dtype, chunking, gap and rate handling,
+    and a :class:`SliceConfig` ``configure`` for that group — is honored; each
+    entry's ``device_type`` and ``cmp_configs`` are ignored in favor of the
+    fields below."""
+
+    configure: CcfConfig | None = None
+    """Device-wide configuration applied once, before the streams' slices."""
+
+    cmp_configs: tuple[ChannelMapSettings, ...] = ()
+    """One :class:`ChannelMapSettings` per headstage applied after connection."""
+
+    def __post_init__(self):
+        rates = [stream.subscribe_rate for stream in self.streams]
+        if len(set(rates)) != len(rates):
+            raise ValueError(f"CereLinkMultiRateSettings.streams repeat a subscribe_rate: {[r.name for r in rates]}")
+        if any(isinstance(stream.configure, CcfConfig) for stream in self.streams):
+            raise ValueError(
+                "A CcfConfig is device-wide; pass it as CereLinkMultiRateSettings.configure, not per stream."
+            )
+
+
+class SpikeFormat(enum.Enum):
+    """Container of the spike source's emitted ``data`` (always logically
+    ``[time, ch, unit=7]`` counts)."""
+
+    DENSE = "dense"
+    """``uint8`` ndarray (``uint16`` when binned). Cost scales with window ×
+    channels × units."""
+
+    SPARSE = "sparse"
+    """``sparse.COO`` holding one coordinate per spike (duplicates summed), as
+    emitted by :mod:`ezmsg.event` detectors. Cost scales with the spike count."""
 
 
 class CereLinkSpikeSettings(ez.Settings):
     """Settings for :class:`CereLinkSpikeSource` — emits sparse spike events
     as :class:`AxisArray` of shape ``[time, ch, unit=7]`` at the 30 kHz
-    spike clock. Unit indices follow the device convention:
-    ``0=unsorted, 1..5=sorted, 6=noise (header.type > 5)``."""
+    spike clock (or ``bin_width``). Unit indices follow the device convention:
+    ``0=unsorted, 1..5=sorted, 6=noise (header.type > 5)`` unless collapsed by
+    ``unit_groups``."""
 
     device_type: DeviceType | None = None
     """Device to connect to. ``None`` = idle."""
@@ -181,17 +427,97 @@ class CereLinkSpikeSettings(ez.Settings):
     """True = raw device nanoseconds/1e9; False = ``time.monotonic()`` via clock sync."""
 
     microvolts: bool = True
-    """Reserved for future spike-waveform emission — int16 → µV scaling."""
+    """Waveform snippets (``waveforms=True``) as float32 µV, scaled with
+    per-channel factors cached on open; False = raw int16 counts."""
 
     spike_buffer_dur: float = 0.5
     """Ring buffer duration in seconds (at the 30 kHz spike clock)."""
 
+    spike_windows: int = 4
+    """Windows held in the spike ring: the one being emitted next plus
+    lookahead for spikes the device has already timestamped past it. Spikes
+    beyond the ring, or behind an already-emitted window, are dropped and
+    counted (``attrs["dropped_spikes"]``)."""
+
+    max_latency: float = 0.02
+    """Seconds. Each window is emitted as soon as a device timestamp past its
+    end arrives, and at the latest this long after its end on the host clock
+    (via clock sync; before sync is available, on a wall-clock schedule of one
+    window per ``spike_buffer_dur``). Spikes arriving later than this are
+    dropped and counted."""
+
+    clock_rate: SampleRate = SampleRate.NONE
+    """Continuous group whose batch timestamps also advance the device clock
+    the windows are closed against, so windows close promptly between
+    spikes. Only useful if some channel is in that group. ``NONE`` = spike
+    timestamps only."""
+
+    output_format: SpikeFormat = SpikeFormat.DENSE
+    """Dense window tensor or one sparse record per spike. See :class:`SpikeFormat`."""
+
+    bin_width: float | None = None
+    """Seconds. Count spikes in bins of this width (rounded to whole 30 kHz
+    samples) instead of at the 30 kHz spike clock; the time axis then runs at
+    the bin rate. Bins are aligned to the window origin, and each window holds
+    a whole number of bins (``spike_buffer_dur`` is rounded to it). Binned
+    dense counts are ``uint16``."""
+
+    unit_groups: tuple[tuple[int, ...], ...] | None = None
+    """Collapse the device's 7 unit buckets (``0=unsorted, 1..5=sorted,
+    6=noise``) into one output unit per group; buckets in no group are dropped.
+    E.g. ``((0, 1, 2, 3, 4, 5),)`` counts every non-noise spike as one unit and
+    ``((0,), (1, 2, 3, 4, 5))`` separates unsorted from sorted. ``None`` keeps
+    all 7."""
+
+    waveforms: bool = False
+    """Also capture every spike's waveform snippet and emit them on
+    :attr:`CereLinkSpikeSource.OUTPUT_WAVEFORMS`, one message per count window
+    (windows without spikes emit nothing). Off by default; the count path is
+    the same either way."""
+
+    waveform_capacity: int = 8192
+    """Snippets held between two emissions; beyond it the oldest are dropped
+    and reported as ``attrs["dropped_waveforms"]``."""
+
+    latency_stats: float | None = None
+    """Seconds between :class:`~ezmsg.blackrock.stats.LatencyStats` reports on
+    :attr:`CereLinkSpikeSource.OUTPUT_LATENCY`: the newest spike's device
+    timestamp to its ingest, and each window's end to its emission. ``None``
+    = not instrumented."""
+
+    stats_interval: float | None = None
+    """Seconds between :class:`~ezmsg.blackrock.stats.SourceStats` health
+    reports on :attr:`CereLinkSpikeSource.OUTPUT_STATS`. ``None`` = no reports."""
+
     cmp_configs: tuple[ChannelMapSettings, ...] = ()
     """One :class:`ChannelMapSettings` per headstage applied after connection."""
 
     def __post_init__(self):
-        # Symmetry with CereLinkSignalSettings; nothing to validate today.
-        pass
+        if self.latency_stats is not None and self.latency_stats <= 0:
+            raise ValueError(f"latency_stats must be positive or None, got {self.latency_stats}")
+        if self.stats_interval is not None and self.stats_interval <= 0:
+            raise ValueError(f"stats_interval must be positive or None, got {self.stats_interval}")
+        if self.waveform_capacity < 1:
+            raise ValueError(f"waveform_capacity must be positive, got {self.waveform_capacity}")
+        if self.max_latency < 0:
+            raise ValueError(f"max_latency must be >= 0, got {self.max_latency}")
+        if self.spike_windows < 1:
+            raise ValueError(f"spike_windows must be >= 1, got {self.spike_windows}")
+        if self.bin_width is not None and self.bin_width <= 0:
+            raise ValueError(f"bin_width must be positive, got {self.bin_width}")
+        check_unit_groups(self.unit_groups)
+
+    @property
+    def bin_samples(self) -> int:
+        """Spike-clock samples per output row (1 without ``bin_width``)."""
+        if self.bin_width is None:
+            return 1
+        return max(1, round(self.bin_width * SPIKE_FS))
+
+    def unit_lut(self) -> tuple[np.ndarray, np.ndarray]:
+        """``(lut, labels)``: output unit index per device bucket (-1 = dropped),
+        and the output unit labels."""
+        return build_unit_lut(self.unit_groups)
 
 
 # --- Shared producer base + signal/spike leaves --------------------------
@@ -210,22 +536,68 @@ _StateT = typing.TypeVar("_StateT")
 class _CereLinkSharedState:
     """State fields common to signal and spike producers."""
 
-    session: Session | None = None
+    session: SessionLease | None = None
     ch_positions: dict | None = None  # ch_id -> (x, y, size, headstage, bank_num, term)
+    clock: LinearClockModel | None = None  # device ns -> time.monotonic() (cbtime=False)
+    data_event: asyncio.Event | None = None  # set (via _wake) when the receive thread has new data
+    wake_pending: bool = False  # a wake-up is in flight; only the consumer (_clear_wake) resets it
+    latency: LatencyTracker | None = None  # latency_stats only
+    # stats_interval: the report timer, when the period began, and the
+    # emission counters for it (maintained on the loop by _count_message).
+    stats_timer: asyncio.TimerHandle | None = None
+    stats_since: float = 0.0
+    stats_received: int = 0  # received count at the start of the period
+    stats_callbacks: int = 0  # ... and callback count
+    messages_emitted: int = 0
+    chunk_total: int = 0
+    chunk_max: int = 0
 
 
 @processor_state
 class CereLinkSignalProducerState(_CereLinkSharedState):
     """Signal-producer ring buffer + emission template."""
 
-    buffer_data: np.ndarray | None = None  # int16 [N_t, n_ch]
-    buffer_timestamps: np.ndarray | None = None  # uint64 [N_t]
-    write_idx: int = 0
-    read_idx: int = 0
+    ring: SPSCRing | None = None  # columns: samples [n_ch] (output dtype), timestamps (uint64)
     n_channels: int = 0
     template: AxisArray | None = None
     scale_factors: np.ndarray | None = None
-    data_event: asyncio.Event | None = None  # set by callback when new samples arrive
+    write_scale: np.ndarray | None = None  # [1, n_ch] in the output dtype; None = no scaling
+    # zero_copy mode: the receive thread appends to ``pool`` slot ``pool_slot``;
+    # rows [pool_read, pool_fill) of that slot are written but not yet emitted.
+    pool: ChunkPool | None = None
+    pool_slot: int = 0
+    pool_read: int = 0
+    pool_fill: int = 0
+    # zero_copy overrun accounting (the ring keeps its own). Written by the
+    # receive thread under the pool lock; read by _produce.
+    pool_overruns: int = 0
+    pool_dropped: int = 0
+    pool_pending_drop: int = 0  # dropped since the last emission; marks the next message
+    pool_error: str | None = None
+    # ChunkPolicy.max_latency: loop time at which unread samples were first seen.
+    pending_since: float | None = None
+    # GapPolicy: the last emitted device timestamp, rows read past a SPLIT
+    # (emitted next), and running discontinuity counts.
+    last_timestamp: int | None = None
+    carry: tuple[np.ndarray, np.ndarray, int] | None = None
+    discontinuities: int = 0
+    missing_samples: int = 0  # estimated from forward gaps
+    # rate_correction: host-time offset the next message must start at to tile.
+    next_offset: float | None = None
+    # Cumulative for this subscription, either mode; maintained by _produce.
+    overruns: int = 0
+    dropped_samples: int = 0
+    # assembly_queue > 0: the worker thread, its wake-up (set by the receive
+    # thread) and the finished messages (or the error that stopped it).
+    worker: threading.Thread | None = None
+    work_event: threading.Event | None = None
+    messages: queue.Queue | None = None
+    # latency_stats: monotonic ns of the oldest commit not yet read (0 = none;
+    # set by the receive thread, taken by the reader).
+    commit_ns: int = 0
+    # Cumulative, bumped by the receive thread (stats_interval).
+    received_samples: int = 0
+    callbacks: int = 0
 
 
 class _CereLinkBaseProducer(
@@ -245,6 +617,8 @@ class _CereLinkBaseProducer(
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self._status_callback: typing.Callable[[DeviceStatus], None] | None = None
+        self._latency_callback: typing.Callable[[LatencyStats], None] | None = None
+        self._stats_callback: typing.Callable[[SourceStats], None] | None = None
 
     def set_status_callback(self, cb: typing.Callable[[DeviceStatus], None]) -> None:
         """Inject the unit's status emitter — wired up by the Source on construct
@@ -255,6 +629,101 @@ class _CereLinkBaseProducer(
         if self._status_callback is not None:
             self._status_callback(status)
 
+    def set_latency_callback(self, cb: typing.Callable[[LatencyStats], None]) -> None:
+        """Inject the unit's latency-report emitter (see :meth:`set_status_callback`)."""
+        self._latency_callback = cb
+
+    def _report_latency(self) -> None:
+        """Emit a latency report if ``latency_stats`` is on and its period is up."""
+        tracker = self.state.latency
+        if tracker is None or self._latency_callback is None:
+            return
+        report = tracker.report()
+        if report is not None:
+            self._latency_callback(report)
+
+    def set_stats_callback(self, cb: typing.Callable[[SourceStats], None]) -> None:
+        """Inject the unit's health-report emitter (see :meth:`set_status_callback`)."""
+        self._stats_callback = cb
+
+    def _start_stats(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Schedule the first ``stats_interval`` report on *loop*; each report
+        schedules the next, so they keep coming while no data flows."""
+        st = self.state
+        self._stop_stats()
+        st.messages_emitted = st.chunk_total = st.chunk_max = 0
+        st.stats_received, st.stats_callbacks = self._stats_counts()
+        st.stats_since = time.monotonic()
+        if self.settings.stats_interval is not None:
+            st.stats_timer = loop.call_later(self.settings.stats_interval, self._emit_stats, loop)
+
+    def _stop_stats(self) -> None:
+        if self.state.stats_timer is not None:
+            self.state.stats_timer.cancel()
+            self.state.stats_timer = None
+
+    def _emit_stats(self, loop: asyncio.AbstractEventLoop) -> None:
+        st = self.state
+        now = time.monotonic()
+        received, callbacks = self._stats_counts()
+        period = now - st.stats_since
+        report = self._collect_stats(
+            period,
+            received_rate=(received - st.stats_received) / period if period > 0 else 0.0,
+            callback_rate=(callbacks - st.stats_callbacks) / period if period > 0 else 0.0,
+            messages=st.messages_emitted,
+            mean_chunk=st.chunk_total / st.messages_emitted if st.messages_emitted else 0.0,
+            max_chunk=st.chunk_max,
+            clock_synced=st.clock is not None and st.clock.ready,
+        )
+        st.stats_since, st.stats_received, st.stats_callbacks = now, received, callbacks
+        st.messages_emitted = st.chunk_total = st.chunk_max = 0
+        st.stats_timer = loop.call_later(self.settings.stats_interval, self._emit_stats, loop)
+        if self._stats_callback is not None:
+            self._stats_callback(report)
+
+    def _count_message(self, n: int) -> None:
+        """Loop: account one emitted message of *n* samples (or spikes)."""
+        st = self.state
+        st.messages_emitted += 1
+        st.chunk_total += n
+        if n > st.chunk_max:
+            st.chunk_max = n
+
+    def _stats_counts(self) -> tuple[int, int]:
+        """Cumulative ``(received, callbacks)`` for :class:`SourceStats`."""
+        return 0, 0
+
+    def _collect_stats(self, period: float, **common) -> SourceStats:
+        """Build a :class:`SourceStats` from *common* plus the subclass's buffer fields."""
+        raise NotImplementedError
+
+    def _host_ns(self, device_ns: int) -> int | None:
+        """*device_ns* on the ``time.monotonic_ns()`` timeline via the clock
+        model, or None before clock sync."""
+        host = self.state.clock.predict(device_ns) if self.state.clock is not None else None
+        return None if host is None else int(host * 1e9)
+
+    def _wake(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Receive thread: set ``data_event`` on the loop. Coalesced — while a
+        wake-up is pending (the consumer hasn't called :meth:`_clear_wake`
+        since the last one) further calls cost one attribute check instead of
+        a self-pipe write and a loop callback each."""
+        st = self.state
+        if st.wake_pending:
+            return
+        st.wake_pending = True
+        if loop.is_running():
+            loop.call_soon_threadsafe(st.data_event.set)
+        else:
+            st.data_event.set()
+
+    def _clear_wake(self) -> None:
+        """Consumer: re-arm :meth:`_wake`. Call before checking for data, so a
+        wake-up for data that arrives after the check is never skipped."""
+        self.state.wake_pending = False
+        self.state.data_event.clear()
+
     def _reset_state(self) -> None:
         """Sync reset hook — no-op. Open/configure is async (see ``_areset_state``)."""
         pass
@@ -289,6 +758,7 @@ class _CereLinkBaseProducer(
 
     async def _teardown_state(self) -> None:
         """Release the Session and wake any waiters."""
+        self._stop_stats()
         self._on_teardown_pre_close()
         if self.state.session is not None:
             try:
@@ -296,6 +766,7 @@ class _CereLinkBaseProducer(
             except Exception:
                 logger.exception("CereLink: error during async teardown")
             self.state.session = None
+        self.state.clock = None
 
     def _on_teardown_pre_close(self) -> None:
         """Subclass hook called before the Session is closed (e.g., to wake await-ers)."""
@@ -303,10 +774,10 @@ class _CereLinkBaseProducer(
 
     async def _open_and_configure(self) -> None:
         loop = asyncio.get_running_loop()
-        self.state.session = Session(device_type=self.settings.device_type)
+        # Shared with every other CereLink unit on this device in the process;
+        # ``__exit__`` releases this unit's lease (see ``sessions``).
+        self.state.session = await acquire_session(self.settings.device_type, timeout=10.0)
         try:
-            await asyncio.to_thread(self.state.session.__enter__)
-            await self.state.session.wait_until_running(timeout=10.0)
             await asyncio.to_thread(self._apply_configure)
             await asyncio.to_thread(self._apply_channel_maps)
             # Sync so device responses to load_ccf / set_sample_group / load_channel_map
@@ -314,6 +785,7 @@ class _CereLinkBaseProducer(
             # (e.g., get_group_channels) consult it.
             await asyncio.to_thread(self.state.session.sync)
             self._cache_channel_metadata()
+            self.state.clock = LinearClockModel(self.state.session)
             self._setup_subscription(loop)
         except BaseException:
             logger.exception(
@@ -415,6 +887,20 @@ class _CereLinkBaseProducer(
             ch_info[i]["headstage"] = headstage
         return ch_info
 
+    def _compute_scale_factors(self, channels: list[int]) -> np.ndarray:
+        """Per-channel int16 → µV factors (1.0 where the device reports no usable scaling)."""
+        sfs = []
+        for ch_id in channels:
+            scaling = self.state.session.get_channel_scaling(ch_id)
+            if scaling and scaling["digmax"] != scaling["digmin"]:
+                sf = (scaling["anamax"] - scaling["anamin"]) / (scaling["digmax"] - scaling["digmin"])
+                if scaling["anaunit"] == "mV":
+                    sf *= 1000  # mV -> uV
+                sfs.append(sf)
+            else:
+                sfs.append(1.0)
+        return np.array(sfs, dtype=np.float64)
+
     def _device_name(self) -> str:
         return self.settings.device_type.name.upper() if self.settings.device_type is not None else ""
 
@@ -452,6 +938,7 @@ class _CereLinkBaseProducer(
     def close(self) -> None:
         """Synchronous teardown — for ``Source.shutdown()``. Releases the
         Session and wakes any awaiters."""
+        self._stop_stats()
         self._on_teardown_pre_close()
         if self.state.session is not None:
             try:
@@ -461,9 +948,54 @@ class _CereLinkBaseProducer(
             self.state.session = None
 
 
+_ZERO_COPY_SLOTS = 3  # initial zero_copy pool size; grows while subscribers hold every slot
+
+
+_WORKER_JOIN_TIMEOUT = 1.0  # seconds close() waits for the assembly worker to exit
+_RATE_REANCHOR_S = 0.01  # rate_correction: larger tiling errors re-anchor instead of slewing
+# latency_stats stages, in pipeline order (device_to_publish spans all of them).
+_SIGNAL_LATENCY_STAGES = (
+    "device_to_callback",
+    "callback_to_commit",
+    "commit_to_wake",
+    "wake_to_publish",
+    "device_to_publish",
+)
+
+
 class CereLinkSignalProducer(_CereLinkBaseProducer[CereLinkSignalSettings, CereLinkSignalProducerState]):
     """Streams one continuous sample-group as :class:`AxisArray`."""
 
+    # ``microvolts`` is baked into the stored samples (and the template's unit
+    # attr), so toggling it needs a fresh subscription like ``output_dtype``.
+    NONRESET_SETTINGS_FIELDS = frozenset(
+        {
+            "cbtime",
+            "contiguous_reads",
+            "chunking",
+            "gap_policy",
+            "gap_tolerance",
+            "rate_correction",
+            "max_rate_slew",
+            "cmp_configs",
+        }
+    )
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # zero_copy only (the ring is lock-free): guards the open pool slot's
+        # read/fill cursors, slot switches and the pool_* counters. Held briefly
+        # by the receive thread (commit / switch) and the asyncio loop (taking a
+        # view and advancing ``pool_read``).
+        self._pool_lock = threading.Lock()
+        self._overrun_callback: typing.Callable[[BufferOverrun], None] | None = None
+        self._reported_overruns = 0
+        self._read_commit_ns = 0  # latency_stats: commit_ns taken by the last _next_message read
+
+    def set_overrun_callback(self, cb: typing.Callable[[BufferOverrun], None]) -> None:
+        """Inject the unit's overrun emitter (see :meth:`set_status_callback`)."""
+        self._overrun_callback = cb
+
     def _apply_slice_configure(self, cfg: SliceConfig) -> None:
         sess = self.state.session
         if sess is None:
@@ -496,7 +1028,7 @@ class CereLinkSignalProducer(_CereLinkBaseProducer[CereLinkSignalSettings, CereL
             return
         n_ch = len(channels)
         fs = rate.hz
-        buff_samples = max(1, int(self.settings.cont_buffer_dur * fs))
+        buff_samples = self.settings.buffer_samples
 
         scale_factors = self._compute_scale_factors(channels)
         ch_info = self._build_ch_info(channels)
@@ -515,32 +1047,53 @@ class CereLinkSignalProducer(_CereLinkBaseProducer[CereLinkSignalSettings, CereL
         )
 
         st = self.state
-        st.buffer_data = np.zeros((buff_samples, n_ch), dtype=np.int16)
-        st.buffer_timestamps = np.zeros(buff_samples, dtype=np.uint64)
-        st.write_idx = 0
-        st.read_idx = 0
+        dtype = self.settings.sample_dtype
+        if self.settings.zero_copy:
+            st.pool = ChunkPool(_ZERO_COPY_SLOTS, buff_samples, n_ch, dtype)
+            st.pool_slot = 0
+            st.pool_read = 0
+            st.pool_fill = 0
+            st.ring = None
+        else:
+            st.pool = None
+            st.ring = SPSCRing(
+                buff_samples,
+                [((n_ch,), dtype), ((), np.uint64)],
+                policy=self.settings.overflow_policy,
+            )
+        st.pool_overruns = 0
+        st.pool_dropped = 0
+        st.pool_pending_drop = 0
+        st.pool_error = None
+        st.pending_since = None
+        st.last_timestamp = None
+        st.carry = None
+        st.discontinuities = 0
+        st.missing_samples = 0
+        st.next_offset = None
+        st.overruns = 0
+        st.dropped_samples = 0
+        self._reported_overruns = 0
         st.n_channels = n_ch
         st.template = template
         st.scale_factors = scale_factors
+        st.write_scale = scale_factors.astype(dtype)[None, :] if self.settings.microvolts else None
         st.data_event = asyncio.Event()
+        st.wake_pending = False
+        st.commit_ns = 0
+        st.latency = None
+        if self.settings.latency_stats is not None:
+            st.latency = LatencyTracker(rate.name, _SIGNAL_LATENCY_STAGES, self.settings.latency_stats)
+        st.received_samples = st.callbacks = 0
+        self._start_stats(loop)
+        st.messages = st.work_event = None
+        if self.settings.assembly_queue:
+            self._start_worker(loop)
 
         @st.session.on_group_batch(rate)
         def _on_group_batch(samples, timestamps):
             self._handle_group_batch(samples, timestamps, loop)
 
-    def _compute_scale_factors(self, channels: list[int]) -> np.ndarray:
-        sfs = []
-        for ch_id in channels:
-            scaling = self.state.session.get_channel_scaling(ch_id)
-            if scaling and scaling["digmax"] != scaling["digmin"]:
-                sf = (scaling["anamax"] - scaling["anamin"]) / (scaling["digmax"] - scaling["digmin"])
-                if scaling["anaunit"] == "mV":
-                    sf *= 1000  # mV -> uV
-                sfs.append(sf)
-            else:
-                sfs.append(1.0)
-        return np.array(sfs, dtype=np.float64)
-
     def _handle_group_batch(
         self,
         samples: np.ndarray,
@@ -548,33 +1101,200 @@ class CereLinkSignalProducer(_CereLinkBaseProducer[CereLinkSignalSettings, CereL
         loop: asyncio.AbstractEventLoop,
     ) -> None:
         st = self.state
+        entry_ns = time.monotonic_ns() if st.latency is not None else 0
         n_ch = st.n_channels
         if samples.shape[1] > n_ch:
             samples = samples[:, :n_ch]  # drop dword-padding columns
-        w = st.write_idx
-        n = len(timestamps)
-        buff_len = len(st.buffer_timestamps)
-        end = w + n
-        if end <= buff_len:
-            st.buffer_data[w:end, :] = samples
-            st.buffer_timestamps[w:end] = timestamps
+        if st.pool is not None:
+            self._write_pool(samples, timestamps)
         else:
-            first = buff_len - w
-            st.buffer_data[w:buff_len, :] = samples[:first]
-            st.buffer_timestamps[w:buff_len] = timestamps[:first]
-            rest = n - first
-            st.buffer_data[:rest, :] = samples[first:]
-            st.buffer_timestamps[:rest] = timestamps[first:]
-        st.write_idx = end % buff_len
-        if loop.is_running():
-            loop.call_soon_threadsafe(st.data_event.set)
+            self._write_ring(samples, timestamps)
+        if entry_ns and len(timestamps):
+            self._record_commit(entry_ns, int(timestamps[-1]))
+        st.received_samples += len(timestamps)
+        st.callbacks += 1
+        work_event = st.work_event  # read once: teardown may clear it concurrently
+        if work_event is not None:
+            work_event.set()  # the worker wakes the loop once a message is built
         else:
-            st.data_event.set()
+            self._wake(loop)
+
+    def _record_commit(self, entry_ns: int, device_ns: int) -> None:
+        """Receive thread, ``latency_stats`` only: time the batch from its
+        last sample's device timestamp to the callback and on to the commit."""
+        st = self.state
+        commit_ns = time.monotonic_ns()
+        st.latency.record("callback_to_commit", commit_ns - entry_ns)
+        host_ns = self._host_ns(device_ns)
+        if host_ns is not None:
+            st.latency.record("device_to_callback", entry_ns - host_ns)
+        if not st.commit_ns:
+            st.commit_ns = commit_ns
+
+    def _record_publish(self, msg: AxisArray, wake_ns: int, commit_ns: int) -> None:
+        """``latency_stats`` only: time *msg* from the ``_produce`` wake-up
+        that found it (and from the oldest commit it contains) to its return,
+        and end to end from its last sample's device timestamp."""
+        st = self.state
+        publish_ns = time.monotonic_ns()
+        if commit_ns:
+            st.latency.record("commit_to_wake", wake_ns - commit_ns)
+        st.latency.record("wake_to_publish", publish_ns - wake_ns)
+        time_ax = msg.axes["time"]
+        last = time_ax.offset + time_ax.gain * (msg.data.shape[0] - 1)
+        if self.settings.cbtime:
+            host_ns = self._host_ns(round(last * 1e9))
+        else:
+            host_ns = round(last * 1e9) if st.clock.ready else None
+        if host_ns is not None:
+            st.latency.record("device_to_publish", publish_ns - host_ns)
+        self._report_latency()
+
+    def _write_ring(self, samples: np.ndarray, timestamps: np.ndarray) -> None:
+        """Place one batch in the ring (scaling in the same pass) and publish it
+        with a single commit."""
+        ring = self.state.ring
+        scale = self.state.write_scale
+        regions = ring.reserve(len(timestamps))
+        data, ts = ring.columns()
+        for src, dst in regions:
+            store_samples(data[dst], samples[src], scale)
+            ts[dst] = timestamps[src]
+        ring.commit()
+
+    def _write_pool(self, samples: np.ndarray, timestamps: np.ndarray) -> None:
+        """Append one batch to the open pool slot, scaling in the same pass.
+
+        Rows at or past ``pool_fill`` belong to the receive thread, so the common
+        case writes without the lock and only publishes the new fill under it.
+        When the batch doesn't fit, the writer moves to a free slot (growing the
+        pool if subscribers hold every slot), carrying the not-yet-emitted rows
+        along so one read never spans two slots.
+        """
+        st = self.state
+        pool = st.pool
+        n = len(timestamps)
+        scale = st.write_scale
+        with self._pool_lock:
+            slot, start, fill = st.pool_slot, st.pool_read, st.pool_fill
+        if fill + n <= pool.capacity:
+            self._fill_pool_rows(slot, fill, samples, timestamps, scale)
+            with self._pool_lock:
+                st.pool_fill = fill + n
+            return
+
+        with self._pool_lock:
+            slot, start, fill = st.pool_slot, st.pool_read, st.pool_fill
+            new_slot = pool.acquire(exclude=slot)
+            if (fill - start) + n > pool.capacity:
+                # The loop fell more than a slot behind (GROW is rejected with
+                # zero_copy, so DROP_OLDEST or ERROR applies).
+                st.pool_overruns += 1
+                if self.settings.overflow_policy is OverflowPolicy.ERROR:
+                    st.pool_error = f"zero_copy slot overrun: {fill - start + n} unread of {pool.capacity}"
+                    st.pool_dropped += n
+                    return
+                drop = fill - start + n - pool.capacity
+                st.pool_dropped += drop
+                st.pool_pending_drop += drop
+                if n >= pool.capacity:
+                    samples, timestamps = samples[-pool.capacity :], timestamps[-pool.capacity :]
+                    n = pool.capacity
+                    start = fill
+                else:
+                    start += drop
+            carry = fill - start
+            if start < fill:
+                pool.data[new_slot][:carry] = pool.data[slot][start:fill]
+                pool.timestamps[new_slot][:carry] = pool.timestamps[slot][start:fill]
+            self._fill_pool_rows(new_slot, carry, samples, timestamps, scale)
+            st.pool_slot, st.pool_read, st.pool_fill = new_slot, 0, carry + n
+
+    def _fill_pool_rows(
+        self,
+        slot: int,
+        row: int,
+        samples: np.ndarray,
+        timestamps: np.ndarray,
+        scale: np.ndarray | None,
+    ) -> None:
+        pool = self.state.pool
+        n = len(timestamps)
+        store_samples(pool.data[slot][row : row + n], samples, scale)
+        pool.timestamps[slot][row : row + n] = timestamps
 
     def _on_teardown_pre_close(self) -> None:
+        self._stop_worker()
         if self.state.data_event is not None:
             self.state.data_event.set()
 
+    def _start_worker(self, loop: asyncio.AbstractEventLoop) -> None:
+        st = self.state
+        st.messages = queue.Queue(self.settings.assembly_queue)
+        st.work_event = threading.Event()
+        st.worker = threading.Thread(
+            target=self._assemble_loop,
+            args=(st.work_event, st.messages, loop),
+            name=f"cerelink-assembly-{self.settings.subscribe_rate.name}",
+            daemon=True,
+        )
+        st.worker.start()
+
+    async def _teardown_state(self) -> None:
+        # The worker can take up to one ``put`` timeout to notice it was
+        # stopped, so join it off the event loop.
+        worker = self._signal_worker_stop()
+        if worker is not None:
+            await asyncio.to_thread(worker.join)
+        await super()._teardown_state()
+
+    def _stop_worker(self) -> None:
+        worker = self._signal_worker_stop()
+        if worker is not None:
+            worker.join(_WORKER_JOIN_TIMEOUT)
+
+    def _signal_worker_stop(self) -> threading.Thread | None:
+        """Tell the assembly worker to exit and return it for joining (None
+        when there is none). The receive thread may still be delivering
+        batches, so ``work_event`` stays in place until the next
+        ``_setup_subscription`` replaces it."""
+        st = self.state
+        worker, st.worker = st.worker, None
+        if worker is not None:
+            st.work_event.set()
+        return worker
+
+    def _assemble_loop(self, work_event: threading.Event, messages: queue.Queue, loop) -> None:
+        """Worker thread (``assembly_queue > 0``): build messages as data
+        arrives and queue them for ``_produce``. Stops when ``_stop_worker``
+        clears ``state.worker``, or after queueing a buffer error."""
+        st = self.state
+        worker = threading.current_thread()
+        while st.worker is worker:
+            work_event.clear()  # cleared before checking, so no wake-up is lost
+            try:
+                msg, timeout = self._next_message()
+            except BufferOverrunError as exc:
+                msg, timeout = exc, None
+            if msg is None:
+                work_event.wait(timeout)
+                continue
+            while st.worker is worker:
+                try:
+                    messages.put((msg, self._read_commit_ns), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue  # backpressure: the buffer absorbs it meanwhile
+            self._wake(loop)
+            if isinstance(msg, BaseException):
+                return
+
+    @property
+    def queue_depth(self) -> int:
+        """Messages built by the ``assembly_queue`` worker and not yet taken
+        by ``_produce`` (always 0 without it)."""
+        return self.state.messages.qsize() if self.state.messages is not None else 0
+
     def _on_channel_maps_reloaded(self) -> None:
         rate = self.settings.subscribe_rate
         channels = self.state.session.get_group_channels(int(rate))
@@ -585,50 +1305,255 @@ class CereLinkSignalProducer(_CereLinkBaseProducer[CereLinkSignalSettings, CereL
         old = self.state.template
         self.state.template = replace(old, axes={**old.axes, "ch": new_ch_ax})
 
+    def _n_unread(self) -> int:
+        st = self.state
+        if st.pool is not None:
+            return st.pool_fill - st.pool_read
+        return len(st.ring)
+
+    def _read_ring(self, max_n: int | None = None) -> tuple[np.ndarray, np.ndarray, int] | None:
+        """Copy out everything committed (up to the ring end unless reads are
+        contiguous), with the number of samples DROP_OLDEST skipped just
+        before it."""
+        contiguous = self.settings.contiguous_reads or self.settings.chunking.active
+        got = self.state.ring.read(max_n, stop_at_wrap=not contiguous)
+        if got is None:
+            return None
+        (out_dat, ts_batch), _, skipped = got
+        return out_dat, ts_batch, skipped
+
+    def _read_pool(self, max_n: int | None = None) -> tuple[np.ndarray, np.ndarray, int] | None:
+        """Read-only view of the open slot's unread rows (no copy, no arithmetic).
+
+        The view is taken under the lock so the slot can't be recycled between
+        snapshotting the cursors and the view taking its reference.
+        """
+        st = self.state
+        with self._pool_lock:
+            slot, start, fill = st.pool_slot, st.pool_read, st.pool_fill
+            if start == fill:
+                return None
+            if max_n is not None:
+                fill = min(fill, start + max_n)
+            out_dat = st.pool.view(slot, start, fill)
+            ts_batch = st.pool.timestamps[slot][start:fill]
+            st.pool_read = fill
+            skipped, st.pool_pending_drop = st.pool_pending_drop, 0
+        return out_dat, ts_batch, skipped
+
+    def _read_chunk(self) -> tuple[np.ndarray, np.ndarray, int] | None:
+        """Read the next chunk :attr:`CereLinkSignalSettings.chunking` allows, or
+        None if it isn't ready yet."""
+        st = self.state
+        policy = self.settings.chunking
+        read = self._read_pool if st.pool is not None else self._read_ring
+        if not policy.active:
+            return read()
+        n = self._n_unread()
+        if n == 0:
+            st.pending_since = None
+            return None
+        ready = policy.block and n >= policy.block
+        if not ready and policy.max_latency is not None:
+            now = time.monotonic()
+            if st.pending_since is None:
+                st.pending_since = now
+            ready = now - st.pending_since >= policy.max_latency
+        if not ready:
+            return None
+        st.pending_since = None
+        return read(policy.fixed_samples or None)
+
+    def _sync_overrun_counters(self) -> None:
+        st = self.state
+        if st.ring is not None:
+            st.overruns, st.dropped_samples = st.ring.overruns, st.ring.dropped
+            error = st.ring.error
+        else:
+            st.overruns, st.dropped_samples = st.pool_overruns, st.pool_dropped
+            error = st.pool_error
+        if st.overruns != self._reported_overruns and st.worker is None:
+            self._report_overruns()  # with a worker, _produce reports from the loop
+        if error is not None:
+            raise BufferOverrunError(f"CereLink {self.settings.subscribe_rate.name}: {error}")
+
     async def _produce(self) -> AxisArray | None:
         st = self.state
         if st.session is None or st.n_channels == 0:
             await asyncio.sleep(0.1)
             return None
         while True:
-            read_idx = st.read_idx
-            write_idx = st.write_idx
-            buff_len = len(st.buffer_timestamps)
-            read_term = write_idx if write_idx >= read_idx else buff_len
-            if read_idx == read_term:
-                st.data_event.clear()
-                await st.data_event.wait()
-                if st.session is None:  # closed while waiting
-                    return None
-                continue
-
-            read_slice = slice(read_idx, read_term)
-            out_dat = st.buffer_data[read_slice].copy()
-            if self.settings.microvolts:
-                out_dat = out_dat * st.scale_factors[None, :]
+            wake_ns = time.monotonic_ns() if st.latency is not None else 0
+            self._clear_wake()  # cleared before checking, so no wake-up is lost
+            if st.messages is not None:
+                (msg, commit_ns), timeout = self._take_message(), None
+            else:
+                msg, timeout = self._next_message()
+                commit_ns = self._read_commit_ns
+            if msg is not None:
+                self._count_message(msg.data.shape[0])
+                if wake_ns:
+                    self._record_publish(msg, wake_ns, commit_ns)
+                return msg
+            try:
+                await asyncio.wait_for(st.data_event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            if st.session is None:  # closed while waiting
+                return None
 
-            ts_batch = st.buffer_timestamps[read_slice]
-            if self.settings.cbtime:
-                new_offset = int(ts_batch[0]) / 1e9
+    def _take_message(self) -> tuple[AxisArray | None, int]:
+        """``assembly_queue`` mode: the next message the worker built, if any,
+        with the commit time its read took (see :meth:`_next_message`)."""
+        st = self.state
+        if st.overruns != self._reported_overruns:
+            self._report_overruns()
+        try:
+            msg, commit_ns = st.messages.get_nowait()
+        except queue.Empty:
+            return None, 0
+        if isinstance(msg, BaseException):
+            raise msg
+        return msg, commit_ns
+
+    def _next_message(self) -> tuple[AxisArray | None, float | None]:
+        """Read the next chunk and build its message. Returns ``(message,
+        None)``, or ``(None, timeout)`` when nothing is ready: wait for more
+        data, but at most *timeout* seconds (None = no limit).
+
+        With ``latency_stats``, a read also takes the oldest pending commit
+        time into ``_read_commit_ns`` (0 when it had none)."""
+        st = self.state
+        self._read_commit_ns = 0
+        if st.carry is not None:
+            batch, st.carry = st.carry, None
+        else:
+            batch = self._read_chunk()
+            self._sync_overrun_counters()
+            if batch is not None and st.latency is not None:
+                self._read_commit_ns, st.commit_ns = st.commit_ns, 0
+        if batch is None:
+            timeout = None
+            if st.pending_since is not None and self.settings.chunking.max_latency is not None:
+                timeout = st.pending_since + self.settings.chunking.max_latency - time.monotonic()
+            return None, timeout
+        return self._build_message(*batch), None
+
+    def _build_message(self, out_dat: np.ndarray, ts_batch: np.ndarray, skipped: int) -> AxisArray:
+        st = self.state
+        gaps = None
+        if self.settings.gap_policy is not GapPolicy.IGNORE:
+            out_dat, ts_batch, gaps = self._check_gaps(out_dat, ts_batch)
+        template = st.template
+        time_ax = template.axes["time"]
+        if self.settings.cbtime:
+            new_time_ax = replace(time_ax, offset=int(ts_batch[0]) / 1e9)
+            if st.latency is not None:
+                # Keeps the clock model behind the device_* stages fresh.
+                st.clock.span_to_monotonic(int(ts_batch[0]), int(ts_batch[-1]))
+        else:
+            # First and last sample only: the span advances the stream's
+            # monotonic floor to this message's end.
+            span = st.clock.span_to_monotonic(
+                int(ts_batch[0]), int(ts_batch[-1]), stream_id=int(self.settings.subscribe_rate)
+            )
+            if span is None:
+                st.next_offset = None
+                new_time_ax = replace(time_ax, offset=time.monotonic() - time_ax.gain * len(out_dat))
+            elif self.settings.rate_correction:
+                contiguous = not skipped and (gaps is None or not len(gaps) or gaps[0] != 0)
+                new_time_ax = self._corrected_time_axis(time_ax, span[0], len(out_dat), contiguous)
             else:
-                # Must convert entire batch for monotonicity.
-                offsets = device_to_monotonic_batch_offsets(
-                    st.session, ts_batch, stream_id=int(self.settings.subscribe_rate)
-                )
-                if offsets is not None:
-                    new_offset = offsets[0]
-                else:
-                    new_offset = time.monotonic() - st.template.axes["time"].gain * len(out_dat)
-
-            template = st.template
-            new_time_ax = replace(template.axes["time"], offset=new_offset)
-            result = replace(
-                template,
-                data=out_dat,
-                axes={**template.axes, "time": new_time_ax},
+                new_time_ax = replace(time_ax, offset=span[0])
+
+        attrs = {**template.attrs, "dropped_samples": skipped} if skipped else template.attrs
+        if gaps is not None and len(gaps):
+            attrs = {**attrs, "discontinuities": gaps, "discontinuity_count": st.discontinuities}
+        return replace(
+            template,
+            data=out_dat,
+            axes={**template.axes, "time": new_time_ax},
+            attrs=attrs,
+        )
+
+    def _corrected_time_axis(
+        self, time_ax: AxisArray.LinearAxis, measured: float, n: int, contiguous: bool
+    ) -> AxisArray.LinearAxis:
+        """Tile onto the previous message and bend the drift-corrected period
+        (within ``max_rate_slew``) so the message ends where the device
+        timestamps say it should."""
+        st = self.state
+        period = time_ax.gain * (1.0 + st.clock.drift)
+        offset = st.next_offset
+        if offset is None or not contiguous or abs(measured - offset) > _RATE_REANCHOR_S:
+            offset = measured  # first message, gap or re-sync: start over on the measurement
+        slew = self.settings.max_rate_slew
+        gain = (measured + n * period - offset) / n
+        gain = min(max(gain, period * (1.0 - slew)), period * (1.0 + slew))
+        st.next_offset = offset + n * gain
+        return replace(time_ax, offset=offset, gain=gain)
+
+    def _check_gaps(self, out_dat: np.ndarray, ts_batch: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Find rows whose timestamp doesn't follow its predecessor's by one
+        period (the first row is checked against the previous message). Under
+        ``SPLIT``, rows from the first gap past row 0 are carried to the next
+        message. Returns the rows to emit and the gap indices within them."""
+        st = self.state
+        period = 1e9 / self.settings.subscribe_rate.hz
+        ts = ts_batch.view(np.int64)
+        if st.last_timestamp is None:
+            deltas = np.diff(ts)
+            offset = 1
+        else:
+            deltas = np.diff(ts, prepend=st.last_timestamp)
+            offset = 0
+        bad = np.abs(deltas - period) > self.settings.gap_tolerance * period
+        gaps = np.flatnonzero(bad) + offset
+        if self.settings.gap_policy is GapPolicy.SPLIT and len(gaps) and gaps[-1] > 0:
+            cut = int(gaps[gaps > 0][0])
+            st.carry = (out_dat[cut:], ts_batch[cut:], 0)
+            out_dat, ts_batch = out_dat[:cut], ts_batch[:cut]
+            gaps = gaps[gaps < cut]
+        if len(gaps):
+            steps = deltas[gaps - offset]
+            st.discontinuities += len(gaps)
+            st.missing_samples += int(np.maximum(np.rint(steps / period) - 1, 0).sum())
+        st.last_timestamp = int(ts[len(ts_batch) - 1])
+        return out_dat, ts_batch, gaps
+
+    def _stats_counts(self) -> tuple[int, int]:
+        return self.state.received_samples, self.state.callbacks
+
+    def _collect_stats(self, period: float, **common) -> SourceStats:
+        st = self.state
+        if st.ring is not None:
+            capacity, overruns, dropped = st.ring.capacity, st.ring.overruns, st.ring.dropped
+        else:
+            capacity, overruns, dropped = st.pool.capacity, st.pool_overruns, st.pool_dropped
+        return SourceStats(
+            stream=self.settings.subscribe_rate.name,
+            period=period,
+            buffer_fill=self._n_unread() / capacity,
+            overruns=overruns,
+            dropped=dropped,
+            queue_depth=self.queue_depth,
+            **common,
+        )
+
+    def _report_overruns(self) -> None:
+        st = self.state
+        self._reported_overruns = st.overruns
+        if self._overrun_callback is None:
+            return
+        buff_len = st.pool.capacity if st.pool is not None else st.ring.capacity
+        self._overrun_callback(
+            BufferOverrun(
+                policy=self.settings.overflow_policy,
+                overruns=st.overruns,
+                dropped_samples=st.dropped_samples,
+                buffer_samples=buff_len,
             )
-            st.read_idx = read_term % buff_len
-            return result
+        )
 
 
 class CereLinkSignalSource(BaseProducerUnit[CereLinkSignalSettings, AxisArray, CereLinkSignalProducer]):
@@ -636,16 +1561,25 @@ class CereLinkSignalSource(BaseProducerUnit[CereLinkSignalSettings, AxisArray, C
 
     SETTINGS = CereLinkSignalSettings
     OUTPUT_DEVICE_STATUS = ez.OutputStream(DeviceStatus)
+    OUTPUT_OVERRUN = ez.OutputStream(BufferOverrun)
+    OUTPUT_LATENCY = ez.OutputStream(LatencyStats)
+    OUTPUT_STATS = ez.OutputStream(SourceStats)
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        # Init in __init__ (not initialize) so the queue exists before
-        # device_status's coroutine could attach.
+        # Init in __init__ (not initialize) so the queues exist before
+        # the publisher coroutines could attach.
         self._status_queue: asyncio.Queue[DeviceStatus] = asyncio.Queue()
+        self._overrun_queue: asyncio.Queue[BufferOverrun] = asyncio.Queue()
+        self._latency_queue: asyncio.Queue[LatencyStats] = asyncio.Queue()
+        self._stats_queue: asyncio.Queue[SourceStats] = asyncio.Queue()
 
     def create_producer(self) -> None:
         super().create_producer()
         self.producer.set_status_callback(self._status_queue.put_nowait)
+        self.producer.set_overrun_callback(self._overrun_queue.put_nowait)
+        self.producer.set_latency_callback(self._latency_queue.put_nowait)
+        self.producer.set_stats_callback(self._stats_queue.put_nowait)
 
     def shutdown(self) -> None:
         self.producer.close()
@@ -656,32 +1590,298 @@ class CereLinkSignalSource(BaseProducerUnit[CereLinkSignalSettings, AxisArray, C
             status = await self._status_queue.get()
             yield self.OUTPUT_DEVICE_STATUS, status
 
+    @ez.publisher(OUTPUT_OVERRUN)
+    async def overrun(self) -> typing.AsyncGenerator:
+        while True:
+            report = await self._overrun_queue.get()
+            yield self.OUTPUT_OVERRUN, report
+
+    @ez.publisher(OUTPUT_LATENCY)
+    async def latency(self) -> typing.AsyncGenerator:
+        while True:
+            report = await self._latency_queue.get()
+            yield self.OUTPUT_LATENCY, report
+
+    @ez.publisher(OUTPUT_STATS)
+    async def stats(self) -> typing.AsyncGenerator:
+        while True:
+            report = await self._stats_queue.get()
+            yield self.OUTPUT_STATS, report
+
+
+# --- Multi-rate producer/source ------------------------------------------
+#
+# One Session, several sample groups. Each rate is served by a
+# `CereLinkSignalProducer` that never opens a Session of its own: the
+# multi-rate producer opens, configures and clock-syncs the device once, then
+# hands the shared Session (and clock model) to every stream's
+# `_setup_subscription`. Each stream keeps its own ring and template.
+
+
+_RATE_OUTPUTS = {
+    SampleRate.SR_500: "OUTPUT_SR_500",
+    SampleRate.SR_1kHz: "OUTPUT_SR_1kHz",
+    SampleRate.SR_2kHz: "OUTPUT_SR_2kHz",
+    SampleRate.SR_10kHz: "OUTPUT_SR_10kHz",
+    SampleRate.SR_30kHz: "OUTPUT_SR_30kHz",
+    SampleRate.SR_RAW: "OUTPUT_SR_RAW",
+}
+
+
+@processor_state
+class CereLinkMultiRateProducerState(_CereLinkSharedState):
+    """Per-rate stream producers sharing this state's Session."""
+
+    streams: dict | None = None  # SampleRate -> CereLinkSignalProducer (subscribed, non-empty)
+    pending: dict | None = None  # SampleRate -> asyncio.Task running that stream's _produce
+
+
+class CereLinkMultiRateProducer(_CereLinkBaseProducer[CereLinkMultiRateSettings, CereLinkMultiRateProducerState]):
+    """Streams several continuous sample-groups from one Session.
+
+    Each call returns ``(rate, AxisArray)`` for whichever stream has a message
+    ready first; :class:`CereLinkMultiRateSource` routes it to that rate's output.
+    """
+
+    NONRESET_SETTINGS_FIELDS = frozenset({"cmp_configs"})
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._overrun_callback: typing.Callable[[BufferOverrun], None] | None = None
+
+    def set_overrun_callback(self, cb: typing.Callable[[BufferOverrun], None]) -> None:
+        """Inject the unit's overrun emitter; every stream reports through it."""
+        self._overrun_callback = cb
+
+    def _make_streams(self) -> dict:
+        streams = {}
+        for stream_settings in self.settings.streams:
+            child = CereLinkSignalProducer(
+                settings=dc_replace(stream_settings, device_type=self.settings.device_type, cmp_configs=())
+            )
+            child.set_overrun_callback(self._report_stream_overrun)
+            child.set_latency_callback(self._report_stream_latency)
+            child.set_stats_callback(self._report_stream_stats)
+            streams[stream_settings.subscribe_rate] = child
+        return streams
+
+    def _report_stream_overrun(self, report: BufferOverrun) -> None:
+        if self._overrun_callback is not None:
+            self._overrun_callback(report)
+
+    def _report_stream_latency(self, report: LatencyStats) -> None:
+        if self._latency_callback is not None:
+            self._latency_callback(report)
+
+    def _report_stream_stats(self, report: SourceStats) -> None:
+        if self._stats_callback is not None:
+            self._stats_callback(report)
+
+    async def _open_and_configure(self) -> None:
+        # Built here, on the event loop; ``_apply_configure`` (a worker thread)
+        # only attaches them to the Session.
+        self.state.streams = self._make_streams()
+        await super()._open_and_configure()
+
+    def _apply_configure(self) -> None:
+        for child in self.state.streams.values():
+            child.state.session = self.state.session
+        if isinstance(self.settings.configure, CcfConfig):
+            self.state.session.load_ccf_sync(self.settings.configure.path)
+        for child in self.state.streams.values():
+            if isinstance(child.settings.configure, SliceConfig):
+                child._apply_slice_configure(child.settings.configure)
+
+    def _setup_subscription(self, loop: asyncio.AbstractEventLoop) -> None:
+        st = self.state
+        for rate, child in list(st.streams.items()):
+            child.state.ch_positions = st.ch_positions
+            child.state.clock = st.clock
+            child._setup_subscription(loop)
+            if child.state.n_channels == 0:
+                logger.warning("CereLink: no channels in sample group %s; its output stays silent.", rate.name)
+                del st.streams[rate]
+        st.pending = {}
+
+    def _on_channel_maps_reloaded(self) -> None:
+        for child in (self.state.streams or {}).values():
+            child.state.ch_positions = self.state.ch_positions
+            child._on_channel_maps_reloaded()
+
+    def _on_teardown_pre_close(self) -> None:
+        st = self.state
+        for task in (st.pending or {}).values():
+            task.cancel()
+        st.pending = None
+        for child in (st.streams or {}).values():
+            child.state.session = None
+            child._stop_stats()
+            child._on_teardown_pre_close()
+        st.streams = None
+
+    async def _produce(self) -> tuple[SampleRate, AxisArray] | None:
+        st = self.state
+        if st.session is None or not st.streams:
+            await asyncio.sleep(0.1)
+            return None
+        pending = st.pending
+        for rate, child in st.streams.items():
+            if rate not in pending:
+                pending[rate] = asyncio.ensure_future(child._produce())
+        done, _ = await asyncio.wait(pending.values(), return_when=asyncio.FIRST_COMPLETED)
+        if st.pending is not pending:
+            return None  # torn down while waiting; the tasks were cancelled
+        for rate, task in list(pending.items()):
+            if task in done:
+                del pending[rate]
+                msg = task.result()  # re-raises e.g. BufferOverrunError
+                if msg is not None:
+                    return rate, msg
+        return None
+
+
+class CereLinkMultiRateSource(ez.Unit):
+    """ezmsg Unit that streams several continuous sample-groups from one
+    Blackrock Session, publishing each rate on its ``OUTPUT_<rate>`` stream.
+
+    Not a ``BaseProducerUnit``: the producer emits ``(rate, AxisArray)``
+    pairs, which are routed here to the per-rate outputs, so there is no
+    single ``OUTPUT_SIGNAL``. Settings updates work as for the other sources."""
+
+    SETTINGS = CereLinkMultiRateSettings
+    INPUT_SETTINGS = ez.InputStream(CereLinkMultiRateSettings)
+    OUTPUT_SR_500 = ez.OutputStream(AxisArray)
+    OUTPUT_SR_1kHz = ez.OutputStream(AxisArray)
+    OUTPUT_SR_2kHz = ez.OutputStream(AxisArray)
+    OUTPUT_SR_10kHz = ez.OutputStream(AxisArray)
+    OUTPUT_SR_30kHz = ez.OutputStream(AxisArray)
+    OUTPUT_SR_RAW = ez.OutputStream(AxisArray)
+    OUTPUT_DEVICE_STATUS = ez.OutputStream(DeviceStatus)
+    OUTPUT_OVERRUN = ez.OutputStream(BufferOverrun)
+    OUTPUT_LATENCY = ez.OutputStream(LatencyStats)
+    OUTPUT_STATS = ez.OutputStream(SourceStats)
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._status_queue: asyncio.Queue[DeviceStatus] = asyncio.Queue()
+        self._overrun_queue: asyncio.Queue[BufferOverrun] = asyncio.Queue()
+        self._latency_queue: asyncio.Queue[LatencyStats] = asyncio.Queue()
+        self._stats_queue: asyncio.Queue[SourceStats] = asyncio.Queue()
+
+    async def initialize(self) -> None:
+        self.create_producer()
+
+    def create_producer(self) -> None:
+        previous = getattr(self, "producer", None)
+        if previous is not None:
+            previous.close()
+        self.producer = CereLinkMultiRateProducer(settings=self.SETTINGS)
+        self.producer.set_status_callback(self._status_queue.put_nowait)
+        self.producer.set_overrun_callback(self._overrun_queue.put_nowait)
+        self.producer.set_latency_callback(self._latency_queue.put_nowait)
+        self.producer.set_stats_callback(self._stats_queue.put_nowait)
+
+    def shutdown(self) -> None:
+        self.producer.close()
+
+    @ez.subscriber(INPUT_SETTINGS)
+    async def on_settings(self, msg: CereLinkMultiRateSettings) -> None:
+        self.apply_settings(msg)
+        self.producer.update_settings(self.SETTINGS)
+
+    @ez.publisher(OUTPUT_SR_500)
+    @ez.publisher(OUTPUT_SR_1kHz)
+    @ez.publisher(OUTPUT_SR_2kHz)
+    @ez.publisher(OUTPUT_SR_10kHz)
+    @ez.publisher(OUTPUT_SR_30kHz)
+    @ez.publisher(OUTPUT_SR_RAW)
+    async def produce(self) -> typing.AsyncGenerator:
+        while True:
+            out = await self.producer.__acall__()
+            if out is not None:
+                rate, msg = out
+                yield getattr(self, _RATE_OUTPUTS[rate]), msg
+
+    @ez.publisher(OUTPUT_DEVICE_STATUS)
+    async def device_status(self) -> typing.AsyncGenerator:
+        while True:
+            status = await self._status_queue.get()
+            yield self.OUTPUT_DEVICE_STATUS, status
+
+    @ez.publisher(OUTPUT_OVERRUN)
+    async def overrun(self) -> typing.AsyncGenerator:
+        while True:
+            report = await self._overrun_queue.get()
+            yield self.OUTPUT_OVERRUN, report
+
+    @ez.publisher(OUTPUT_LATENCY)
+    async def latency(self) -> typing.AsyncGenerator:
+        while True:
+            report = await self._latency_queue.get()
+            yield self.OUTPUT_LATENCY, report
+
+    @ez.publisher(OUTPUT_STATS)
+    async def stats(self) -> typing.AsyncGenerator:
+        while True:
+            report = await self._stats_queue.get()
+            yield self.OUTPUT_STATS, report
+
 
 # --- Spike producer/source -----------------------------------------------
 #
-# Spikes are emitted as `AxisArray[time, ch, unit=7]` on a regular cadence
-# (`spike_buffer_dur`), with `time` at the device's 30 kHz spike clock and
+# Spikes are emitted as `AxisArray[time, ch, unit=7]` in windows that tile
+# device time (`spike_buffer_dur` each), with `time` at the device's 30 kHz spike clock and
 # `unit` indexing the device convention: 0=unsorted, 1..5=sorted, 6=noise.
 
 
-_SPIKE_FS = 30000  # device spike clock — fixed by the protocol
-_NS_PER_SECOND = 1_000_000_000
 _SPIKE_STREAM_ID = 100  # monotonicity stream_id, distinct from sample-rate ids (1..6)
-_UNIT_LABELS = np.array(["unsorted", "1", "2", "3", "4", "5", "noise"], dtype="U8")
 _SPKOPTS_EXTRACT = 1  # cbAINPSPK_EXTRACT bit in SPKOPTS — spike extraction enabled
+# SpikeFormat.SPARSE columns; ``row`` indexes the window's time axis (a bin when ``bin_width`` is set).
+_SPIKE_EVENT_FIELDS = (("row", np.int64), ("ch", np.int64), ("unit", np.int64))
+_SPIKE_EVENTS_INITIAL = 4096  # SpikeFormat.SPARSE: events per window before the buffer grows
+_SPIKE_STAGE = 256  # raw spikes staged by the receive thread per ingested batch
+_SPIKE_LATENCY_STAGES = ("device_to_ingest", "window_end_to_publish")  # latency_stats
+# cbPKT_SPK payload: fPattern[3] (float32), nPeak, nValley (int16), then wave[] (int16).
+_SPK_WAVE_OFFSET = 16
+_SPK_MAX_SAMPLES = (1008 - _SPK_WAVE_OFFSET) // 2
+_WAVEFORM_DTYPE = np.dtype([("time", np.float64), ("ch", np.int32), ("unit", np.int16)])
+_ffi = cffi.FFI()  # only for ffi.buffer over the payload cdata pycbsdk hands the event callback
 
 
 @processor_state
 class CereLinkSpikeProducerState(_CereLinkSharedState):
-    """Spike-producer rolling buffer + emission template."""
+    """Spike-producer window ring + emission template."""
 
-    buffer: np.ndarray | None = None  # uint8 [N_t, n_ch, 7]
+    # Ring of ``spike_windows`` windows; window ``w`` lives in ``windows[w % len]``.
+    # Each is a uint8/uint16 [N_t / bin_samples, n_ch, n_units] array
+    # (SpikeFormat.DENSE) or an EventBuffer of (row, ch, unit) (SpikeFormat.SPARSE).
+    windows: list | None = None
+    spare: np.ndarray | EventBuffer | None = None  # cleared stand-in swapped in at each window boundary
     n_channels: int = 0
-    n_t: int = 0
+    n_t: int = 0  # spike-clock samples per window
+    bin_samples: int = 1  # spike-clock samples per output row
+    unit_lut: np.ndarray | None = None  # device unit bucket (0..6) -> output unit, -1 = dropped
     template: AxisArray | None = None
-    data_event: asyncio.Event | None = None
     chid_to_buffer_idx: dict | None = None  # 1-based chid -> column index
-    window_origin_ns: int = -1  # device ts (ns) at buffer[0]; -1 = not yet aligned
+    chid_lut: np.ndarray | None = None  # the same as an array; -1 = not subscribed (incl. the last entry)
+    # Raw (chid, type, time) columns staged by the receive thread (the ring's
+    # producer) and ingested under _buffer_lock (its consumer).
+    stage: SPSCRing | None = None
+    # ``waveforms=True`` only: (wave [n_samples] int16, time, chid, type) per
+    # spike, written by the receive thread and drained after each window.
+    waves: SPSCRing | None = None
+    wave_scale: np.ndarray | None = None  # float32 µV factor per ch column
+    wave_template: AxisArray | None = None
+    anchor_ns: int = -1  # device ts (ns) of window 0's first sample; -1 = not yet aligned
+    window_index: int = 0  # next window to emit
+    window_origin_ns: int = -1  # device ts (ns) at the next window's first sample
+    window_end_ns: int = -1  # ... and one past its last
+    device_now_ns: int = -1  # latest device timestamp seen
+    emit_deadline: float = 0.0  # pre-sync fallback: monotonic time by which the next window is emitted
+    late_spikes: int = 0  # behind an already-emitted window (cumulative)
+    early_spikes: int = 0  # beyond the ring (cumulative)
+    dropped_pending: int = 0  # drops not yet reported in a window's attrs
+    window_spikes: np.ndarray | None = None  # spikes counted into each ring slot (stats_interval)
 
 
 class CereLinkSpikeProducer(_CereLinkBaseProducer[CereLinkSpikeSettings, CereLinkSpikeProducerState]):
@@ -690,27 +1890,37 @@ class CereLinkSpikeProducer(_CereLinkBaseProducer[CereLinkSpikeSettings, CereLin
     Time axis is the device's 30 kHz spike clock; ``unit`` axis indexes the
     device convention (0=unsorted, 1..5=sorted, 6=noise — values >5 collapse
     into the noise bucket because the unit axis has fixed length 7).
-
-    Emission cadence is regular: every ``spike_buffer_dur`` seconds, one
-    window of shape ``[N_t, n_ch, 7]`` is emitted. Empty windows are emitted
-    too (downstream wants a steady time axis). The window before the first
-    spike is suppressed — there's no device-time anchor until then.
-
-    Spikes whose timestamp lands beyond the current window's range are
-    dropped (a downstream-backpressure failure mode); in normal operation
-    ``_produce`` runs at the buffer cadence and the buffer is large enough
-    to hold one window of spikes.
+    ``bin_width`` coarsens the time axis to whole bins of the spike clock and
+    ``unit_groups`` collapses the unit axis; both are applied as each spike is
+    counted.
+
+    Windows of shape ``[N_t, n_ch, 7]`` tile device time from the first
+    spike on, one per ``spike_buffer_dur``. Emission follows the device
+    clock, not a host timer: a window closes as soon as a device timestamp
+    past its end arrives (a spike, or a batch of the ``clock_rate`` group),
+    and at the latest ``max_latency`` after its end as mapped onto the host
+    clock by the clock model. The loop is only woken when a window becomes
+    ready, so short windows don't cost a wake-up per spike. Empty windows are emitted too (downstream wants a steady
+    time axis). The window before the first spike is suppressed — there's no
+    device-time anchor until then.
+
+    Spikes are binned into a ring of ``spike_windows`` windows, so ones that
+    arrive ahead of the window being emitted are kept for a later one. Only
+    spikes behind an emitted window or beyond the ring are dropped; they are
+    counted in ``late_spikes`` / ``early_spikes`` and reported with the next
+    window as ``attrs["dropped_spikes"]``.
     """
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        # Guards state.buffer + state.window_origin_ns. Held by both the
-        # asyncio loop (in ``_produce``'s emit-and-reset) and the receive
-        # thread (in ``_handle_spike``'s sample-index compute + write).
-        # Without this lock, the full-buffer copy+zero in ``_produce`` races
-        # with per-spike increments — increments landing between copy and
-        # zero would be silently lost.
+        # Guards state.windows + the window position. Held by both the
+        # asyncio loop (in ``_produce``'s window swap) and the receive
+        # thread (in ``_ingest``'s window/row compute + scatter).
+        # Without this lock, the swap in ``_produce`` races with per-spike
+        # increments — increments landing in a retired window after it was
+        # emitted would be silently lost.
         self._buffer_lock = threading.Lock()
+        self._waveform_callback: typing.Callable[[AxisArray], None] | None = None
 
     def _apply_slice_configure(self, cfg: SliceConfig) -> None:
         if cfg.channels is ChannelSelection.ENABLED:
@@ -748,12 +1958,15 @@ class CereLinkSpikeProducer(_CereLinkBaseProducer[CereLinkSpikeSettings, CereLin
             return
 
         n_ch = len(channels)
-        n_t = max(1, int(self.settings.spike_buffer_dur * _SPIKE_FS))
+        bin_samples = self.settings.bin_samples
+        n_rows = max(1, round(self.settings.spike_buffer_dur * SPIKE_FS / bin_samples))
+        n_t = n_rows * bin_samples
+        unit_lut, unit_labels = self.settings.unit_lut()
 
         ch_info = self._build_ch_info(channels)
-        time_ax = AxisArray.TimeAxis(float(_SPIKE_FS), offset=0.0)
+        time_ax = AxisArray.TimeAxis(SPIKE_FS / bin_samples, offset=0.0)
         ch_ax = AxisArray.CoordinateAxis(data=ch_info, dims=["ch"], unit="struct")
-        unit_ax = AxisArray.CoordinateAxis(data=_UNIT_LABELS.copy(), dims=["unit"], unit="label")
+        unit_ax = AxisArray.CoordinateAxis(data=unit_labels, dims=["unit"], unit="label")
         template = AxisArray(
             np.zeros((0, 0, 0), dtype=np.uint8),
             dims=["time", "ch", "unit"],
@@ -767,53 +1980,243 @@ class CereLinkSpikeProducer(_CereLinkBaseProducer[CereLinkSpikeSettings, CereLin
         )
 
         st = self.state
-        st.buffer = np.zeros((n_t, n_ch, 7), dtype=np.uint8)
+        if self.settings.output_format is SpikeFormat.SPARSE:
+
+            def new_window():
+                return EventBuffer(_SPIKE_EVENTS_INITIAL, _SPIKE_EVENT_FIELDS)
+        else:
+            dtype = np.uint8 if bin_samples == 1 else np.uint16
+
+            def new_window():
+                return np.zeros((n_rows, n_ch, len(unit_labels)), dtype=dtype)
+
+        st.windows = [new_window() for _ in range(self.settings.spike_windows)]
+        st.spare = new_window()
+        st.window_spikes = np.zeros(len(st.windows), dtype=np.int64)
         st.n_channels = n_ch
         st.n_t = n_t
+        st.bin_samples = bin_samples
+        st.unit_lut = unit_lut
         st.template = template
         st.data_event = asyncio.Event()
+        st.wake_pending = False
         st.chid_to_buffer_idx = {ch_id: i for i, ch_id in enumerate(channels)}
+        st.chid_lut = np.full(max(channels) + 2, -1, dtype=np.int64)
+        st.chid_lut[channels] = np.arange(n_ch)
+        # Ingested whenever it fills, so it never overflows; GROW only backs that up.
+        st.stage = SPSCRing(_SPIKE_STAGE, [((), np.int64), ((), np.int64), ((), np.uint64)], policy=OverflowPolicy.GROW)
+        st.anchor_ns = -1
+        st.window_index = 0
         st.window_origin_ns = -1
+        st.window_end_ns = -1
+        st.device_now_ns = -1
+        st.latency = None
+        if self.settings.latency_stats is not None:
+            st.latency = LatencyTracker(template.key, _SPIKE_LATENCY_STAGES, self.settings.latency_stats)
+        self._start_stats(loop)
+
+        st.waves = None
+        if self.settings.waveforms:
+            self._setup_waveforms(channels)
+
+        if st.waves is None:
+
+            @st.session.on_event(channel_type)
+            def _on_event(header, data):
+                self._stage_spike(header, loop)
+        else:
 
-        @st.session.on_event(channel_type)
-        def _on_event(header, data):
-            self._handle_spike(header, loop)
+            @st.session.on_event(channel_type)
+            def _on_event(header, data):
+                self._stage_spike(header, loop)
+                self._capture_waveform(header, data)
 
-    def _handle_spike(self, header, loop: asyncio.AbstractEventLoop) -> None:
-        st = self.state
-        ch_idx = st.chid_to_buffer_idx.get(header.chid)
-        if ch_idx is None:
-            return  # not subscribed to this channel (e.g., outside our slice)
+        if self.settings.clock_rate != SampleRate.NONE:
 
-        # Clamp values >5 into the noise bucket so they fit the length-7 unit axis.
-        unit_idx = header.type if header.type < 6 else 6
+            @st.session.on_group_batch(self.settings.clock_rate)
+            def _on_clock_batch(samples, timestamps):
+                if len(timestamps):
+                    with self._buffer_lock:
+                        ready = self._advance_device_clock(int(timestamps[-1]))
+                    if ready:
+                        self._wake(loop)
 
-        spike_ts = header.time  # device ns
-        with self._buffer_lock:
-            if st.window_origin_ns == -1:
-                # Align the window to the first spike's timestamp; subsequent
-                # emissions advance by integer multiples of n_t samples.
-                st.window_origin_ns = spike_ts
-            if spike_ts < st.window_origin_ns:
-                return  # late arrival across a window boundary
-            # Integer arithmetic: ``sample_idx = (elapsed_ns * 30_000) // 1e9``.
-            # Avoids float truncation jitter that would push some spikes one
-            # bin too early. Device-side ns/tick rounding still produces ±1
-            # sample jitter, but that's intrinsic to pycbsdk's conversion.
-            elapsed_ns = spike_ts - st.window_origin_ns
-            sample_idx = (elapsed_ns * _SPIKE_FS) // _NS_PER_SECOND
-            if sample_idx >= st.n_t:
-                # Past the current window; without rotating the buffer here
-                # we drop. In normal operation _produce runs at the buffer
-                # cadence and this branch shouldn't hit. If it does
-                # repeatedly, downstream isn't keeping up.
-                return
-            st.buffer[sample_idx, ch_idx, unit_idx] += 1
+    def _setup_waveforms(self, channels: list[int]) -> None:
+        st = self.state
+        n_samples = max(1, min(int(st.session.spike_length), _SPK_MAX_SAMPLES))
+        pretrigger = int(st.session.spike_pretrigger)
+        st.waves = SPSCRing(
+            self.settings.waveform_capacity,
+            [((n_samples,), np.int16), ((), np.uint64), ((), np.int64), ((), np.int64)],
+            policy=OverflowPolicy.DROP_OLDEST,
+        )
+        st.wave_scale = self._compute_scale_factors(channels).astype(np.float32)
+        # ``time`` is relative to each spike's own timestamp (``spike`` axis).
+        time_ax = AxisArray.TimeAxis(float(SPIKE_FS), offset=-pretrigger / SPIKE_FS)
+        spike_ax = AxisArray.CoordinateAxis(data=np.zeros(0, dtype=_WAVEFORM_DTYPE), dims=["spike"], unit="struct")
+        st.wave_template = AxisArray(
+            np.zeros((0, n_samples), dtype=np.int16),
+            dims=["spike", "time"],
+            axes={"spike": spike_ax, "time": time_ax},
+            key="WAVEFORMS",
+            attrs={"manufacturer": "CereLink", "device": self._device_name()},
+        )
 
-        if loop.is_running():
-            loop.call_soon_threadsafe(st.data_event.set)
+    def _capture_waveform(self, header, data) -> None:
+        """Receive thread, ``waveforms=True`` only: copy the snippet and its
+        raw header fields into the next ring row. Filtering and scaling wait
+        for :meth:`_emit_waveforms`."""
+        ring = self.state.waves
+        (_, rows), *_ = ring.reserve(1)
+        wave, times, chids, types = ring.columns()
+        n = wave.shape[1]
+        i = rows.start
+        wave[i] = np.frombuffer(_ffi.buffer(data, _SPK_WAVE_OFFSET + 2 * n), np.int16, n, _SPK_WAVE_OFFSET)
+        times[i] = header.time
+        chids[i] = header.chid
+        types[i] = header.type
+        ring.commit()
+
+    def set_waveform_callback(self, cb: typing.Callable[[AxisArray], None]) -> None:
+        """Inject the unit's waveform emitter (see :meth:`set_status_callback`)."""
+        self._waveform_callback = cb
+
+    def _emit_waveforms(self) -> None:
+        """Drain the captured snippets into one message. Scheduled right after
+        each count window is returned, so it never delays one."""
+        st = self.state
+        if st.waves is None or self._waveform_callback is None:
+            return
+        got = st.waves.read(stop_at_wrap=False)
+        if got is None:
+            return
+        wave, times, chids, types = got.columns
+        ch_idx = st.chid_lut.take(chids, mode="clip")
+        unit_idx = st.unit_lut[np.minimum(types, 6)]
+        keep = (ch_idx >= 0) & (unit_idx >= 0)
+        if not keep.all():
+            wave, times, ch_idx, unit_idx = wave[keep], times[keep], ch_idx[keep], unit_idx[keep]
+        if not len(times) and not got.skipped:
+            return
+
+        coords = np.empty(len(times), dtype=_WAVEFORM_DTYPE)
+        coords["ch"] = ch_idx
+        coords["unit"] = unit_idx
+        if self.settings.cbtime:
+            coords["time"] = times / 1e9
         else:
-            st.data_event.set()
+            host = st.clock.predict(times.astype(np.int64)) if st.clock is not None else None
+            coords["time"] = time.monotonic() if host is None else host
+        if self.settings.microvolts:
+            wave = wave * st.wave_scale[ch_idx, None]
+        template = st.wave_template
+        spike_ax = replace(template.axes["spike"], data=coords)
+        attrs = {**template.attrs, "unit": "uV" if self.settings.microvolts else "count"}
+        if got.skipped:
+            attrs["dropped_waveforms"] = got.skipped
+        self._waveform_callback(replace(template, data=wave, axes={**template.axes, "spike": spike_ax}, attrs=attrs))
+
+    def _stage_spike(self, header, loop: asyncio.AbstractEventLoop) -> None:
+        """Per-event receive-thread work: copy the raw triple into the stage,
+        no lock and no lookups. The staged batch is ingested in one go when
+        the stage fills up or this spike is the first to reach the open
+        window's end (the window is then ready, so it must see its spikes);
+        otherwise ``_produce`` ingests whatever is left when it emits."""
+        st = self.state
+        ring = st.stage
+        (_, rows), *_ = ring.reserve(1)
+        chids, types, times = ring.columns()
+        i = rows.start
+        chids[i] = header.chid
+        types[i] = header.type
+        times[i] = spike_ts = header.time
+        ring.commit()
+        if (
+            len(ring) >= ring.capacity
+            or st.anchor_ns == -1
+            or (spike_ts >= st.window_end_ns and st.device_now_ns < st.window_end_ns)
+        ):
+            with self._buffer_lock:
+                ready = self._ingest()
+            if ready:
+                self._wake(loop)
+
+    def _ingest(self) -> bool:
+        """Count every staged spike into its window of the ring with one
+        vectorized scatter per window touched. Returns True when the batch
+        makes the next window ready to emit. Caller holds ``_buffer_lock``."""
+        st = self.state
+        got = st.stage.read(stop_at_wrap=False)
+        if got is None:
+            return False
+        chids, types, times = got.columns
+        spike_ts = times.astype(np.int64)  # device ns
+        ch_idx = st.chid_lut.take(chids, mode="clip")  # -1: not subscribed (e.g., outside our slice)
+        # Clamp values >5 into the noise bucket so they fit the length-7 unit
+        # axis, then collapse per ``unit_groups`` (-1: in no group).
+        unit_idx = st.unit_lut[np.minimum(types, 6)]
+        keep = (ch_idx >= 0) & (unit_idx >= 0)
+        if not keep.all():
+            spike_ts, ch_idx, unit_idx = spike_ts[keep], ch_idx[keep], unit_idx[keep]
+            if not len(spike_ts):
+                return False
+
+        first = st.anchor_ns == -1
+        if first:
+            # Align window 0 to the first spike's timestamp; window ``w``
+            # then starts ``w * n_t`` spike-clock samples later.
+            st.anchor_ns = st.window_origin_ns = int(spike_ts[0])
+            st.window_end_ns = self._window_origin(1)
+        newest_ns = int(spike_ts.max())
+        ready = self._advance_device_clock(newest_ns) or first
+        if st.latency is not None:
+            host_ns = self._host_ns(newest_ns)
+            if host_ns is not None:
+                st.latency.record("device_to_ingest", time.monotonic_ns() - host_ns)
+
+        # Integer arithmetic: ``sample = (elapsed_ns * 30_000) // 1e9``.
+        # Avoids float truncation jitter that would push some spikes one
+        # bin too early. Device-side ns/tick rounding still produces ±1
+        # sample jitter, but that's intrinsic to pycbsdk's conversion.
+        sample = ((spike_ts - st.anchor_ns) * SPIKE_FS) // NS_PER_SECOND
+        window = sample // st.n_t
+        # Behind a window that has already been emitted (or before the anchor)
+        # is too late to place; beyond the ring means _produce isn't keeping
+        # up with the device.
+        late = window < st.window_index
+        early = window >= st.window_index + len(st.windows)
+        n_late, n_early = int(np.count_nonzero(late)), int(np.count_nonzero(early))
+        if n_late or n_early:
+            st.late_spikes += n_late
+            st.early_spikes += n_early
+            st.dropped_pending += n_late + n_early
+            keep = ~(late | early)
+            sample, window, ch_idx, unit_idx = sample[keep], window[keep], ch_idx[keep], unit_idx[keep]
+
+        # Spikes before window_index's origin (a negative sample included) were
+        # dropped as late above, so every row is in [0, n_t // bin_samples);
+        # np.add.at would silently wrap a negative one to the window's end.
+        row = (sample - window * st.n_t) // st.bin_samples
+        for w in np.unique(window):
+            sel = window == w
+            coords = (row[sel], ch_idx[sel], unit_idx[sel])
+            st.window_spikes[w % len(st.windows)] += len(coords[0])
+            buf = st.windows[w % len(st.windows)]
+            if isinstance(buf, EventBuffer):
+                buf.extend(*coords)
+            else:
+                np.add.at(buf, coords, 1)
+        return ready
+
+    def _advance_device_clock(self, device_ns: int) -> bool:
+        """Record the latest device timestamp seen; True when this is what
+        makes the next window ready to emit. Caller holds ``_buffer_lock``."""
+        st = self.state
+        if device_ns <= st.device_now_ns:
+            return False
+        was_ready = st.device_now_ns >= st.window_end_ns
+        st.device_now_ns = device_ns
+        return not was_ready and device_ns >= st.window_end_ns
 
     def _on_teardown_pre_close(self) -> None:
         if self.state.data_event is not None:
@@ -837,63 +2240,159 @@ class CereLinkSpikeProducer(_CereLinkBaseProducer[CereLinkSpikeSettings, CereLin
             await asyncio.sleep(0.1)
             return None
 
-        if st.window_origin_ns == -1:
+        if st.anchor_ns == -1:
             # Block until the first spike sets the window origin. The session
             # close path triggers data_event so this returns cleanly.
             await st.data_event.wait()
-            if st.session is None or st.window_origin_ns == -1:
+            if st.session is None or st.anchor_ns == -1:
+                return None
+            st.emit_deadline = time.monotonic() + self.settings.spike_buffer_dur + self.settings.max_latency
+
+        # Wait until the device clock passes the window's end (woken by the
+        # receive thread only at that crossing) or the latency bound expires.
+        while st.device_now_ns < st.window_end_ns:
+            self._clear_wake()
+            if st.device_now_ns >= st.window_end_ns:
+                break
+            remaining = self._emit_deadline() - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(st.data_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if st.session is None:
                 return None
-
-        # Regular cadence — one window per ``spike_buffer_dur``. The sleep
-        # timer is independent of the device clock; window time-axis offsets
-        # are computed from ``window_origin_ns`` so they remain aligned to
-        # the device regardless of small drifts in _produce's schedule.
-        await asyncio.sleep(self.settings.spike_buffer_dur)
         if st.session is None:
             return None
-
+        # The pre-sync schedule advances one window per emission rather than
+        # restarting, so it doesn't drift.
+        st.emit_deadline += self.settings.spike_buffer_dur
+
+        # Double-buffered: only a reference swap (after ingesting a bounded
+        # stage) happens under the lock, so the receive thread's wait is
+        # independent of the window size. The retired
+        # window is drained (sparse) or handed downstream (dense) afterwards.
         with self._buffer_lock:
-            out_data = st.buffer.copy()
-            st.buffer[:] = 0
+            self._ingest()  # at most _SPIKE_STAGE spikes still staged
+            slot = st.window_index % len(st.windows)
+            retired, st.windows[slot] = st.windows[slot], st.spare
+            n_spikes, st.window_spikes[slot] = int(st.window_spikes[slot]), 0
             emit_origin_ns = st.window_origin_ns
-            # Advance origin by one buffer's worth of samples in integer ns.
-            # ``ceil_div`` rather than floor avoids overlap between successive
-            # windows: window K covers [origin, origin + advance_ns), and
-            # window K+1 starts at origin + advance_ns.
-            advance_ns = (st.n_t * _NS_PER_SECOND + _SPIKE_FS - 1) // _SPIKE_FS
-            st.window_origin_ns += advance_ns
-
+            st.window_index += 1
+            st.window_origin_ns = st.window_end_ns
+            st.window_end_ns = self._window_origin(st.window_index + 1)
+            dropped, st.dropped_pending = st.dropped_pending, 0
+        self._count_message(n_spikes)
+
+        sparse_out = isinstance(retired, EventBuffer)
+        if sparse_out:
+            events = retired.take()  # O(spikes); leaves ``retired`` empty for reuse
+            st.spare = retired
+        else:
+            # The emitted array is owned downstream, so the next spare is a
+            # fresh (lazily zeroed, calloc-backed) allocation rather than a memset.
+            out_data = retired
+            st.spare = np.zeros(retired.shape, dtype=retired.dtype)
+
+        # Convert the window's first AND last sample so the monotonic floor
+        # advances to this window's end. With cbtime the result is unused, but
+        # the conversion keeps the clock model behind _emit_deadline fresh.
+        last_ns = emit_origin_ns + ((st.n_t - 1) * NS_PER_SECOND) // SPIKE_FS
+        span = st.clock.span_to_monotonic(
+            emit_origin_ns, last_ns, stream_id=-1 if self.settings.cbtime else _SPIKE_STREAM_ID
+        )
         if self.settings.cbtime:
             new_offset = emit_origin_ns / 1e9
+        elif span is None:
+            new_offset = time.monotonic()
         else:
-            # Must convert entire batch for monotonicity.
-            last_ns = emit_origin_ns + ((st.n_t - 1) * _NS_PER_SECOND) // _SPIKE_FS
-            offsets = device_to_monotonic_batch_offsets(
-                st.session, (emit_origin_ns, last_ns), stream_id=_SPIKE_STREAM_ID
-            )
-            if offsets is None:
-                new_offset = time.monotonic()
-            else:
-                new_offset = offsets[0]
+            new_offset = span[0]
 
         template = st.template
+        if sparse_out:
+            # Duplicate coordinates (several spikes in one bin) sum on conversion.
+            out_data = sparse.COO(
+                np.stack(events),
+                data=np.ones(len(events[0]), dtype=np.uint8 if st.bin_samples == 1 else np.uint16),
+                shape=(st.n_t // st.bin_samples, st.n_channels, len(template.axes["unit"].data)),
+            )
         new_time_ax = replace(template.axes["time"], offset=new_offset)
-        return replace(template, data=out_data, axes={**template.axes, "time": new_time_ax})
+        attrs = {**template.attrs, "dropped_spikes": dropped} if dropped else template.attrs
+        if st.waves is not None:
+            asyncio.get_running_loop().call_soon(self._emit_waveforms)
+        if st.latency is not None:
+            host_end_ns = self._host_ns(st.window_origin_ns)  # the emitted window's end
+            if host_end_ns is not None:
+                st.latency.record("window_end_to_publish", time.monotonic_ns() - host_end_ns)
+            self._report_latency()
+        return replace(template, data=out_data, axes={**template.axes, "time": new_time_ax}, attrs=attrs)
+
+    def _stats_counts(self) -> tuple[int, int]:
+        stage = self.state.stage
+        n = 0 if stage is None else stage.head  # one callback per spike
+        return n, n
+
+    def _collect_stats(self, period: float, **common) -> SourceStats:
+        st = self.state
+        ahead = 0.0
+        if st.anchor_ns != -1 and st.device_now_ns > st.window_origin_ns:
+            window_ns = st.n_t * NS_PER_SECOND / SPIKE_FS
+            ahead = (st.device_now_ns - st.window_origin_ns) / window_ns
+        return SourceStats(
+            stream=st.template.key,
+            period=period,
+            buffer_fill=min(1.0, ahead / len(st.windows)),
+            overruns=0,
+            dropped=st.late_spikes + st.early_spikes,
+            queue_depth=0,
+            **common,
+        )
+
+    def _emit_deadline(self) -> float:
+        """Monotonic time by which the next window is emitted even without a
+        device timestamp past its end: its end mapped through the clock model
+        plus ``max_latency``, or the wall-clock schedule before sync."""
+        st = self.state
+        host_end = st.clock.predict(st.window_end_ns) if st.clock is not None else None
+        if host_end is None:
+            return st.emit_deadline
+        return host_end + self.settings.max_latency
+
+    def _window_origin(self, window: int) -> int:
+        """Device ns at window ``window``'s first sample. ``ceil_div`` so that
+        window K covers [origin_K, origin_K+1) without overlap."""
+        return self.state.anchor_ns + -(-window * self.state.n_t * NS_PER_SECOND // SPIKE_FS)
 
 
 class CereLinkSpikeSource(BaseProducerUnit[CereLinkSpikeSettings, AxisArray, CereLinkSpikeProducer]):
-    """ezmsg Unit that streams spike events as `AxisArray[time, ch, unit=7]`."""
+    """ezmsg Unit that streams spike events as `AxisArray[time, ch, unit=7]`.
+
+    With ``waveforms=True``, ``OUTPUT_WAVEFORMS`` carries the snippets as
+    `AxisArray[spike, time]` (int16 counts or float32 µV); the ``spike`` axis
+    holds each snippet's ``time`` (same time base as the counts), ``ch``
+    (index into the counts' ``ch`` axis) and ``unit`` (index into their
+    ``unit`` axis), and ``time`` runs from ``-pretrigger`` relative to it."""
 
     SETTINGS = CereLinkSpikeSettings
     OUTPUT_DEVICE_STATUS = ez.OutputStream(DeviceStatus)
+    OUTPUT_WAVEFORMS = ez.OutputStream(AxisArray)
+    OUTPUT_LATENCY = ez.OutputStream(LatencyStats)
+    OUTPUT_STATS = ez.OutputStream(SourceStats)
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self._status_queue: asyncio.Queue[DeviceStatus] = asyncio.Queue()
+        self._waveform_queue: asyncio.Queue[AxisArray] = asyncio.Queue()
+        self._latency_queue: asyncio.Queue[LatencyStats] = asyncio.Queue()
+        self._stats_queue: asyncio.Queue[SourceStats] = asyncio.Queue()
 
     def create_producer(self) -> None:
         super().create_producer()
         self.producer.set_status_callback(self._status_queue.put_nowait)
+        self.producer.set_waveform_callback(self._waveform_queue.put_nowait)
+        self.producer.set_latency_callback(self._latency_queue.put_nowait)
+        self.producer.set_stats_callback(self._stats_queue.put_nowait)
 
     def shutdown(self) -> None:
         self.producer.close()
@@ -903,3 +2402,21 @@ class CereLinkSpikeSource(BaseProducerUnit[CereLinkSpikeSettings, AxisArray, Cer
         while True:
             status = await self._status_queue.get()
             yield self.OUTPUT_DEVICE_STATUS, status
+
+    @ez.publisher(OUTPUT_WAVEFORMS)
+    async def waveforms(self) -> typing.AsyncGenerator:
+        while True:
+            msg = await self._waveform_queue.get()
+            yield self.OUTPUT_WAVEFORMS, msg
+
+    @ez.publisher(OUTPUT_LATENCY)
+    async def latency(self) -> typing.AsyncGenerator:
+        while True:
+            report = await self._latency_queue.get()
+            yield self.OUTPUT_LATENCY, report
+
+    @ez.publisher(OUTPUT_STATS)
+    async def stats(self) -> typing.AsyncGenerator:
+        while True:
+            report = await self._stats_queue.get()
+            yield self.OUTPUT_STATS, report
@@ -1,31 +1,39 @@
 """Device-clock → host-clock conversion for CereLink streams.
 
-Two things live here:
+Three things live here:
 
-* :func:`device_to_monotonic_offset` — the small, reusable conversion that the
-  signal and spike producers reach through their ``_produce`` methods. It wraps
+* :func:`device_to_monotonic_offset` — the small, reusable conversion. It wraps
   :meth:`pycbsdk.Session.device_to_monotonic` and leaves the no-sync fallback
   policy to the caller.
+* :class:`LinearClockModel` — an in-process affine fit (offset + drift) over
+  the library's clock sync, refreshed periodically, which the signal and spike
+  producers evaluate in O(1) per message from their ``_produce`` methods.
 * :class:`CbtimeToMonotonic` / :class:`CbtimeToMonotonicTransformer` — a
   standalone ezmsg unit that re-stamps a *device-time* :class:`AxisArray` (one
   produced by a source with ``cbtime=True``, whose ``time`` axis offset is
-  device-ns / 1e9) onto ``time.monotonic()``. It opens its **own** read-only
-  client :class:`~pycbsdk.Session` to the same device — CereLink's shared memory
-  lets a second session attach to a device a source already opened (same host).
+  device-ns / 1e9) onto ``time.monotonic()``. It leases the process-wide
+  :class:`~pycbsdk.Session` for the device (see :mod:`.sessions`), so in a graph
+  that also has a CereLink source it attaches to the Session the source opened.
 """
 
 from __future__ import annotations
 
 import asyncio
+import collections
 import logging
+import threading
+import time
 
 import ezmsg.core as ez
+import numpy as np
 from ezmsg.baseproc import processor_state
 from ezmsg.baseproc.stateful import BaseStatefulTransformer
 from ezmsg.baseproc.units import BaseTransformerUnit
 from ezmsg.util.messages.axisarray import AxisArray, replace
 from pycbsdk import DeviceType, Session
 
+from .sessions import SessionLease, acquire_session
+
 logger = logging.getLogger(__name__)
 
 
@@ -68,6 +76,160 @@ def device_to_monotonic_batch_offsets(session: Session, device_ns, *, stream_id:
         return None
 
 
+class LinearClockModel:
+    """Affine device-ns → ``time.monotonic()`` model for one Session.
+
+    ``host_s = offset + (1 + drift) * (device_ns - ref_ns) / 1e9``
+
+    Every ``refresh_interval`` seconds (checked on conversion, so no thread of
+    its own) the model asks the library for one stateless conversion of the
+    most recent device timestamp it was given, appends that sync point to a
+    sliding window and refits ``offset`` / ``drift`` by least squares. Between
+    refreshes a conversion is a constant-time affine evaluation, regardless of
+    how many samples the message covers.
+
+    A sync point more than ``resync_threshold`` seconds off the fit is held
+    back. Only when ``resync_confirm`` consecutive sync points are off (or the
+    device clock went backwards) is it a genuine re-sync: the window restarts
+    from the held points and the per-stream floors are cleared, mirroring the
+    library's own floor reset. A single jittery sample is dropped and never
+    moves the fit, so it cannot break monotonicity.
+
+    Several streams may share one model, each converting its own (possibly
+    long) messages, so a refresh can be handed a timestamp older than the
+    newest sync point. Within the fit window or ``max_stale`` seconds of that
+    point it is stale, not a clock reset: it is skipped and the next
+    conversion refreshes instead.
+
+    Monotonicity is enforced per ``stream_id >= 0`` exactly like
+    :func:`device_to_monotonic_batch_offsets`: a span's start is clamped to be
+    ``>=`` the previous span's end on the same id; ``-1`` is stateless.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        *,
+        refresh_interval: float = 1.0,
+        window: int = 30,
+        resync_threshold: float = 1e-3,
+        resync_confirm: int = 2,
+        max_drift: float = 1e-3,
+        max_stale: float = 5.0,
+    ) -> None:
+        self._session = session
+        self.refresh_interval = refresh_interval
+        self.resync_threshold = resync_threshold
+        self.resync_confirm = max(1, resync_confirm)
+        self.max_drift = max_drift
+        self.max_stale = max_stale
+        self._points: collections.deque[tuple[int, float]] = collections.deque(maxlen=max(2, window))
+        self._next_refresh = -float("inf")
+        self._ref_ns = 0
+        self._offset = 0.0
+        self._drift = 0.0
+        self._floors: dict[int, float] = {}
+        self._suspect: list[tuple[int, float]] = []  # consecutive off-fit sync points
+        # Producers sharing one model may convert from their own threads
+        # (``assembly_queue``); the lock is uncontended otherwise.
+        self._lock = threading.Lock()
+        self.resyncs = 0
+        """Number of detected clock re-syncs (window restarts)."""
+
+    @property
+    def ready(self) -> bool:
+        """True once at least one sync point has been obtained."""
+        return bool(self._points)
+
+    @property
+    def drift(self) -> float:
+        """Fitted fractional rate error of the device clock against the host
+        clock (``1e-6`` = 1 ppm; positive = device runs slow)."""
+        return self._drift
+
+    def to_monotonic(self, device_ns: int, stream_id: int = -1) -> float | None:
+        """Convert one device timestamp, or None when no clock sync is available yet."""
+        span = self.span_to_monotonic(device_ns, device_ns, stream_id)
+        return None if span is None else span[0]
+
+    def predict(self, device_ns: int) -> float | None:
+        """Evaluate the current fit at *device_ns* without refreshing it or
+        touching any floor — for scheduling against device times that haven't
+        been seen yet. None before the first sync point."""
+        with self._lock:
+            if not self._points:
+                return None
+            return self._evaluate(device_ns)
+
+    def span_to_monotonic(self, first_ns: int, last_ns: int, stream_id: int = -1) -> tuple[float, float] | None:
+        """Convert the first and last device timestamps of one message.
+
+        With ``stream_id >= 0`` the start is clamped to the previous span's end
+        on that id and the floor advances to this span's end. Returns None
+        when no clock sync is available yet.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._next_refresh and not self._stale(last_ns):
+                self._next_refresh = now + self.refresh_interval
+                self._sample(last_ns)
+            if not self._points:
+                return None
+            first = self._evaluate(first_ns)
+            last = self._evaluate(last_ns)
+            if stream_id >= 0:
+                floor = self._floors.get(stream_id)
+                if floor is not None and first < floor:
+                    first = floor
+                last = max(first, last)
+                self._floors[stream_id] = last
+            return first, last
+
+    def _evaluate(self, device_ns: int) -> float:
+        return self._offset + (1.0 + self._drift) * (device_ns - self._ref_ns) * 1e-9
+
+    def _stale(self, device_ns: int) -> bool:
+        """True when *device_ns* is behind the newest sync point but too close
+        to it to be a device clock reset (another stream already sampled later)."""
+        if not self._points:
+            return False
+        newest = self._points[-1][0]
+        return min(self._points[0][0], newest - int(self.max_stale * 1e9)) <= device_ns < newest
+
+    def _sample(self, device_ns: int) -> None:
+        offsets = device_to_monotonic_batch_offsets(self._session, (device_ns,))
+        if offsets is None:
+            return
+        host = offsets[0]
+        backwards = bool(self._points) and device_ns < self._points[-1][0]
+        if backwards or (self._points and abs(host - self._evaluate(device_ns)) > self.resync_threshold):
+            self._suspect.append((device_ns, host))
+            if not backwards and len(self._suspect) < self.resync_confirm:
+                return  # possibly one jittery sample: keep the fit until it persists
+            self._points.clear()
+            self._floors.clear()
+            self._drift = 0.0
+            self.resyncs += 1
+            self._points.extend(self._suspect[-1:] if backwards else self._suspect)
+        else:
+            self._points.append((device_ns, host))
+        self._suspect.clear()
+        self._fit()
+
+    def _fit(self) -> None:
+        ref_ns = self._points[-1][0]
+        # Fit the residual against the nominal slope, centered on the newest
+        # point, so the numbers stay small and well-conditioned.
+        x = np.fromiter(((d - ref_ns) * 1e-9 for d, _ in self._points), dtype=np.float64, count=len(self._points))
+        y = np.fromiter((h for _, h in self._points), dtype=np.float64, count=len(self._points)) - x
+        drift = self._drift
+        if len(x) >= 2 and np.ptp(x) > 0:
+            drift = float(np.clip(np.polyfit(x, y, 1)[0], -self.max_drift, self.max_drift))
+        self._ref_ns = ref_ns
+        self._drift = drift
+        self._offset = float(np.mean(y - drift * x))
+
+
 class CbtimeToMonotonicSettings(ez.Settings):
     """Settings for :class:`CbtimeToMonotonic`.
 
@@ -79,15 +241,20 @@ class CbtimeToMonotonicSettings(ez.Settings):
     device_type: DeviceType | None = None
     """Device whose clock to attach to. ``None`` = idle (pure passthrough)."""
 
-    stream_id: int = 0
-    """Per-stream monotonicity key. ``>= 0`` enforces a non-decreasing host
-    timeline (each transformer owns its own Session, so the id namespace is
-    private); ``-1`` is a stateless conversion."""
+    stream_id: int | None = None
+    """Library monotonicity key for this transformer's output. ``None`` (the
+    default) allocates a key of its own from the shared Session (see
+    :meth:`~ezmsg.blackrock.sessions.SessionLease.new_stream_id`), so
+    transformers on the same device never clamp each other. An explicit id
+    ``>= 0`` shares its floor with every transformer given the same id;
+    ``-1`` is a stateless conversion. The CereLink sources keep their floors
+    in their own :class:`LinearClockModel` and use no library ids."""
 
 
 @processor_state
 class CbtimeToMonotonicState:
-    session: Session | None = None
+    session: SessionLease | None = None
+    stream_id: int = -1  # settings.stream_id, or the id allocated from the lease
 
 
 class CbtimeToMonotonicTransformer(
@@ -95,7 +262,7 @@ class CbtimeToMonotonicTransformer(
 ):
     """Re-stamp a device-time :class:`AxisArray` onto ``time.monotonic()``.
 
-    The client Session is opened once, on the first message (default
+    The shared Session is leased once, on the first message (default
     ``_hash_message`` returns 0). If it fails to open, or clock sync isn't
     available yet, messages pass through unchanged (still device time).
     """
@@ -108,22 +275,18 @@ class CbtimeToMonotonicTransformer(
         await self._teardown()
         if self.settings.device_type is None:
             return  # idle — passthrough
-        session = Session(device_type=self.settings.device_type)
         try:
-            await asyncio.to_thread(session.__enter__)
-            await session.wait_until_running(timeout=10.0)
+            session = await acquire_session(self.settings.device_type, timeout=10.0)
         except BaseException:
             logger.exception(
-                "CbtimeToMonotonic: failed to attach client session to device=%s; "
+                "CbtimeToMonotonic: failed to attach session to device=%s; "
                 "messages will pass through with device time.",
                 self.settings.device_type.name,
             )
-            try:
-                await asyncio.to_thread(session.__exit__, None, None, None)
-            except Exception:
-                logger.exception("CbtimeToMonotonic: cleanup-after-failure also failed")
             return  # leave state.session=None — passthrough
         self.state.session = session
+        stream_id = self.settings.stream_id
+        self.state.stream_id = session.new_stream_id() if stream_id is None else stream_id
 
     async def _teardown(self) -> None:
         if self.state.session is not None:
@@ -145,7 +308,7 @@ class CbtimeToMonotonicTransformer(
         first_ns = int(round(time_ax.offset * 1e9))
         last_ns = int(round((time_ax.offset + gain * max(0, n - 1)) * 1e9))
         offsets = device_to_monotonic_batch_offsets(
-            self.state.session, (first_ns, last_ns), stream_id=self.settings.stream_id
+            self.state.session, (first_ns, last_ns), stream_id=self.state.stream_id
         )
         if offsets is None:
             return message  # no clock sync yet
@@ -0,0 +1,430 @@
+"""An in-process stand-in for :class:`pycbsdk.Session`, for tests and benchmarks
+without a device or nPlayServer.
+
+:class:`FakeSession` implements the part of the Session surface the CereLink
+units use. A background thread plays a synthetic device. It delivers the
+continuous sample groups at their nominal rates and Poisson spike events on
+the front-end channels, in batches of ``batch_interval`` seconds, as pycbsdk
+does after one queue drain. Sample values are a deterministic function of
+device tick and channel (:func:`fake_samples`), so a consumer can check what
+it received. Packet loss and device-clock drift can be injected.
+
+:func:`fake_sessions` installs it process-wide through
+:func:`~ezmsg.blackrock.sessions.set_session_factory`, so unmodified CereLink
+units open fakes::
+
+    with fake_sessions(n_channels=1024, spike_rate=5.0):
+        ez.run(components=..., connections=..., force_single_process=True)
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import threading
+import time
+import typing
+
+import cffi
+import numpy as np
+from pycbsdk import ChanInfoField, ChannelType, DeviceType, SampleRate
+
+from .sessions import set_session_factory
+
+logger = logging.getLogger(__name__)
+
+_DEVICE_FS = 30000  # device clock: one tick per 30 kHz sample
+_NS_PER_SECOND = 1_000_000_000
+_BANK_SIZE = 32  # front-end channels per bank (A, B, ...)
+_SPKOPTS_EXTRACT = 1  # cbAINPSPK_EXTRACT
+_EVENT_HEADER_BYTES = 16  # payload offset of the waveform
+_NOISE_UNIT = 255
+
+_ffi = cffi.FFI()
+
+
+def fake_samples(ticks: np.ndarray, channels: typing.Sequence[int]) -> np.ndarray:
+    """The int16 ``[len(ticks), len(channels)]`` samples a :class:`FakeSession`
+    emits for 1-based *channels* at device *ticks* (30 kHz): a 4096-count
+    sawtooth, phase-shifted per channel."""
+    ch = np.asarray(channels, dtype=np.int64)
+    return ((np.asarray(ticks, dtype=np.int64)[:, None] + 97 * ch[None, :]) % 4096 - 2048).astype(np.int16)
+
+
+def _tick_ns(ticks: np.ndarray | int) -> np.ndarray | int:
+    """Device ticks to device nanoseconds (truncated, like the device)."""
+    return ticks * _NS_PER_SECOND // _DEVICE_FS
+
+
+class FakeEventHeader:
+    """The fields of a pycbsdk event header the CereLink units read."""
+
+    __slots__ = ("time", "chid", "type", "dlen")
+
+    def __init__(self, time: int, chid: int, type: int, dlen: int) -> None:
+        self.time = time
+        self.chid = chid
+        self.type = type
+        self.dlen = dlen
+
+
+class FakeSession:
+    """A synthetic device behind the :class:`pycbsdk.Session` interface.
+
+    There are *n_channels* front-end channels (ids ``1..n_channels``, 32 per
+    bank, labelled ``chan<N>``), with *scaling* for all of them. Other
+    channel types have none. *groups* gives the initial sample-group
+    membership. By default every channel streams at 30 kHz and has spike
+    extraction on. ``set_sample_group`` and ``set_spike_extraction`` change
+    that state at once, so ``sync`` only waits *sync_latency*. CCF files and
+    channel maps are accepted and ignored; positions stay zero.
+
+    Data start with ``__enter__`` and run in real time on the host's
+    ``time.monotonic()``:
+
+    * ``drift_ppm``: the device clock runs this many parts per million fast.
+      ``device_to_monotonic`` maps it exactly, as a converged pycbsdk clock
+      sync would.
+    * ``packet_loss``: the probability that a batch is lost (one UDP
+      datagram), gaps in sample and spike timestamps included.
+    * ``spike_rate``: spikes per second on each channel with extraction on.
+      Units are uniform over ``0..5``; ``noise_fraction`` of them are noise
+      (classification 255).
+
+    Random draws come from a generator seeded with *seed*, reseeded each time
+    the session is entered, so every run replays the same draws. Under load the
+    batches get longer, as they do behind a slow consumer, but the data they
+    carry stay the same.
+    """
+
+    def __init__(
+        self,
+        device_type: DeviceType = DeviceType.NPLAY,
+        *,
+        n_channels: int = 96,
+        groups: typing.Mapping[SampleRate, typing.Sequence[int]] | None = None,
+        spike_rate: float = 0.0,
+        noise_fraction: float = 0.0,
+        batch_interval: float = 0.001,
+        packet_loss: float = 0.0,
+        drift_ppm: float = 0.0,
+        start_ns: int = 0,
+        sync_latency: float = 0.0,
+        seed: int = 0,
+        scaling: dict | None = None,
+        spike_length: int = 48,
+        spike_pretrigger: int = 10,
+    ) -> None:
+        if n_channels < 0:
+            raise ValueError(f"n_channels must be non-negative, got {n_channels}")
+        if batch_interval <= 0:
+            raise ValueError(f"batch_interval must be positive, got {batch_interval}")
+        if not 0.0 <= packet_loss < 1.0:
+            raise ValueError(f"packet_loss must be in [0, 1), got {packet_loss}")
+        self.device_type = device_type
+        self.n_channels = n_channels
+        self.spike_rate = spike_rate
+        self.noise_fraction = noise_fraction
+        self.batch_interval = batch_interval
+        self.packet_loss = packet_loss
+        self.drift_ppm = drift_ppm
+        self.start_ns = start_ns
+        self.sync_latency = sync_latency
+        self.scaling = scaling or {
+            "digmin": -32764,
+            "digmax": 32764,
+            "anamin": -8191,
+            "anamax": 8191,
+            "anagain": 1,
+            "anaunit": "uV",
+        }
+        self.spike_length = spike_length
+        self.spike_pretrigger = spike_pretrigger
+        if groups is None:
+            groups = {SampleRate.SR_30kHz: range(1, n_channels + 1)}
+        # Copy-on-write, so the data thread reads a snapshot without a lock.
+        self._groups: dict[SampleRate, tuple[int, ...]] = {}
+        for rate, chans in groups.items():
+            self._set_group(SampleRate(rate), self._select(chans, ChannelType.FRONTEND))
+        self._extracting = frozenset(range(1, n_channels + 1))
+        self._batch_callbacks: dict[SampleRate, tuple[typing.Callable, ...]] = {}
+        self._event_callbacks: tuple[typing.Callable, ...] = ()
+        self._config_lock = threading.Lock()
+        self.seed = seed
+        self._rng = np.random.default_rng(seed)
+        self._payloads = self._make_payloads()
+        self._stream_last: dict[int, float] = {}
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._host0_ns = 0
+        self._tick = 0
+        self.stats = {"batches": 0, "lost_batches": 0, "samples": 0, "spikes": 0}
+        """Counts for the current (or last) run: delivered batches, lost
+        batches, samples (per group, summed) and spike events delivered."""
+
+    # --- lifecycle ---
+
+    def __enter__(self) -> FakeSession:
+        if self._thread is None:
+            self._stop.clear()
+            # Each run restarts the device: its clock, draws, counters, and the
+            # per-stream floors (which would otherwise clamp the new clock).
+            self._host0_ns = time.monotonic_ns()
+            self._tick = 0
+            self._rng = np.random.default_rng(self.seed)
+            self._stream_last.clear()
+            self.stats = dict.fromkeys(self.stats, 0)
+            self._thread = threading.Thread(target=self._run, name="FakeSession", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the data thread."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    async def wait_until_running(self, timeout: float = 10.0) -> None:
+        if not self.running:
+            raise RuntimeError("FakeSession is not open")
+
+    def sync(self, timeout: float = 5.0) -> None:
+        if not self.running:
+            raise RuntimeError("FakeSession is not open")
+        if self.sync_latency:
+            time.sleep(self.sync_latency)
+
+    # --- callbacks ---
+
+    def on_group_batch(self, rate: SampleRate = SampleRate.SR_30kHz) -> typing.Callable:
+        rate = SampleRate(rate)
+
+        def decorator(fn):
+            with self._config_lock:
+                self._batch_callbacks = {
+                    **self._batch_callbacks,
+                    rate: self._batch_callbacks.get(rate, ()) + (fn,),
+                }
+            return fn
+
+        return decorator
+
+    def on_event(self, channel_type: ChannelType | None = ChannelType.FRONTEND) -> typing.Callable:
+        def decorator(fn):
+            if channel_type in (None, ChannelType.FRONTEND):  # the only type with events
+                with self._config_lock:
+                    self._event_callbacks = self._event_callbacks + (fn,)
+            return fn
+
+        return decorator
+
+    # --- channel configuration ---
+
+    def get_matching_channel_ids(self, channel_type: ChannelType, n_chans: int = 0) -> list[int]:
+        if channel_type != ChannelType.FRONTEND:
+            return []
+        ids = list(range(1, self.n_channels + 1))
+        return ids[:n_chans] if n_chans else ids
+
+    def get_group_channels(self, group_id: int) -> list[int]:
+        return list(self._groups.get(SampleRate(group_id), ()))
+
+    def get_channel_label(self, chan_id: int) -> str | None:
+        return f"chan{chan_id}" if 1 <= chan_id <= self.n_channels else None
+
+    def get_channel_scaling(self, chan_id: int) -> dict | None:
+        return dict(self.scaling) if 1 <= chan_id <= self.n_channels else None
+
+    def get_channels_positions(self, channel_type: ChannelType, n_chans: int = 0) -> list[tuple[int, int, int, int]]:
+        return [(0, 0, 0, 0)] * len(self.get_matching_channel_ids(channel_type, n_chans))
+
+    def get_channels_field(self, channel_type: ChannelType, field: ChanInfoField, n_chans: int = 0) -> list[int]:
+        ids = self.get_matching_channel_ids(channel_type, n_chans)
+        if field == ChanInfoField.BANK:
+            return [(ch - 1) // _BANK_SIZE + 1 for ch in ids]
+        if field == ChanInfoField.TERM:
+            return [(ch - 1) % _BANK_SIZE + 1 for ch in ids]
+        if field == ChanInfoField.SPKOPTS:
+            return [_SPKOPTS_EXTRACT if ch in self._extracting else 0 for ch in ids]
+        if field == ChanInfoField.SMPGROUP:
+            group_of = {
+                ch: int(rate) for rate, chans in self._groups.items() if rate != SampleRate.SR_RAW for ch in chans
+            }
+            return [group_of.get(ch, 0) for ch in ids]
+        return [0] * len(ids)
+
+    def set_sample_group(
+        self,
+        chans: int | typing.Iterable[int] | None,
+        channel_type: ChannelType,
+        rate: SampleRate,
+        disable_others: bool = False,
+    ) -> None:
+        selected = self._select(chans, channel_type)
+        with self._config_lock:
+            if disable_others:
+                drop = set(self.get_matching_channel_ids(channel_type))
+            else:
+                drop = set(selected)
+            self._groups = {r: tuple(ch for ch in members if ch not in drop) for r, members in self._groups.items()}
+            self._set_group(SampleRate(rate), selected)
+
+    def set_spike_extraction(
+        self, chans: int | typing.Iterable[int] | None, channel_type: ChannelType, enabled: bool
+    ) -> None:
+        selected = self._select(chans, channel_type)
+        with self._config_lock:
+            if enabled:
+                self._extracting = self._extracting | frozenset(selected)
+            else:
+                self._extracting = self._extracting - frozenset(selected)
+
+    def set_ac_input_coupling(
+        self, chans: int | typing.Iterable[int] | None, channel_type: ChannelType, enabled: bool
+    ) -> None:
+        pass
+
+    def load_ccf_sync(self, filename: str, timeout: float = 5.0) -> None:
+        logger.info("FakeSession: ignoring CCF %s", filename)
+
+    def load_channel_map(self, filepath: str, start_chan: int = 1, hs_id: int = 0) -> None:
+        logger.info("FakeSession: ignoring channel map %s", filepath)
+
+    def clear_channel_map(self) -> None:
+        pass
+
+    def _select(self, chans: int | typing.Iterable[int] | None, channel_type: ChannelType) -> list[int]:
+        """Resolve a pycbsdk channel selection (None = all, N = first N, or ids)."""
+        if chans is None:
+            return self.get_matching_channel_ids(channel_type)
+        if isinstance(chans, int):
+            return self.get_matching_channel_ids(channel_type, chans)
+        return [ch for ch in chans if 1 <= ch <= self.n_channels]
+
+    def _set_group(self, rate: SampleRate, chans: typing.Iterable[int]) -> None:
+        if rate == SampleRate.NONE:
+            return
+        self._groups = {**self._groups, rate: tuple(sorted(set(self._groups.get(rate, ())) | set(chans)))}
+
+    # --- clock ---
+
+    def device_to_monotonic(self, device_time_ns: int, stream_id: int = -1) -> float:
+        return self.device_to_monotonic_batch((device_time_ns,), stream_id)[0]
+
+    def device_to_monotonic_batch(self, device_ns, stream_id: int = -1) -> list[float]:
+        """Exact inverse of the simulated device clock. With ``stream_id >= 0``
+        each output is clamped to be non-decreasing per stream, like pycbsdk."""
+        scale = 1.0 + self.drift_ppm * 1e-6
+        host0, start = self._host0_ns, self.start_ns
+        out = [(host0 + (int(d) - start) / scale) / _NS_PER_SECOND for d in device_ns]
+        if stream_id >= 0:
+            last = self._stream_last.get(stream_id, float("-inf"))
+            for i, t in enumerate(out):
+                last = out[i] = max(t, last)
+            self._stream_last[stream_id] = last
+        return out
+
+    def _device_tick(self, host_ns: int) -> int:
+        """The device tick whose sample is being acquired at *host_ns*."""
+        elapsed = (host_ns - self._host0_ns) * (1.0 + self.drift_ppm * 1e-6)
+        return int(elapsed) * _DEVICE_FS // _NS_PER_SECOND
+
+    # --- data thread ---
+
+    def _make_payloads(self) -> list:
+        """One event payload per unit: header bytes, then a negative-going
+        spike whose depth grows with the unit."""
+        t = np.arange(self.spike_length) - self.spike_pretrigger
+        shape = -np.exp(-0.5 * (t / 3.0) ** 2)
+        payloads = []
+        for unit in range(7):
+            wave = (shape * 200 * (unit + 1)).astype("<i2")
+            payloads.append(_ffi.from_buffer(bytearray(_EVENT_HEADER_BYTES) + bytearray(wave.tobytes())))
+        return payloads
+
+    def _run(self) -> None:
+        next_wake = time.monotonic() + self.batch_interval
+        while not self._stop.wait(max(0.0, next_wake - time.monotonic())):
+            next_wake = max(next_wake + self.batch_interval, time.monotonic())
+            try:
+                self._step(self._device_tick(time.monotonic_ns()))
+            except Exception:
+                logger.exception("FakeSession: data thread step failed")
+
+    def _step(self, tick: int) -> None:
+        """Deliver device ticks ``[self._tick, tick)`` as one batch."""
+        lo, hi = self._tick, tick
+        if hi <= lo:
+            return
+        self._tick = hi
+        if self.packet_loss and self._rng.random() < self.packet_loss:
+            self.stats["lost_batches"] += 1
+            return
+        self.stats["batches"] += 1
+        if self.spike_rate > 0 and self._event_callbacks:
+            self._deliver_spikes(lo, hi)
+        callbacks = self._batch_callbacks
+        for rate, chans in self._groups.items():
+            fns = callbacks.get(rate)
+            if not fns or not chans:
+                continue
+            step = _DEVICE_FS // rate.hz
+            ticks = np.arange(-(-lo // step) * step, hi, step, dtype=np.int64)
+            if not len(ticks):
+                continue
+            samples = fake_samples(ticks, chans)
+            timestamps = (self.start_ns + _tick_ns(ticks)).astype(np.uint64)
+            self.stats["samples"] += len(ticks)
+            for i, fn in enumerate(fns):
+                # Each callback owns its arrays, as with pycbsdk.
+                fn(samples if i == 0 else samples.copy(), timestamps if i == 0 else timestamps.copy())
+
+    def _deliver_spikes(self, lo: int, hi: int) -> None:
+        chans = sorted(self._extracting)
+        if not chans:
+            return
+        rng = self._rng
+        n = int(rng.poisson(self.spike_rate * len(chans) * (hi - lo) / _DEVICE_FS))
+        if not n:
+            return
+        ticks = np.sort(rng.integers(lo, hi, n))
+        chids = rng.choice(np.asarray(chans), n)
+        units = rng.integers(0, 6, n)
+        noise = rng.random(n) < self.noise_fraction
+        dlen = (_EVENT_HEADER_BYTES + 2 * self.spike_length) // 4
+        fns = self._event_callbacks
+        for t, ch, unit, is_noise in zip(
+            (self.start_ns + _tick_ns(ticks)).tolist(), chids.tolist(), units.tolist(), noise.tolist()
+        ):
+            header = FakeEventHeader(t, ch, _NOISE_UNIT if is_noise else unit, dlen)
+            data = self._payloads[6 if is_noise else unit]
+            for fn in fns:
+                fn(header, data)
+        self.stats["spikes"] += n
+
+
+@contextlib.contextmanager
+def fake_sessions(**kwargs) -> typing.Iterator[list[FakeSession]]:
+    """Open a :class:`FakeSession` (with *kwargs*) wherever a CereLink unit
+    would open a device Session, for the duration of the block. Yields the
+    list of fakes opened so far."""
+    opened: list[FakeSession] = []
+
+    def factory(device_type: DeviceType) -> FakeSession:
+        session = FakeSession(device_type, **kwargs)
+        opened.append(session)
+        return session
+
+    previous = set_session_factory(factory)
+    try:
+        yield opened
+    finally:
+        set_session_factory(previous)
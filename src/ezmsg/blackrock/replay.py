@@ -0,0 +1,668 @@
+"""File-backed sources that replay Blackrock recordings with the output
+contracts of the live CereLink sources.
+
+:class:`NsxReplaySource` streams a continuous ``.nsX`` file exactly as
+:class:`~ezmsg.blackrock.cerelink.CereLinkSignalSource` streams a sample
+group: same ``[time, ch]`` layout, ``CHANNEL_DTYPE`` channel axis, ``key``,
+attrs and µV scaling. The file is memory-mapped; opening it only reads the
+headers (and the data-packet headers of paused recordings), and raw-count
+chunks are emitted as read-only views of the mapping.
+
+:class:`NevReplaySource` does the same for the spike packets of a ``.nev``
+file, in the :class:`~ezmsg.blackrock.cerelink.CereLinkSpikeSource` window
+format. Each window's packets are located by binary search on the mapped
+timestamps and decoded with one structured-dtype read.
+
+Replay is paced either in real time — each message is released when the
+device would have completed it — or as fast as downstream takes the
+messages, for throughput tests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import enum
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import ezmsg.core as ez
+import numpy as np
+import sparse
+from ezmsg.baseproc import processor_state
+from ezmsg.baseproc.stateful import BaseStatefulProducer
+from ezmsg.baseproc.units import BaseProducerUnit
+from ezmsg.util.messages.axisarray import AxisArray, replace
+from pycbsdk import SampleRate
+
+from ._common import NS_PER_SECOND, SPIKE_FS, build_unit_lut, check_unit_groups, store_samples
+from .cerelink import OutputDType, SpikeFormat
+from .channel_map import CHANNEL_DTYPE
+
+logger = logging.getLogger(__name__)
+
+# --- NSx file format (2.2, 2.3 and 3.0) ------------------------------------
+
+_NSX_BASIC_HEADER = np.dtype(
+    [
+        ("file_type", "S8"),  # NEURALCD (2.2/2.3) or BRSMPGRP (3.0)
+        ("major", "u1"),
+        ("minor", "u1"),
+        ("header_bytes", "<u4"),  # basic + extended headers
+        ("label", "S16"),
+        ("comment", "S256"),
+        ("period", "<u4"),  # samples are this many 1/30000 s apart
+        ("resolution", "<u4"),  # timestamp ticks per second
+        ("time_origin", "<u2", (8,)),  # SYSTEMTIME
+        ("channel_count", "<u4"),
+    ]
+)
+_NSX_EXT_HEADER = np.dtype(
+    [
+        ("type", "S2"),  # "CC"
+        ("electrode_id", "<u2"),
+        ("label", "S16"),
+        ("connector", "u1"),  # 1-based bank
+        ("pin", "u1"),
+        ("min_digital", "<i2"),
+        ("max_digital", "<i2"),
+        ("min_analog", "<i2"),
+        ("max_analog", "<i2"),
+        ("units", "S16"),
+        ("hp_corner", "<u4"),
+        ("hp_order", "<u4"),
+        ("hp_type", "<u2"),
+        ("lp_corner", "<u4"),
+        ("lp_order", "<u4"),
+        ("lp_type", "<u2"),
+    ]
+)
+_NSX_FILE_TYPES = {b"NEURALCD": "<u4", b"BRSMPGRP": "<u8"}  # -> data-packet timestamp type
+_NSX_RATES = {500: SampleRate.SR_500, 1000: SampleRate.SR_1kHz, 2000: SampleRate.SR_2kHz, 10000: SampleRate.SR_10kHz}
+
+
+def _text(raw: bytes) -> str:
+    return raw.split(b"\0", 1)[0].decode("latin-1").strip()
+
+
+@dataclass
+class NsxSegment:
+    """One run of samples in an :class:`NsxFile`: a data packet, or (for files
+    with a packet per sample) all of them as one strided view."""
+
+    samples: np.ndarray
+    """int16 ``[n, n_ch]`` view of the mapping."""
+    timestamps: np.ndarray | None
+    """Per-sample timestamps (view of the mapping), or None when they follow
+    from :attr:`ts0` and the file's period."""
+    ts0: int
+    """Timestamp of the first sample, in the file's ticks."""
+
+
+class NsxFile:
+    """A memory-mapped Blackrock ``.nsX`` file (spec 2.2, 2.3 or 3.0).
+
+    Only the headers are parsed on open. Data packets are indexed by hopping
+    from packet header to packet header, except in files written with one
+    packet per sample (e.g., PTP-clocked recordings), which are viewed as one
+    strided record array without touching the data."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        basic = np.fromfile(self.path, dtype=_NSX_BASIC_HEADER, count=1)
+        if not len(basic):
+            raise ValueError(f"{self.path}: too short for an NSx header")
+        basic = basic[0]
+        ts_type = _NSX_FILE_TYPES.get(bytes(basic["file_type"]))
+        if ts_type is None:
+            raise ValueError(
+                f"{self.path}: unsupported NSx file type {bytes(basic['file_type'])!r} "
+                "(spec 2.2, 2.3 and 3.0 are supported)"
+            )
+        self.label = _text(basic["label"])
+        self.period = int(basic["period"])
+        self.resolution = int(basic["resolution"])
+        n_ch = int(basic["channel_count"])
+        self.channels = np.fromfile(self.path, dtype=_NSX_EXT_HEADER, count=n_ch, offset=_NSX_BASIC_HEADER.itemsize)
+        if len(self.channels) != n_ch:
+            raise ValueError(f"{self.path}: truncated extended headers")
+        self._mm = np.memmap(self.path, dtype=np.uint8, mode="r")
+        self._packet_header = np.dtype([("header", "u1"), ("timestamp", ts_type), ("n_samples", "<u4")])
+        self.segments = self._index(int(basic["header_bytes"]))
+
+    @property
+    def n_channels(self) -> int:
+        return len(self.channels)
+
+    @property
+    def fs(self) -> float:
+        return 30000 / self.period
+
+    @property
+    def sample_rate(self) -> SampleRate:
+        """The device sample group this file was recorded from (``.ns6`` is ``SR_RAW``)."""
+        hz = round(self.fs)
+        if hz == 30000:
+            return SampleRate.SR_RAW if self.path.suffix.lower() == ".ns6" else SampleRate.SR_30kHz
+        if hz not in _NSX_RATES:
+            raise ValueError(f"{self.path}: {self.fs} Hz is not a device sample-group rate")
+        return _NSX_RATES[hz]
+
+    @property
+    def n_samples(self) -> int:
+        return sum(len(seg.samples) for seg in self.segments)
+
+    def to_ns(self, ticks: int | np.ndarray) -> int | np.ndarray:
+        """File timestamp ticks to device nanoseconds."""
+        if self.resolution == NS_PER_SECOND:
+            return ticks
+        return ticks * NS_PER_SECOND // self.resolution
+
+    def sample_ticks(self, segment: NsxSegment, start: int, stop: int) -> tuple[int, int]:
+        """Timestamps (file ticks) of rows ``start`` and ``stop - 1`` of *segment*."""
+        if segment.timestamps is not None:
+            return int(segment.timestamps[start]), int(segment.timestamps[stop - 1])
+        step = self.period * self.resolution  # ticks per sample, times 30000
+        return segment.ts0 + start * step // 30000, segment.ts0 + (stop - 1) * step // 30000
+
+    def _index(self, pos: int) -> list[NsxSegment]:
+        mm, header, n_ch = self._mm, self._packet_header, self.n_channels
+        row_bytes = 2 * n_ch
+        segments = []
+        while pos + header.itemsize <= len(mm):
+            packet = mm[pos : pos + header.itemsize].view(header)[0]
+            if packet["header"] != 1:
+                raise ValueError(f"{self.path}: no data packet at byte {pos}")
+            n = int(packet["n_samples"])
+            start = pos + header.itemsize
+            if n == 1 and not segments:
+                records = np.dtype(header.descr + [("samples", "<i2", (n_ch,))])
+                count = (len(mm) - pos) // records.itemsize
+                view = mm[pos : pos + count * records.itemsize].view(records)
+                if count and view[-1]["header"] == 1 and view[-1]["n_samples"] == 1:
+                    return [NsxSegment(view["samples"], view["timestamp"], int(view[0]["timestamp"]))]
+            n = min(n, (len(mm) - start) // row_bytes)  # a recording cut short ends mid-packet
+            samples = mm[start : start + n * row_bytes].view("<i2").reshape(n, n_ch)
+            segments.append(NsxSegment(samples, None, int(packet["timestamp"])))
+            pos = start + n * row_bytes
+        return [seg for seg in segments if len(seg.samples)]
+
+
+# --- NEV file format (2.2, 2.3 and 3.0) ------------------------------------
+
+_NEV_BASIC_HEADER = np.dtype(
+    [
+        ("file_type", "S8"),  # NEURALEV (2.x) or BREVENTS (3.0)
+        ("major", "u1"),
+        ("minor", "u1"),
+        ("flags", "<u2"),
+        ("header_bytes", "<u4"),  # basic + extended headers
+        ("packet_bytes", "<u4"),  # every data packet has this size
+        ("resolution", "<u4"),  # timestamp ticks per second
+        ("sample_resolution", "<u4"),  # waveform samples per second
+        ("time_origin", "<u2", (8,)),  # SYSTEMTIME
+        ("application", "S32"),
+        ("comment", "S256"),
+        ("n_ext_headers", "<u4"),
+    ]
+)
+_NEV_EXT_HEADER = np.dtype([("id", "S8"), ("body", "V24")])
+_NEV_WAVEFORM_INFO = np.dtype(  # NEUEVWAV body
+    [
+        ("electrode_id", "<u2"),
+        ("connector", "u1"),  # 1-based bank
+        ("pin", "u1"),
+        ("digitization", "<u2"),  # nV per bit
+        ("energy_threshold", "<u2"),
+        ("high_threshold", "<i2"),
+        ("low_threshold", "<i2"),
+        ("n_units", "u1"),
+        ("bytes_per_sample", "u1"),
+        ("spike_width", "<u2"),
+        ("reserved", "V8"),
+    ]
+)
+_NEV_LABEL_INFO = np.dtype([("electrode_id", "<u2"), ("label", "S16"), ("reserved", "V6")])  # NEUEVLBL body
+_NEV_FILE_TYPES = {b"NEURALEV": "<u4", b"BREVENTS": "<u8"}  # -> data-packet timestamp type
+_NEV_MAX_ELECTRODE = 2048  # packet ids 1..2048 are spikes; 0 is digital input, 0xFFxx are comments etc.
+_NEV_SCAN_BLOCK = 65536  # packets checked at a time while looking for the first spike
+
+
+class NevFile:
+    """A memory-mapped Blackrock ``.nev`` file (spec 2.2, 2.3 or 3.0).
+
+    Only the headers are parsed on open; :attr:`packets` is a structured view
+    of the fixed-size data packets, so any range of them is decoded with one
+    read. Packets are assumed to be in timestamp order, as the device writes
+    them."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        basic = np.fromfile(self.path, dtype=_NEV_BASIC_HEADER, count=1)
+        if not len(basic):
+            raise ValueError(f"{self.path}: too short for a NEV header")
+        basic = basic[0]
+        ts_type = _NEV_FILE_TYPES.get(bytes(basic["file_type"]))
+        if ts_type is None:
+            raise ValueError(
+                f"{self.path}: unsupported NEV file type {bytes(basic['file_type'])!r} "
+                "(spec 2.2, 2.3 and 3.0 are supported)"
+            )
+        self.resolution = int(basic["resolution"])
+        ext = np.fromfile(
+            self.path, dtype=_NEV_EXT_HEADER, count=int(basic["n_ext_headers"]), offset=_NEV_BASIC_HEADER.itemsize
+        )
+        waveform_info = ext["body"][ext["id"] == b"NEUEVWAV"].view(_NEV_WAVEFORM_INFO)
+        label_info = ext["body"][ext["id"] == b"NEUEVLBL"].view(_NEV_LABEL_INFO)
+        self.electrodes = np.sort(waveform_info, order="electrode_id")
+        """NEUEVWAV record per electrode (``electrode_id``, ``connector``, ``pin``, ...)."""
+        self.labels = {int(e): _text(lbl) for e, lbl in zip(label_info["electrode_id"], label_info["label"])}
+        """Electrode id → label (NEUEVLBL)."""
+
+        header_bytes, packet_bytes = int(basic["header_bytes"]), int(basic["packet_bytes"])
+        fixed = np.dtype(ts_type).itemsize + 4
+        self.packets = np.memmap(
+            self.path,
+            dtype=np.dtype(
+                [
+                    ("timestamp", ts_type),
+                    ("packet_id", "<u2"),
+                    ("unit", "u1"),  # classification: 0 unsorted, 1..16 sorted, 255 noise
+                    ("reserved", "u1"),
+                    ("waveform", f"V{packet_bytes - fixed}"),
+                ]
+            ),
+            mode="r",
+            offset=header_bytes,
+            shape=(max(0, self.path.stat().st_size - header_bytes) // packet_bytes,),
+        )
+
+    def first_spike(self) -> int | None:
+        """Index of the first spike packet, or None if there is none."""
+        for start in range(0, len(self.packets), _NEV_SCAN_BLOCK):
+            ids = self.packets["packet_id"][start : start + _NEV_SCAN_BLOCK]
+            hits = np.flatnonzero((ids >= 1) & (ids <= _NEV_MAX_ELECTRODE))
+            if len(hits):
+                return start + int(hits[0])
+        return None
+
+    def to_ns(self, ticks: int | np.ndarray) -> int | np.ndarray:
+        """File timestamp ticks to device nanoseconds."""
+        if self.resolution == NS_PER_SECOND:
+            return ticks
+        return ticks * NS_PER_SECOND // self.resolution
+
+
+# --- NSx replay producer/source --------------------------------------------
+
+
+class ReplayPacing(enum.Enum):
+    """How fast a replay source releases its messages."""
+
+    REALTIME = "realtime"
+    """Each message when the device would have completed it (its last sample,
+    or its window's end), counted from replay start — reproduces live
+    arrival timing."""
+
+    FAST = "fast"
+    """As fast as the pipeline consumes them — for throughput tests."""
+
+
+class NsxReplaySettings(ez.Settings):
+    """Settings for :class:`NsxReplaySource`."""
+
+    path: str | None = None
+    """The ``.nsX`` file to replay. ``None`` = idle."""
+
+    pacing: ReplayPacing = ReplayPacing.REALTIME
+    """See :class:`ReplayPacing`."""
+
+    chunk_dur: float = 0.01
+    """Seconds of samples per message (whole samples, at least one). A message
+    never spans two data packets, so pauses in the recording end a message."""
+
+    cbtime: bool = False
+    """True = the file's device timestamps in seconds, like
+    :attr:`CereLinkSignalSettings.cbtime`; False = ``time.monotonic()`` at
+    replay start plus the recording's elapsed time (with ``FAST`` pacing a
+    virtual timeline that runs ahead of the host clock)."""
+
+    microvolts: bool = True
+    """Convert int16 → µV using the file's per-channel scaling."""
+
+    output_dtype: OutputDType | None = None
+    """Dtype of the emitted samples; ``None`` = ``FLOAT64`` with ``microvolts``,
+    ``INT16`` without. Raw ``INT16`` messages are read-only views of the
+    memory-mapped file (strided for files with a packet per sample)."""
+
+    def __post_init__(self):
+        if self.chunk_dur <= 0:
+            raise ValueError(f"chunk_dur must be positive, got {self.chunk_dur}")
+        if self.output_dtype is OutputDType.INT16 and self.microvolts:
+            raise ValueError(
+                "output_dtype=OutputDType.INT16 carries raw device counts; set "
+                "microvolts=False, or pick FLOAT32/FLOAT64 for µV output."
+            )
+
+    @property
+    def sample_dtype(self) -> np.dtype:
+        """The resolved :attr:`output_dtype`."""
+        if self.output_dtype is None:
+            return np.dtype(np.float64 if self.microvolts else np.int16)
+        return np.dtype(self.output_dtype.value)
+
+
+@processor_state
+class NsxReplayState:
+    file: NsxFile | None = None
+    template: AxisArray | None = None
+    write_scale: np.ndarray | None = None  # [1, n_ch] in the output dtype; None = no scaling
+    chunk: int = 1  # samples per message
+    segment: int = 0  # next segment to read ...
+    position: int = 0  # ... and row within it
+    start: float | None = None  # monotonic time the first message was released
+    first_ns: int = 0  # device ns of the file's first sample
+
+
+class NsxReplayProducer(BaseStatefulProducer[NsxReplaySettings, AxisArray, NsxReplayState]):
+    """Replays an :class:`NsxFile` with the message layout of
+    :class:`~ezmsg.blackrock.cerelink.CereLinkSignalProducer`. At the end of
+    the file it goes idle."""
+
+    def _reset_state(self) -> None:
+        self.close()
+        st = self.state
+        st.segment = st.position = 0
+        st.start = None
+        if self.settings.path is None:
+            return
+        nsx = NsxFile(self.settings.path)
+        rate = nsx.sample_rate
+        channels = nsx.channels
+        ch_info = np.zeros(len(channels), dtype=CHANNEL_DTYPE)
+        for i, ch in enumerate(channels):
+            ch_info[i]["label"] = _text(ch["label"]) or f"ch{ch['electrode_id']}"
+            ch_info[i]["bank"] = chr(ord("A") + ch["connector"] - 1) if ch["connector"] > 0 else ""
+            ch_info[i]["elec"] = ch["pin"]
+        st.template = AxisArray(
+            np.zeros((0, 0)),
+            dims=["time", "ch"],
+            axes={
+                "time": AxisArray.TimeAxis(nsx.fs, offset=0.0),
+                "ch": AxisArray.CoordinateAxis(data=ch_info, dims=["ch"], unit="struct"),
+            },
+            key=rate.name,
+            attrs={
+                "unit": "uV" if self.settings.microvolts else "raw",
+                "manufacturer": "CereLink",
+                "device": nsx.path.name,
+            },
+        )
+        dtype = self.settings.sample_dtype
+        st.write_scale = self._scale_factors(channels).astype(dtype)[None, :] if self.settings.microvolts else None
+        st.chunk = max(1, round(self.settings.chunk_dur * nsx.fs))
+        st.first_ns = int(nsx.to_ns(nsx.sample_ticks(nsx.segments[0], 0, 1)[0])) if nsx.segments else 0
+        st.file = nsx
+
+    @staticmethod
+    def _scale_factors(channels: np.ndarray) -> np.ndarray:
+        """Per-channel int16 → µV factors from the extended headers (1.0 where
+        the file gives no usable scaling)."""
+        digital = channels["max_digital"].astype(np.float64) - channels["min_digital"]
+        analog = channels["max_analog"].astype(np.float64) - channels["min_analog"]
+        usable = digital != 0
+        sf = np.divide(analog, digital, out=np.ones(len(channels)), where=usable)
+        millivolts = np.array([_text(u) == "mV" for u in channels["units"]], dtype=bool)
+        sf[millivolts & usable] *= 1000  # mV -> uV
+        return sf
+
+    @property
+    def finished(self) -> bool:
+        """True once every sample of the file has been emitted."""
+        st = self.state
+        return st.file is not None and st.segment >= len(st.file.segments)
+
+    async def _produce(self) -> AxisArray | None:
+        st = self.state
+        if st.file is None or self.finished:
+            await asyncio.sleep(0.1)
+            return None
+        nsx = st.file
+        segment = nsx.segments[st.segment]
+        start = st.position
+        stop = min(start + st.chunk, len(segment.samples))
+        if stop == len(segment.samples):
+            st.segment, st.position = st.segment + 1, 0
+            if self.finished:
+                logger.info("NSx replay: reached the end of %s", nsx.path)
+        else:
+            st.position = stop
+        first_ns, last_ns = (int(nsx.to_ns(t)) for t in nsx.sample_ticks(segment, start, stop))
+
+        if st.start is None:
+            st.start = time.monotonic() - (last_ns - st.first_ns) / NS_PER_SECOND
+        if self.settings.pacing is ReplayPacing.REALTIME:
+            delay = st.start + (last_ns - st.first_ns) / NS_PER_SECOND - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        samples = segment.samples[start:stop]
+        if st.write_scale is None and samples.dtype == self.settings.sample_dtype:
+            out_dat = samples  # read-only view of the mapping
+        else:
+            out_dat = np.empty(samples.shape, dtype=self.settings.sample_dtype)
+            store_samples(out_dat, samples, st.write_scale)
+        if self.settings.cbtime:
+            offset = first_ns / 1e9
+        else:
+            offset = st.start + (first_ns - st.first_ns) / NS_PER_SECOND
+        template = st.template
+        time_ax = replace(template.axes["time"], offset=offset)
+        return replace(template, data=out_dat, axes={**template.axes, "time": time_ax})
+
+    def close(self) -> None:
+        """Drop the file mapping (views already emitted keep it alive)."""
+        self.state.file = None
+
+
+class NsxReplaySource(BaseProducerUnit[NsxReplaySettings, AxisArray, NsxReplayProducer]):
+    """ezmsg Unit that replays a ``.nsX`` file on ``OUTPUT_SIGNAL`` in the
+    :class:`~ezmsg.blackrock.cerelink.CereLinkSignalSource` format."""
+
+    SETTINGS = NsxReplaySettings
+
+    def shutdown(self) -> None:
+        self.producer.close()
+
+
+# --- NEV replay producer/source --------------------------------------------
+
+
+class NevReplaySettings(ez.Settings):
+    """Settings for :class:`NevReplaySource`. The window fields mean what they
+    do in :class:`~ezmsg.blackrock.cerelink.CereLinkSpikeSettings`."""
+
+    path: str | None = None
+    """The ``.nev`` file to replay. ``None`` = idle."""
+
+    pacing: ReplayPacing = ReplayPacing.REALTIME
+    """See :class:`ReplayPacing`."""
+
+    cbtime: bool = False
+    """True = the file's device timestamps in seconds; False =
+    ``time.monotonic()`` at replay start plus the recording's elapsed time
+    (see :attr:`NsxReplaySettings.cbtime`)."""
+
+    spike_buffer_dur: float = 0.5
+    """Window duration in seconds (at the 30 kHz spike clock)."""
+
+    output_format: SpikeFormat = SpikeFormat.DENSE
+    """Dense window tensor or one sparse record per spike. See :class:`SpikeFormat`."""
+
+    bin_width: float | None = None
+    """Seconds. Count spikes in bins of this width instead of at the 30 kHz
+    spike clock."""
+
+    unit_groups: tuple[tuple[int, ...], ...] | None = None
+    """Collapse the 7 unit buckets (``0=unsorted, 1..5=sorted, 6=noise``,
+    classifications above 5 included) into one output unit per group."""
+
+    def __post_init__(self):
+        if self.spike_buffer_dur <= 0:
+            raise ValueError(f"spike_buffer_dur must be positive, got {self.spike_buffer_dur}")
+        if self.bin_width is not None and self.bin_width <= 0:
+            raise ValueError(f"bin_width must be positive, got {self.bin_width}")
+        check_unit_groups(self.unit_groups)
+
+    @property
+    def bin_samples(self) -> int:
+        """Spike-clock samples per output row (1 without ``bin_width``)."""
+        if self.bin_width is None:
+            return 1
+        return max(1, round(self.bin_width * SPIKE_FS))
+
+
+@processor_state
+class NevReplayState:
+    file: NevFile | None = None
+    template: AxisArray | None = None
+    n_t: int = 0  # spike-clock samples per window
+    bin_samples: int = 1
+    unit_lut: np.ndarray | None = None  # classification bucket (0..6) -> output unit, -1 = dropped
+    chid_lut: np.ndarray | None = None  # packet id -> ch column, -1 = not an output channel
+    anchor: int = -1  # timestamp (file ticks) of window 0's first sample; -1 = no spikes
+    window_index: int = 0  # next window to emit
+    cursor: int = 0  # first packet not yet counted
+    start: float | None = None  # monotonic time replay started (window 0's origin)
+
+
+class NevReplayProducer(BaseStatefulProducer[NevReplaySettings, AxisArray, NevReplayState]):
+    """Replays the spike packets of a :class:`NevFile` as the windows of
+    :class:`~ezmsg.blackrock.cerelink.CereLinkSpikeProducer`: window 0
+    starts at the first spike, windows tile the spike clock from there
+    (empty ones included), and classifications above 5 count as noise. The
+    channel axis lists the electrodes with waveform headers (NEUEVWAV);
+    spikes on other packet ids are not counted. At the end of the file it
+    goes idle."""
+
+    def _reset_state(self) -> None:
+        self.close()
+        st = self.state
+        st.window_index = st.cursor = 0
+        st.start = None
+        if self.settings.path is None:
+            return
+        nev = NevFile(self.settings.path)
+        bin_samples = self.settings.bin_samples
+        n_rows = max(1, round(self.settings.spike_buffer_dur * SPIKE_FS / bin_samples))
+        unit_lut, unit_labels = build_unit_lut(self.settings.unit_groups)
+
+        electrodes = nev.electrodes["electrode_id"].astype(np.int64)
+        ch_info = np.zeros(len(electrodes), dtype=CHANNEL_DTYPE)
+        for i, info in enumerate(nev.electrodes):
+            ch_id = int(info["electrode_id"])
+            ch_info[i]["label"] = nev.labels.get(ch_id) or f"ch{ch_id}"
+            ch_info[i]["bank"] = chr(ord("A") + info["connector"] - 1) if info["connector"] > 0 else ""
+            ch_info[i]["elec"] = info["pin"]
+        st.template = AxisArray(
+            np.zeros((0, 0, 0), dtype=np.uint8),
+            dims=["time", "ch", "unit"],
+            axes={
+                "time": AxisArray.TimeAxis(SPIKE_FS / bin_samples, offset=0.0),
+                "ch": AxisArray.CoordinateAxis(data=ch_info, dims=["ch"], unit="struct"),
+                "unit": AxisArray.CoordinateAxis(data=unit_labels, dims=["unit"], unit="label"),
+            },
+            key="SPIKES",
+            attrs={"unit": "count", "manufacturer": "CereLink", "device": nev.path.name},
+        )
+        st.n_t = n_rows * bin_samples
+        st.bin_samples = bin_samples
+        st.unit_lut = unit_lut
+        st.chid_lut = np.full(_NEV_MAX_ELECTRODE + 2, -1, dtype=np.int64)  # last entry: take(mode="clip")
+        st.chid_lut[electrodes[electrodes <= _NEV_MAX_ELECTRODE]] = np.flatnonzero(electrodes <= _NEV_MAX_ELECTRODE)
+        first = nev.first_spike()
+        st.anchor = -1 if first is None else int(nev.packets["timestamp"][first])
+        st.cursor = 0 if first is None else first
+        st.file = nev
+
+    @property
+    def finished(self) -> bool:
+        """True once every packet of the file has been counted (or it has no spikes)."""
+        st = self.state
+        return st.file is not None and (st.anchor == -1 or st.cursor >= len(st.file.packets))
+
+    def _window_tick(self, window: int) -> int:
+        """File timestamp of window ``window``'s first sample (``ceil_div``,
+        like :meth:`CereLinkSpikeProducer._window_origin`)."""
+        st = self.state
+        return st.anchor + -(-window * st.n_t * st.file.resolution // SPIKE_FS)
+
+    async def _produce(self) -> AxisArray | None:
+        st = self.state
+        if st.file is None or self.finished:
+            await asyncio.sleep(0.1)
+            return None
+        nev = st.file
+        w = st.window_index
+        origin, end = self._window_tick(w), self._window_tick(w + 1)
+        origin_ns, anchor_ns = int(nev.to_ns(origin)), int(nev.to_ns(st.anchor))
+        if st.start is None:
+            st.start = time.monotonic()
+        if self.settings.pacing is ReplayPacing.REALTIME:
+            delay = st.start + (int(nev.to_ns(end)) - anchor_ns) / NS_PER_SECOND - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        timestamps = nev.packets["timestamp"]
+        stop = st.cursor + int(np.searchsorted(timestamps[st.cursor :], end, side="left"))
+        packets = nev.packets[st.cursor : stop]  # one read of the window's packets
+        st.cursor = stop
+        st.window_index = w + 1
+        if self.finished:
+            logger.info("NEV replay: reached the end of %s", nev.path)
+
+        ids = packets["packet_id"].astype(np.int64)
+        ch_idx = st.chid_lut.take(ids, mode="clip")
+        ch_idx[ids > _NEV_MAX_ELECTRODE] = -1  # comments, digital input etc. (id 0 maps to -1 already)
+        unit_idx = st.unit_lut[np.minimum(packets["unit"], 6)]
+        keep = (ch_idx >= 0) & (unit_idx >= 0)
+        sample = (packets["timestamp"][keep].astype(np.int64) - st.anchor) * SPIKE_FS // nev.resolution
+        row = (sample - w * st.n_t) // st.bin_samples
+        n_rows = st.n_t // st.bin_samples
+        # A packet out of timestamp order can precede the window's origin;
+        # its negative row would wrap to the window's end, so drop it.
+        inside = (row >= 0) & (row < n_rows)
+        dropped = len(row) - int(np.count_nonzero(inside))
+        coords = (row[inside], ch_idx[keep][inside], unit_idx[keep][inside])
+
+        template = st.template
+        shape = (n_rows, len(template.axes["ch"].data), len(template.axes["unit"].data))
+        dtype = np.uint8 if st.bin_samples == 1 else np.uint16
+        if self.settings.output_format is SpikeFormat.SPARSE:
+            out_data = sparse.COO(np.stack(coords), data=np.ones(len(coords[0]), dtype=dtype), shape=shape)
+        else:
+            out_data = np.zeros(shape, dtype=dtype)
+            np.add.at(out_data, coords, 1)
+        if self.settings.cbtime:
+            offset = origin_ns / 1e9
+        else:
+            offset = st.start + (origin_ns - anchor_ns) / NS_PER_SECOND
+        time_ax = replace(template.axes["time"], offset=offset)
+        attrs = {**template.attrs, "dropped_spikes": dropped} if dropped else template.attrs
+        return replace(template, data=out_data, axes={**template.axes, "time": time_ax}, attrs=attrs)
+
+    def close(self) -> None:
+        """Drop the file mapping."""
+        self.state.file = None
+
+
+class NevReplaySource(BaseProducerUnit[NevReplaySettings, AxisArray, NevReplayProducer]):
+    """ezmsg Unit that replays the spikes of a ``.nev`` file on
+    ``OUTPUT_SIGNAL`` in the :class:`~ezmsg.blackrock.cerelink.CereLinkSpikeSource`
+    format."""
+
+    SETTINGS = NevReplaySettings
+
+    def shutdown(self) -> None:
+        self.producer.close()
@@ -0,0 +1,270 @@
+"""Process-wide registry of shared pycbsdk Sessions, keyed by :class:`~pycbsdk.DeviceType`.
+
+Every CereLink unit in a process that targets the same device shares one
+:class:`~pycbsdk.Session`: the first :func:`acquire_session` opens it (and waits
+for the device to run), later ones attach to it, and the Session is closed when
+the last :class:`SessionLease` is released. Each user sees its own lease, which
+behaves like the Session except that:
+
+* callbacks registered through it are fanned out from a single library
+  registration per stream and disappear when the lease is released, so a
+  closed unit stops receiving data without tearing down the others;
+* :meth:`SessionLease.sync` coalesces with concurrent syncs on the same device;
+* :meth:`SessionLease.new_stream_id` hands out library monotonicity keys no
+  other user of the Session holds;
+* ``close()`` / ``__exit__`` release the lease rather than the Session.
+
+:func:`set_session_factory` swaps what is opened, e.g. for the in-process
+:class:`~ezmsg.blackrock.fake.FakeSession`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import threading
+import typing
+
+from pycbsdk import ChannelType, DeviceType, SampleRate, Session
+
+logger = logging.getLogger(__name__)
+
+_FIRST_STREAM_ID = 1 << 16  # allocated stream ids start above any hand-picked one
+
+
+class _SharedSession:
+    """One open Session plus its users, callback fan-out and sync coalescing."""
+
+    def __init__(self, device_type: DeviceType) -> None:
+        self.device_type = device_type
+        self.session: Session | None = None
+        self.refs = 0
+        self.ready = threading.Event()
+        self.error: BaseException | None = None
+        # Copy-on-write subscriber tuples, so the receive thread iterates a
+        # snapshot without taking a lock.
+        self._fanout: dict[tuple, tuple[typing.Callable, ...]] = {}
+        self._fanout_lock = threading.Lock()
+        # sync() coalescing: a caller needs a sync that *starts* after its call
+        # (the device answers in order, so that one covers its config packets).
+        self._sync_cond = threading.Condition()
+        self._sync_started = 0
+        self._sync_done = 0
+        self._sync_running = False
+        self._sync_error: BaseException | None = None
+        self._stream_ids = itertools.count(_FIRST_STREAM_ID)
+
+    async def open(self, timeout: float) -> None:
+        if _session_factory is None:
+            session = Session(device_type=self.device_type)
+        else:
+            session = _session_factory(self.device_type)
+        try:
+            await asyncio.to_thread(session.__enter__)
+            await session.wait_until_running(timeout=timeout)
+        except BaseException:
+            try:
+                await asyncio.to_thread(session.__exit__, None, None, None)
+            except Exception:
+                logger.exception("CereLink: cleanup-after-failure also failed")
+            raise
+        self.session = session
+
+    # --- callback fan-out ---
+
+    def subscribe(self, key: tuple, fn: typing.Callable, register: typing.Callable[[typing.Callable], None]) -> None:
+        with self._fanout_lock:
+            subs = self._fanout.get(key)
+            self._fanout[key] = (subs or ()) + (fn,)
+            if subs is None:
+                register(self._dispatcher(key))
+
+    def unsubscribe(self, key: tuple, fn: typing.Callable) -> None:
+        with self._fanout_lock:
+            subs = self._fanout.get(key, ())
+            self._fanout[key] = tuple(f for f in subs if f is not fn)
+
+    def _dispatcher(self, key: tuple) -> typing.Callable:
+        fanout = self._fanout
+
+        def dispatch(*args) -> None:
+            for fn in fanout.get(key, ()):
+                try:
+                    fn(*args)
+                except Exception:
+                    logger.exception("CereLink: callback for %s raised", key)
+
+        return dispatch
+
+    # --- sync coalescing ---
+
+    def sync(self, timeout: float) -> None:
+        with self._sync_cond:
+            needed = self._sync_started + 1
+            while self._sync_done < needed and self._sync_running:
+                self._sync_cond.wait()
+            if self._sync_done >= needed:
+                if self._sync_error is not None:
+                    raise RuntimeError("Device sync failed") from self._sync_error
+                return
+            self._sync_running = True
+            self._sync_started += 1
+            generation = self._sync_started
+        error = None
+        try:
+            self.session.sync(timeout)
+        except BaseException as exc:
+            error = exc
+        with self._sync_cond:
+            self._sync_done = generation
+            self._sync_error = error
+            self._sync_running = False
+            self._sync_cond.notify_all()
+        if error is not None:
+            raise error
+
+
+class SessionLease:
+    """A reference-counted handle on a shared :class:`~pycbsdk.Session`.
+
+    Attribute access falls through to the Session; see the module docstring
+    for what differs. Release with :meth:`close` (or ``__exit__``); a released
+    lease must not be used again.
+    """
+
+    def __init__(self, shared: _SharedSession) -> None:
+        self._shared = shared
+        self._subscriptions: list[tuple[tuple, typing.Callable]] = []
+        self._released = False
+
+    @property
+    def session(self) -> Session:
+        """The underlying shared Session."""
+        return self._shared.session
+
+    @property
+    def device_type(self) -> DeviceType:
+        return self._shared.device_type
+
+    def __getattr__(self, name: str) -> typing.Any:
+        if name.startswith("__") or name == "_shared":
+            raise AttributeError(name)
+        return getattr(self._shared.session, name)
+
+    def on_group_batch(self, rate: SampleRate = SampleRate.SR_30kHz) -> typing.Callable:
+        """Like :meth:`pycbsdk.Session.on_group_batch`. Subscribers of the same
+        rate receive the same arrays and must not modify them."""
+        rate = SampleRate(rate)
+
+        def decorator(fn):
+            self._subscribe(("group_batch", int(rate)), fn, lambda cb: self.session.on_group_batch(rate)(cb))
+            return fn
+
+        return decorator
+
+    def on_event(self, channel_type: ChannelType | None = ChannelType.FRONTEND) -> typing.Callable:
+        """Like :meth:`pycbsdk.Session.on_event`."""
+
+        def decorator(fn):
+            self._subscribe(("event", channel_type), fn, lambda cb: self.session.on_event(channel_type)(cb))
+            return fn
+
+        return decorator
+
+    def _subscribe(self, key: tuple, fn: typing.Callable, register: typing.Callable) -> None:
+        self._shared.subscribe(key, fn, register)
+        self._subscriptions.append((key, fn))
+
+    def new_stream_id(self) -> int:
+        """A ``stream_id`` for :meth:`~pycbsdk.Session.device_to_monotonic_batch`
+        that no other user of this Session has been given, so its monotonic
+        floor is its own."""
+        return next(self._shared._stream_ids)
+
+    def sync(self, timeout: float = 5.0) -> None:
+        """Like :meth:`pycbsdk.Session.sync`, but one device round-trip serves
+        every caller waiting at the same time."""
+        self._shared.sync(timeout)
+
+    def close(self) -> None:
+        """Drop this lease's callbacks and reference; the Session closes with
+        the last lease."""
+        if self._released:
+            return
+        self._released = True
+        for key, fn in self._subscriptions:
+            self._shared.unsubscribe(key, fn)
+        self._subscriptions.clear()
+        _release(self._shared)
+
+    def __enter__(self) -> SessionLease:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_registry: dict[DeviceType, _SharedSession] = {}
+_registry_lock = threading.Lock()
+_session_factory: typing.Callable[[DeviceType], Session] | None = None
+
+
+def set_session_factory(
+    factory: typing.Callable[[DeviceType], Session] | None,
+) -> typing.Callable[[DeviceType], Session] | None:
+    """Open shared Sessions with ``factory(device_type)`` instead of
+    :class:`pycbsdk.Session` (``None`` restores it); returns the previous
+    factory. Only Sessions opened afterwards are affected."""
+    global _session_factory
+    previous, _session_factory = _session_factory, factory
+    return previous
+
+
+async def acquire_session(device_type: DeviceType, *, timeout: float = 10.0) -> SessionLease:
+    """Lease the process-wide Session for *device_type*, opening it (and
+    waiting up to *timeout* seconds for the device to run) if no other unit
+    holds it. Concurrent first calls share one open."""
+    with _registry_lock:
+        shared = _registry.get(device_type)
+        opener = shared is None
+        if opener:
+            shared = _registry[device_type] = _SharedSession(device_type)
+        shared.refs += 1
+    if opener:
+        try:
+            await shared.open(timeout)
+        except BaseException as exc:
+            with _registry_lock:
+                if _registry.get(device_type) is shared:
+                    del _registry[device_type]
+            shared.error = exc
+            shared.ready.set()
+            raise
+        shared.ready.set()
+    else:
+        try:
+            await asyncio.to_thread(shared.ready.wait)
+            if shared.error is not None:
+                raise RuntimeError(f"Failed to open a {device_type.name} session") from shared.error
+        except BaseException:
+            _release(shared)  # cancelled or failed: give the reference back
+            raise
+    return SessionLease(shared)
+
+
+def _release(shared: _SharedSession) -> None:
+    with _registry_lock:
+        shared.refs -= 1
+        last = shared.refs == 0
+        if last and _registry.get(shared.device_type) is shared:
+            del _registry[shared.device_type]
+    if last and shared.session is not None:
+        shared.session.__exit__(None, None, None)
+        shared.session = None
+
+
+def active_sessions() -> dict[DeviceType, int]:
+    """Lease count per device with an open (or opening) shared Session."""
+    with _registry_lock:
+        return {device_type: shared.refs for device_type, shared in _registry.items()}
@@ -0,0 +1,178 @@
+"""In-process instrumentation for the CereLink sources.
+
+:class:`LatencyHistogram` is a fixed-memory, log-linear (HDR-style) histogram
+of nanosecond intervals; :class:`LatencyTracker` keeps one per pipeline stage
+and turns them into a :class:`LatencyStats` message once per reporting
+period. Recording is a handful of integer operations, so it can run on the
+receive thread; the percentiles are only computed when a report is built.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+
+_NS = 1e-9
+
+
+class LatencyHistogram:
+    """Counts of non-negative nanosecond values in log-linear buckets.
+
+    Values below ``2 ** precision_bits`` get a bucket each; above that every
+    power-of-two range is split into ``2 ** (precision_bits - 1)`` buckets, so
+    a reported percentile is within ``2 ** -(precision_bits - 1)`` of the true
+    value (1.6 % with the default 7 bits). Values past *max_ns* share the last
+    bucket; :attr:`max` stays exact. Memory is fixed at construction (about
+    2000 buckets for the defaults).
+
+    Not locked: one thread records, and a concurrent reader sees a count that
+    may be off by the samples in flight.
+    """
+
+    def __init__(self, precision_bits: int = 7, max_ns: int = 1 << 36) -> None:
+        if precision_bits < 2:
+            raise ValueError(f"precision_bits must be >= 2, got {precision_bits}")
+        self._bits = precision_bits
+        self._half = 1 << (precision_bits - 1)
+        self._counts = [0] * (self._index(max_ns) + 1)
+        self.count = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self._bits
+        if shift <= 0:
+            return value
+        return shift * self._half + (value >> shift)
+
+    def _upper(self, index: int) -> int:
+        """Largest value that lands in bucket *index*."""
+        shift = index // self._half - 1
+        if shift <= 0:
+            return index
+        return ((index - shift * self._half + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        """Count one interval of *value* ns (negative values count as 0)."""
+        if value < 0:
+            value = 0
+        counts = self._counts
+        counts[min(self._index(value), len(counts) - 1)] += 1
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> int:
+        """The value (ns) at or below which *q* percent of the recorded
+        intervals fall, rounded up to its bucket's edge; 0 when empty."""
+        if self.count == 0:
+            return 0
+        rank = max(1, -int(-q * self.count // 100))
+        seen = 0
+        last = len(self._counts) - 1
+        for index, n in enumerate(self._counts):
+            seen += n
+            if seen >= rank:
+                return self.max if index == last else min(self._upper(index), self.max)
+        return self.max
+
+    def reset(self) -> None:
+        self._counts = [0] * len(self._counts)
+        self.count = 0
+        self.max = 0
+
+
+@dataclass
+class StageLatency:
+    """Distribution of one stage's intervals over a reporting period, in seconds."""
+
+    count: int
+    p50: float
+    p99: float
+    p999: float
+    max: float
+
+
+@dataclass
+class LatencyStats:
+    """Per-stage latency, emitted on a source's ``OUTPUT_LATENCY`` once per
+    reporting period (see e.g. :attr:`CereLinkSignalSettings.latency_stats`).
+
+    Each entry of :attr:`stages` covers the intervals recorded since the
+    previous report; stages with nothing recorded are omitted. Stages that
+    start at the device timestamp need clock sync, as they map it onto
+    ``time.monotonic()``."""
+
+    stream: str
+    """The source's stream (the emitted messages' ``key``)."""
+    period: float
+    """Seconds covered by this report."""
+    stages: dict[str, StageLatency] = field(default_factory=dict)
+
+
+class LatencyTracker:
+    """One :class:`LatencyHistogram` per named stage plus the reporting schedule."""
+
+    def __init__(self, stream: str, stages: tuple[str, ...], period: float) -> None:
+        self.stream = stream
+        self.period = period
+        self._hists = {name: LatencyHistogram() for name in stages}
+        self._started = time.monotonic()
+
+    def record(self, stage: str, ns: int) -> None:
+        self._hists[stage].record(ns)
+
+    def report(self, now: float | None = None) -> LatencyStats | None:
+        """A :class:`LatencyStats` for the elapsed period, resetting the
+        histograms, or None if the period hasn't elapsed yet."""
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._started
+        if elapsed < self.period:
+            return None
+        self._started = now
+        stages = {}
+        for name, hist in self._hists.items():
+            if hist.count:
+                stages[name] = StageLatency(
+                    count=hist.count,
+                    p50=hist.percentile(50) * _NS,
+                    p99=hist.percentile(99) * _NS,
+                    p999=hist.percentile(99.9) * _NS,
+                    max=hist.max * _NS,
+                )
+                hist.reset()
+        return LatencyStats(stream=self.stream, period=elapsed, stages=stages)
+
+
+@dataclass
+class SourceStats:
+    """Health counters for one source stream, emitted on a source's
+    ``OUTPUT_STATS`` every ``stats_interval`` seconds (see e.g.
+    :attr:`CereLinkSignalSettings.stats_interval`) whether or not data is
+    flowing. Rates and message counts cover the period since the previous
+    report; ``overruns`` and ``dropped`` are cumulative for the subscription."""
+
+    stream: str
+    """The source's stream (the emitted messages' ``key``)."""
+    period: float
+    """Seconds covered by this report."""
+    received_rate: float
+    """Samples (signal) or spikes (spike) received per second."""
+    callback_rate: float
+    """Receive-thread callbacks per second."""
+    buffer_fill: float
+    """Fraction of the buffer holding data not yet emitted, at report time.
+    For spikes: how far the device clock has run into the window ring."""
+    overruns: int
+    """Batches that did not fit in the buffer (0 for spikes)."""
+    dropped: int
+    """Samples (signal) or spikes (spike) discarded."""
+    messages: int
+    """Messages emitted in the period."""
+    mean_chunk: float
+    """Mean samples (signal) or spikes (spike) per emitted message; 0 without messages."""
+    max_chunk: int
+    """Largest message in the period, in the same unit."""
+    queue_depth: int
+    """Messages built ahead by the ``assembly_queue`` worker (0 without it)."""
+    clock_synced: bool
+    """Whether the device → host clock model has a sync point."""
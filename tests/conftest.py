@@ -1,6 +1,7 @@
 """Shared test fixtures for ezmsg-blackrock."""
 
 import ast
+import asyncio
 import atexit
 import base64
 import ctypes
@@ -21,6 +22,9 @@ import numpy as np
 import pytest
 from ezmsg.util.messagecodec import NDARRAY_TYPE, PICKLE_TYPE, TYPE, LogStart, import_type
 
+from ezmsg.blackrock.cerelink import CereLinkMultiRateProducer
+from ezmsg.blackrock.clock import LinearClockModel
+
 CERELINK_RELEASE_URL = "https://github.com/CerebusOSS/CereLink/releases/download/v9.3.0"
 CACHE_DIR = Path(__file__).parent / ".test_cache"
 
@@ -115,6 +119,19 @@ def read_log(path: Path) -> list:
     return messages
 
 
+def open_on_mock(prod, session, loop=None) -> None:
+    """Attach *prod* to a mock *session* as ``_open_and_configure`` would, then
+    subscribe. Receive-thread callbacks wake *loop*: by default the running
+    one, so no test leaves an unclosed loop behind (sync tests pass a mock)."""
+    prod.state.session = session
+    prod.state.ch_positions = {}
+    prod.state.clock = LinearClockModel(session)
+    if isinstance(prod, CereLinkMultiRateProducer):
+        prod.state.streams = prod._make_streams()
+        prod._apply_configure()
+    prod._setup_subscription(asyncio.get_running_loop() if loop is None else loop)
+
+
 def _force_kill_proc(proc: subprocess.Popen) -> None:
     """SIGKILL the process group, falling back to SIGKILL on the leader.
 
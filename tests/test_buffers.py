@@ -0,0 +1,123 @@
+"""Unit tests for the SPSCRing shared by the CereLink producers."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from ezmsg.blackrock.buffers import OverflowPolicy, SPSCRing
+
+
+def _ring(capacity: int = 8, policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST) -> SPSCRing:
+    return SPSCRing(capacity, [((2,), np.int16), ((), np.uint64)], policy=policy)
+
+
+def _rows(start: int, n: int) -> tuple[np.ndarray, np.ndarray]:
+    seq = np.arange(start, start + n)
+    return np.stack([seq, -seq], axis=1).astype(np.int16), seq.astype(np.uint64)
+
+
+def _read_all(ring: SPSCRing) -> tuple[np.ndarray, int]:
+    """Drain the ring, concatenating the timestamp column; returns (seq, skipped)."""
+    parts, skipped = [], 0
+    while (got := ring.read()) is not None:
+        parts.append(got.columns[1])
+        skipped += got.skipped
+    return (np.concatenate(parts) if parts else np.empty(0, np.uint64)), skipped
+
+
+def test_commit_and_read():
+    ring = _ring()
+    assert ring.read() is None
+    assert ring.write(*_rows(0, 5)) == 5
+    got = ring.read()
+    assert got.start == 0 and got.skipped == 0
+    np.testing.assert_array_equal(got.columns[0][:, 1], -np.arange(5))
+    assert ring.read() is None
+    assert len(ring) == 0
+
+
+def test_reads_stop_at_wrap_unless_asked():
+    ring = _ring()
+    ring.write(*_rows(0, 6))
+    ring.read()
+    ring.write(*_rows(6, 5))  # lands in [6, 8) + [0, 3)
+    first = ring.read()
+    assert len(first.columns[1]) == 2
+    np.testing.assert_array_equal(ring.read().columns[1], [8, 9, 10])
+
+    ring.write(*_rows(11, 7))
+    np.testing.assert_array_equal(ring.read(stop_at_wrap=False).columns[1], np.arange(11, 18))
+
+
+def test_drop_oldest_reports_skipped_rows():
+    ring = _ring()
+    ring.write(*_rows(0, 6))
+    ring.write(*_rows(6, 5))  # 3 oldest unread rows overwritten
+    seq, skipped = _read_all(ring)
+    np.testing.assert_array_equal(seq, np.arange(3, 11))
+    assert skipped == 3
+    assert ring.overruns == 1 and ring.dropped == 3
+
+
+def test_drop_oldest_batch_larger_than_ring():
+    ring = _ring()
+    ring.write(*_rows(0, 20))
+    seq, skipped = _read_all(ring)
+    np.testing.assert_array_equal(seq, np.arange(12, 20))
+    assert skipped == 12
+
+
+def test_grow_keeps_everything():
+    ring = _ring(policy=OverflowPolicy.GROW)
+    ring.write(*_rows(0, 6))
+    ring.write(*_rows(6, 6))
+    assert ring.capacity >= 12
+    seq, skipped = _read_all(ring)
+    np.testing.assert_array_equal(seq, np.arange(12))
+    assert skipped == 0 and ring.dropped == 0
+
+
+def test_error_discards_and_latches():
+    ring = _ring(policy=OverflowPolicy.ERROR)
+    ring.write(*_rows(0, 6))
+    assert ring.write(*_rows(6, 6)) == 0
+    assert ring.error is not None and "ring overrun" in ring.error
+    seq, _ = _read_all(ring)
+    np.testing.assert_array_equal(seq, np.arange(6))
+
+
+@pytest.mark.parametrize("policy", [OverflowPolicy.DROP_OLDEST, OverflowPolicy.GROW])
+def test_threaded_rows_stay_ordered_and_intact(policy):
+    """A producer thread racing the consumer never yields a torn or reordered
+    row; every sequence number is either read once or counted as skipped."""
+    ring = _ring(capacity=64, policy=policy)
+    total = 50_000
+    done = threading.Event()
+
+    def produce():
+        pos = 0
+        while pos < total:
+            n = min(7, total - pos)
+            ring.write(*_rows(pos, n))
+            pos += n
+        done.set()
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+    parts, skipped = [], 0
+    while not done.is_set() or len(ring):
+        got = ring.read()
+        if got is None:
+            continue
+        data, ts = got.columns
+        np.testing.assert_array_equal(data[:, 0].astype(np.int64), ts.astype(np.int64).astype(np.int16))
+        np.testing.assert_array_equal(data[:, 1], -data[:, 0])
+        parts.append(ts)
+        skipped += got.skipped
+    thread.join()
+    seq = np.concatenate(parts)
+    assert np.all(np.diff(seq.astype(np.int64)) > 0)
+    assert len(seq) + skipped == total
+    if policy is OverflowPolicy.GROW:
+        assert skipped == 0
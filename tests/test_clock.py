@@ -0,0 +1,135 @@
+"""Unit tests for LinearClockModel against a mock Session whose clock sync
+reports a drifting device clock."""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from ezmsg.util.messages.axisarray import AxisArray
+from pycbsdk import DeviceType
+
+from ezmsg.blackrock import clock
+from ezmsg.blackrock.clock import CbtimeToMonotonicSettings, CbtimeToMonotonicTransformer, LinearClockModel
+from ezmsg.blackrock.fake import fake_sessions
+
+
+class _DriftingSync:
+    """Stands in for ``Session.device_to_monotonic_batch``: host seconds =
+    ``base + (1 + drift) * device_ns / 1e9``, plus an optional step."""
+
+    def __init__(self, base: float = 1000.0, drift: float = 20e-6) -> None:
+        self.base = base
+        self.drift = drift
+        self.calls = 0
+
+    def __call__(self, device_ns, stream_id=-1):
+        self.calls += 1
+        return [self.base + (1 + self.drift) * d * 1e-9 for d in device_ns]
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(clock.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _model(sync: _DriftingSync, **kwargs) -> LinearClockModel:
+    sess = MagicMock()
+    sess.device_to_monotonic_batch.side_effect = sync
+    return LinearClockModel(sess, **kwargs)
+
+
+def test_fit_recovers_drift_with_few_library_calls(fake_time):
+    sync = _DriftingSync()
+    model = _model(sync, refresh_interval=1.0)
+    for k in range(1000):
+        fake_time[0] = k * 0.01
+        dev = int(k * 0.01 * 1e9)
+        model.span_to_monotonic(dev, dev + 300_000)
+    assert sync.calls == 10
+    assert model.drift == pytest.approx(20e-6, rel=1e-3)
+    assert model.to_monotonic(20 * 10**9) == pytest.approx(sync([20 * 10**9])[0], abs=1e-9)
+
+
+def test_no_sync_returns_none(fake_time):
+    sess = MagicMock()
+    sess.device_to_monotonic_batch.side_effect = RuntimeError("no sync")
+    assert LinearClockModel(sess).span_to_monotonic(0, 10) is None
+
+
+def test_stream_floor_is_monotonic(fake_time):
+    model = _model(_DriftingSync(drift=0.0))
+    first = model.span_to_monotonic(10**9, 2 * 10**9, stream_id=1)
+    again = model.span_to_monotonic(int(1.5e9), int(1.6e9), stream_id=1)  # overlaps the previous span
+    assert again[0] == pytest.approx(first[1])
+    stateless = model.span_to_monotonic(int(1.5e9), int(1.6e9))
+    assert stateless[0] < first[1]
+
+
+def test_step_restarts_window_and_floors(fake_time):
+    sync = _DriftingSync(drift=0.0)
+    model = _model(sync, refresh_interval=1.0)
+    model.span_to_monotonic(10**9, 2 * 10**9, stream_id=1)
+    sync.base -= 0.5  # genuine re-sync: host mapping steps back 500 ms
+    fake_time[0] = 2.0
+    model.span_to_monotonic(3 * 10**9, 4 * 10**9, stream_id=1)
+    assert model.resyncs == 0  # one off-fit sample is not enough
+    fake_time[0] = 3.0
+    span = model.span_to_monotonic(5 * 10**9, 6 * 10**9, stream_id=1)
+    assert model.resyncs == 1
+    assert span[0] == pytest.approx(sync([5 * 10**9])[0])
+
+
+def test_stale_timestamp_is_skipped_but_clock_reset_resyncs(fake_time):
+    model = _model(_DriftingSync(drift=0.0), refresh_interval=0.0)
+    model.span_to_monotonic(9 * 10**9, 10 * 10**9, stream_id=1)
+    model.span_to_monotonic(8 * 10**9, int(9.5e9), stream_id=2)  # another stream, behind
+    assert model.resyncs == 0 and len(model._points) == 1
+    model.span_to_monotonic(10**9, 2 * 10**9, stream_id=1)  # device clock reset
+    assert model.resyncs == 1 and model._points[-1][0] == 2 * 10**9
+
+
+def test_single_outlier_keeps_outputs_monotonic(fake_time):
+    sync = _DriftingSync(drift=0.0)
+    model = _model(sync, refresh_interval=1.0)
+    exact = sync.__call__
+
+    def jittery(device_ns, stream_id=-1):
+        host = exact(device_ns, stream_id)
+        return [h - 0.005 for h in host] if sync.calls == 3 else host  # one sample 5 ms early
+
+    model._session.device_to_monotonic_batch.side_effect = jittery
+    ends = []
+    for k in range(6):
+        fake_time[0] = float(k)
+        span = model.span_to_monotonic(k * 10**9, (k + 1) * 10**9 - 1, stream_id=1)
+        assert span[0] >= (ends[-1] if ends else -float("inf"))
+        assert span[0] == pytest.approx(sync.base + k, abs=1e-9)  # the outlier never moved the fit
+        ends.append(span[1])
+    assert sync.calls == 6 and model.resyncs == 0
+
+
+def _device_time_message(device_s: float) -> AxisArray:
+    return AxisArray(np.zeros((3, 1)), dims=["time", "ch"], axes={"time": AxisArray.TimeAxis(30000.0, offset=device_s)})
+
+
+async def test_transformers_on_one_device_keep_their_own_floors():
+    with fake_sessions(n_channels=1) as opened:
+        first, second = (
+            CbtimeToMonotonicTransformer(settings=CbtimeToMonotonicSettings(device_type=DeviceType.NPLAY))
+            for _ in range(2)
+        )
+        try:
+            await first._areset_state()
+            await second._areset_state()
+            assert len(opened) == 1  # one shared Session...
+            assert first.state.stream_id != second.state.stream_id  # ...but a floor each
+            fake = opened[0]
+            first._process(_device_time_message(2.0))
+            out = second._process(_device_time_message(1.0))
+            # Not clamped to the other transformer's later output.
+            assert out.axes["time"].offset == pytest.approx(fake.device_to_monotonic(1_000_000_000))
+        finally:
+            first.close()
+            second.close()
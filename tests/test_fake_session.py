@@ -0,0 +1,207 @@
+"""Unit tests for the in-process FakeSession, on its own (steps driven by hand)
+and behind the unmodified CereLink producers (real-time data thread)."""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from pycbsdk import ChanInfoField, ChannelType, DeviceType, SampleRate
+
+from ezmsg.blackrock import sessions
+from ezmsg.blackrock.cerelink import (
+    CereLinkSignalProducer,
+    CereLinkSignalSettings,
+    CereLinkSpikeProducer,
+    CereLinkSpikeSettings,
+    SliceConfig,
+    _ffi,
+)
+from ezmsg.blackrock.fake import FakeSession, fake_samples, fake_sessions
+
+
+def _collect(fs: FakeSession, rate=SampleRate.SR_30kHz) -> list:
+    batches = []
+    fs.on_group_batch(rate)(lambda samples, timestamps: batches.append((samples, timestamps)))
+    return batches
+
+
+class TestFakeSession:
+    def test_batches_carry_deterministic_samples(self):
+        fs = FakeSession(n_channels=4, start_ns=5_000)
+        batches = _collect(fs)
+        for tick in (30, 60, 61, 61, 95):
+            fs._step(tick)
+        assert [len(ts) for _, ts in batches] == [30, 30, 1, 34]  # no empty batches
+        samples = np.concatenate([s for s, _ in batches])
+        timestamps = np.concatenate([ts for _, ts in batches])
+        np.testing.assert_array_equal(samples, fake_samples(np.arange(95), [1, 2, 3, 4]))
+        assert timestamps.dtype == np.uint64
+        np.testing.assert_array_equal(timestamps, 5_000 + np.arange(95) * 1_000_000_000 // 30000)
+
+    def test_lower_rate_groups(self):
+        fs = FakeSession(n_channels=4, groups={SampleRate.SR_1kHz: [1, 2], SampleRate.SR_30kHz: [4]})
+        slow, fast = _collect(fs, SampleRate.SR_1kHz), _collect(fs)
+        fs._step(100)
+        (slow_samples, slow_ts), (fast_samples, _) = slow[0], fast[0]
+        np.testing.assert_array_equal(slow_ts, np.array([0, 30, 60, 90]) * 1_000_000_000 // 30000)
+        np.testing.assert_array_equal(slow_samples, fake_samples([0, 30, 60, 90], [1, 2]))
+        assert fast_samples.shape == (100, 1)
+
+    def test_configuration_round_trip(self):
+        fs = FakeSession(n_channels=40)
+        fs.set_sample_group([3, 4], ChannelType.FRONTEND, SampleRate.SR_2kHz, disable_others=True)
+        assert fs.get_group_channels(int(SampleRate.SR_2kHz)) == [3, 4]
+        assert fs.get_group_channels(int(SampleRate.SR_30kHz)) == []
+        fs.set_sample_group(2, ChannelType.FRONTEND, SampleRate.SR_RAW)
+        assert fs.get_group_channels(int(SampleRate.SR_RAW)) == [1, 2]
+        groups = fs.get_channels_field(ChannelType.FRONTEND, ChanInfoField.SMPGROUP)
+        assert groups[:5] == [0, 0, 3, 3, 0]  # raw-group channels read 0
+        fs.set_spike_extraction([1, 2], ChannelType.FRONTEND, False)
+        assert fs.get_channels_field(ChannelType.FRONTEND, ChanInfoField.SPKOPTS)[:3] == [0, 0, 1]
+        assert fs.get_channels_field(ChannelType.FRONTEND, ChanInfoField.BANK)[31:33] == [1, 2]
+        assert fs.get_channels_field(ChannelType.FRONTEND, ChanInfoField.TERM)[31:33] == [32, 1]
+        assert fs.get_matching_channel_ids(ChannelType.ANALOG_IN) == []
+        assert fs.get_channel_label(7) == "chan7" and fs.get_channel_label(41) is None
+
+    def test_packet_loss_leaves_gaps(self):
+        fs = FakeSession(n_channels=2, packet_loss=0.3, seed=1)
+        batches = _collect(fs)
+        for k in range(1, 201):
+            fs._step(30 * k)
+        assert 0 < fs.stats["lost_batches"] < 200
+        assert len(batches) == fs.stats["batches"] == 200 - fs.stats["lost_batches"]
+        ticks = -(-np.concatenate([ts for _, ts in batches]).astype(np.int64) * 30000 // 1_000_000_000)
+        assert len(ticks) == 30 * len(batches)
+        np.testing.assert_array_equal(np.concatenate([s for s, _ in batches]), fake_samples(ticks, [1, 2]))
+
+    def test_clock_drift(self):
+        fs = FakeSession(drift_ppm=500, start_ns=7_000)
+        fs._host0_ns = 2_000_000_000
+        assert fs._device_tick(3_000_000_000) == 30015  # 1 s of host time
+        assert fs.device_to_monotonic(7_000 + 1_000_500_000) == pytest.approx(3.0)
+        # Per-stream monotonicity, as pycbsdk's stream_id clamp.
+        assert fs.device_to_monotonic_batch([2_000_000_000, 1_000_000_000], stream_id=0)[1] == pytest.approx(
+            fs.device_to_monotonic(2_000_000_000)
+        )
+
+    def test_spike_events(self):
+        fs = FakeSession(n_channels=4, spike_rate=200.0, noise_fraction=0.25, seed=3)
+        events = []
+        fs.on_event(ChannelType.FRONTEND)(lambda header, data: events.append((header, data)))
+        fs._step(30000)
+        assert len(events) == fs.stats["spikes"] == pytest.approx(800, rel=0.15)
+        times = [h.time for h, _ in events]
+        assert times == sorted(times) and times[-1] < 1_000_000_000
+        assert {h.chid for h, _ in events} == {1, 2, 3, 4}
+        assert {h.type for h, _ in events} <= {0, 1, 2, 3, 4, 5, 255}
+        assert 0.15 < np.mean([h.type == 255 for h, _ in events]) < 0.35
+        header, data = events[0]
+        wave = np.frombuffer(_ffi.buffer(data, 16 + 2 * fs.spike_length), np.int16, fs.spike_length, 16)
+        assert wave.argmin() == fs.spike_pretrigger
+
+    async def test_lifecycle(self):
+        fs = FakeSession(n_channels=1)
+        with pytest.raises(RuntimeError, match="not open"):
+            fs.sync()
+        batches = _collect(fs)
+        with fs:
+            await fs.wait_until_running()
+            fs.sync()
+            await asyncio.sleep(0.05)
+        n = len(batches)
+        assert n > 0 and not fs.running
+        await asyncio.sleep(0.02)
+        assert len(batches) == n
+
+    async def test_reentry_restarts_the_run(self):
+        fs = FakeSession(n_channels=1)
+        with fs:
+            await fs.wait_until_running()
+            await asyncio.sleep(0.1)
+            fs.device_to_monotonic_batch([fs.start_ns + 10_000_000_000], stream_id=0)  # floor 10 s in
+        first_batches = fs.stats["batches"]
+        with fs:
+            await fs.wait_until_running()
+            await asyncio.sleep(0.01)
+            # Not clamped to the previous run's floor.
+            now = fs.device_to_monotonic_batch([fs.start_ns + 1_000_000], stream_id=0)[0]
+        assert now == pytest.approx(fs._host0_ns / 1e9 + 0.001)
+        assert 0 < fs.stats["batches"] < first_batches
+
+    def test_fake_sessions_installs_the_factory(self):
+        before = sessions._session_factory
+        with fake_sessions(n_channels=3) as opened:
+            session = sessions._session_factory(DeviceType.HUB1)
+            assert opened == [session] and session.n_channels == 3 and session.device_type is DeviceType.HUB1
+        assert sessions._session_factory is before
+
+
+class TestProducersOnFake:
+    async def test_signal_stream_is_continuous(self):
+        with fake_sessions(n_channels=8, start_ns=1_000_000_000):
+            prod = CereLinkSignalProducer(
+                settings=CereLinkSignalSettings(
+                    device_type=DeviceType.NPLAY,
+                    subscribe_rate=SampleRate.SR_30kHz,
+                    configure=SliceConfig(),
+                    cbtime=True,
+                    microvolts=False,
+                )
+            )
+            try:
+                await prod._areset_state()
+                msgs = [await asyncio.wait_for(prod._produce(), timeout=1.0) for _ in range(20)]
+            finally:
+                prod.close()
+        data = np.concatenate([m.data for m in msgs])
+        first_tick = round((msgs[0].axes["time"].offset - 1.0) * 30000)
+        np.testing.assert_array_equal(data, fake_samples(np.arange(first_tick, first_tick + len(data)), range(1, 9)))
+        assert list(msgs[0].axes["ch"].data["label"]) == [f"chan{i}" for i in range(1, 9)]
+
+    async def test_spike_windows(self):
+        with fake_sessions(n_channels=16, spike_rate=100.0) as opened:
+            prod = CereLinkSpikeProducer(
+                settings=CereLinkSpikeSettings(
+                    device_type=DeviceType.NPLAY,
+                    configure=SliceConfig(),
+                    spike_buffer_dur=0.05,
+                    clock_rate=SampleRate.SR_30kHz,
+                )
+            )
+            try:
+                await prod._areset_state()
+                msgs = [await asyncio.wait_for(prod._produce(), timeout=1.0) for _ in range(4)]
+            finally:
+                prod.close()
+        assert opened[0].stats["spikes"] > 0
+        assert all(m.data.shape == (1500, 16, 7) for m in msgs)
+        assert sum(int(m.data.sum()) for m in msgs) > 0
+
+    async def test_1024_channels_at_30khz(self):
+        with fake_sessions(n_channels=1024):
+            prod = CereLinkSignalProducer(
+                settings=CereLinkSignalSettings(
+                    device_type=DeviceType.NPLAY,
+                    subscribe_rate=SampleRate.SR_30kHz,
+                    configure=SliceConfig(),
+                    cbtime=True,
+                    microvolts=False,
+                    stats_interval=10.0,
+                )
+            )
+            try:
+                await prod._areset_state()
+                t0 = time.monotonic()
+                msgs = []
+                while time.monotonic() - t0 < 0.5:
+                    msgs.append(await asyncio.wait_for(prod._produce(), timeout=1.0))
+                overruns = prod.state.ring.overruns
+            finally:
+                prod.close()
+        offsets = np.array([m.axes["time"].offset for m in msgs])
+        lengths = np.array([len(m.data) for m in msgs])
+        assert msgs[0].data.shape[1] == 1024 and overruns == 0
+        # Back to back: each message starts where the previous one ended.
+        np.testing.assert_allclose(np.diff(offsets), lengths[:-1] / 30000, atol=1e-6)
+        assert lengths.sum() > 0.3 * 30000
@@ -0,0 +1,101 @@
+"""Unit tests for CereLinkMultiRateProducer: several sample groups on one mock
+Session, each served by its own stream producer."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from conftest import open_on_mock
+from pycbsdk import SampleRate
+
+from ezmsg.blackrock.cerelink import (
+    CcfConfig,
+    CereLinkMultiRateProducer,
+    CereLinkMultiRateSettings,
+    CereLinkMultiRateSource,
+    CereLinkSignalSettings,
+    SliceConfig,
+)
+
+SCALING = {"digmin": -32764, "digmax": 32764, "anamin": -8191, "anamax": 8191, "anaunit": "uV"}
+GROUPS = {int(SampleRate.SR_1kHz): [1, 2], int(SampleRate.SR_RAW): [1, 2, 3, 4]}
+
+
+def _multirate_producer(cbtime: bool = True, **kwargs) -> tuple[CereLinkMultiRateProducer, MagicMock, dict]:
+    """Producer opened on a mock Session (as ``_open_and_configure`` would);
+    returns it with the Session and the ``on_group_batch`` callback per rate."""
+    sess = MagicMock()
+    sess.get_group_channels.side_effect = lambda g: GROUPS.get(g, [])
+    sess.get_channel_scaling.return_value = SCALING
+    sess.get_channel_label.side_effect = lambda ch_id: f"chan{ch_id}"
+    streams = (
+        CereLinkSignalSettings(subscribe_rate=SampleRate.SR_1kHz, cbtime=cbtime, microvolts=False),
+        CereLinkSignalSettings(subscribe_rate=SampleRate.SR_RAW, cbtime=cbtime, configure=SliceConfig(channels=[1, 2])),
+    )
+    prod = CereLinkMultiRateProducer(settings=CereLinkMultiRateSettings(streams=streams, **kwargs))
+    open_on_mock(prod, sess)
+    rates = [c.args[0] for c in sess.on_group_batch.call_args_list]
+    callbacks = [c.args[0] for c in sess.on_group_batch.return_value.call_args_list]
+    return prod, sess, dict(zip(rates, callbacks))
+
+
+def _batch(n: int, n_ch: int, period_ns: int, start: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    samples = np.tile(np.arange(n, dtype=np.int16)[:, None], (1, n_ch))
+    return samples, (np.arange(start, start + n, dtype=np.uint64) + 1) * period_ns
+
+
+async def test_streams_share_one_session_and_route_by_rate():
+    prod, sess, cbs = _multirate_producer()
+    assert set(cbs) == {SampleRate.SR_1kHz, SampleRate.SR_RAW}
+    sess.set_sample_group.assert_called_once()  # only the RAW stream carries a SliceConfig
+    streams = prod.state.streams
+    assert all(child.state.session is sess for child in streams.values())
+    assert streams[SampleRate.SR_1kHz].state.ring is not streams[SampleRate.SR_RAW].state.ring
+
+    cbs[SampleRate.SR_RAW](*_batch(30, 4, 33_333))
+    rate, msg = await asyncio.wait_for(prod._produce(), timeout=1.0)
+    assert rate is SampleRate.SR_RAW and msg.data.shape == (30, 4) and msg.key == "SR_RAW"
+
+    cbs[SampleRate.SR_1kHz](*_batch(3, 2, 1_000_000))
+    rate, msg = await asyncio.wait_for(prod._produce(), timeout=1.0)
+    assert rate is SampleRate.SR_1kHz and msg.data.dtype == np.int16
+    assert msg.axes["time"].gain == pytest.approx(1e-3)
+
+
+async def test_streams_behind_each_other_share_the_clock_without_resyncs():
+    prod, sess, cbs = _multirate_producer(cbtime=False)
+    sess.device_to_monotonic_batch.side_effect = lambda ns, sid=-1: [500.0 + d * 1e-9 for d in ns]
+    model = prod.state.clock
+    model.refresh_interval = 0.0  # every conversion refreshes the fit
+    for k in range(5):
+        # The RAW stream runs ahead; each 1 kHz message then ends before the
+        # newest sync point the RAW stream added.
+        cbs[SampleRate.SR_RAW](*_batch(900, 4, 33_333, start=900 * k))
+        cbs[SampleRate.SR_1kHz](*_batch(30, 2, 1_000_000, start=30 * k))
+        got = dict([await asyncio.wait_for(prod._produce(), timeout=1.0) for _ in range(2)])
+        assert got[SampleRate.SR_RAW].axes["time"].offset == pytest.approx(500.0 + (900 * k + 1) * 33_333e-9)
+        assert got[SampleRate.SR_1kHz].axes["time"].offset == pytest.approx(500.0 + (30 * k + 1) * 1e-3)
+    assert model.resyncs == 0 and len(model._points) == 5
+
+
+async def test_ccf_applied_once_and_teardown_cancels_streams():
+    prod, sess, cbs = _multirate_producer(configure=CcfConfig(path="x.ccf"))
+    sess.load_ccf_sync.assert_called_once_with("x.ccf")
+    pending = asyncio.ensure_future(prod._produce())
+    await asyncio.sleep(0.01)
+    prod._on_teardown_pre_close()
+    assert prod.state.streams is None
+    assert await asyncio.wait_for(pending, timeout=1.0) is None
+
+
+def test_duplicate_rates_rejected():
+    stream = CereLinkSignalSettings(subscribe_rate=SampleRate.SR_RAW)
+    with pytest.raises(ValueError, match="repeat a subscribe_rate"):
+        CereLinkMultiRateSettings(streams=(stream, stream))
+
+
+def test_source_publishes_per_rate_outputs_only():
+    unit = CereLinkMultiRateSource(CereLinkMultiRateSettings())
+    assert "OUTPUT_SIGNAL" not in unit.streams
+    assert {"OUTPUT_SR_1kHz", "OUTPUT_SR_RAW", "INPUT_SETTINGS"} <= set(unit.streams)
@@ -0,0 +1,305 @@
+"""Unit tests for the file-backed replay sources, on small synthetic
+recordings written in the Blackrock formats."""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+import sparse
+from pycbsdk import SampleRate
+
+from ezmsg.blackrock.cerelink import OutputDType, SpikeFormat
+from ezmsg.blackrock.channel_map import CHANNEL_DTYPE
+from ezmsg.blackrock.replay import (
+    _NEV_BASIC_HEADER,
+    _NEV_EXT_HEADER,
+    _NEV_LABEL_INFO,
+    _NEV_WAVEFORM_INFO,
+    _NSX_BASIC_HEADER,
+    _NSX_EXT_HEADER,
+    NevFile,
+    NevReplayProducer,
+    NevReplaySettings,
+    NsxFile,
+    NsxReplayProducer,
+    NsxReplaySettings,
+    ReplayPacing,
+)
+
+N_CH = 3
+
+
+def _write_nsx(path, packets, period=1, spec="2.3"):
+    """*packets*: list of (timestamp, int16 [n, N_CH]); spec "3.0" writes
+    nanosecond timestamps."""
+    n_ch = packets[0][1].shape[1]
+    basic = np.zeros(1, _NSX_BASIC_HEADER)
+    basic["file_type"] = b"BRSMPGRP" if spec == "3.0" else b"NEURALCD"
+    basic["major"], basic["minor"] = map(int, spec.split("."))
+    basic["header_bytes"] = _NSX_BASIC_HEADER.itemsize + n_ch * _NSX_EXT_HEADER.itemsize
+    basic["label"] = b"test"
+    basic["period"] = period
+    basic["resolution"] = 1_000_000_000 if spec == "3.0" else 30000
+    basic["channel_count"] = n_ch
+    ext = np.zeros(n_ch, _NSX_EXT_HEADER)
+    ext["type"] = b"CC"
+    ext["electrode_id"] = np.arange(1, n_ch + 1)
+    ext["label"] = [f"elec{i + 1}".encode() for i in range(n_ch)]
+    ext["connector"] = 2
+    ext["pin"] = np.arange(1, n_ch + 1)
+    ext["min_digital"], ext["max_digital"] = -32764, 32764
+    ext["min_analog"], ext["max_analog"] = -8191, 8191
+    ext["units"] = b"uV"
+    ts_type = "<u8" if spec == "3.0" else "<u4"
+    with open(path, "wb") as f:
+        f.write(basic.tobytes() + ext.tobytes())
+        for ts, samples in packets:
+            header = np.zeros(1, [("header", "u1"), ("timestamp", ts_type), ("n_samples", "<u4")])
+            header["header"], header["timestamp"], header["n_samples"] = 1, ts, len(samples)
+            f.write(header.tobytes() + samples.astype("<i2").tobytes())
+    return path
+
+
+def _samples(start, n):
+    return (np.arange(start, start + n)[:, None] * 10 + np.arange(N_CH)).astype(np.int16)
+
+
+def _write_nev(path, packets, spec="2.3", electrodes=(1, 2, 3)):
+    """*packets*: list of (timestamp, packet_id, unit); spec "3.0" writes
+    nanosecond timestamps."""
+    ts_type = "<u8" if spec == "3.0" else "<u4"
+    packet_bytes = np.dtype(ts_type).itemsize + 4 + 96  # 48 int16 waveform samples
+    wav = np.zeros(len(electrodes), _NEV_WAVEFORM_INFO)
+    wav["electrode_id"] = electrodes
+    wav["connector"] = 1
+    wav["pin"] = electrodes
+    wav["bytes_per_sample"] = 2
+    lbl = np.zeros(1, _NEV_LABEL_INFO)
+    lbl["electrode_id"], lbl["label"] = electrodes[0], b"first"
+    ext = np.zeros(len(electrodes) + 1, _NEV_EXT_HEADER)
+    ext["id"] = [b"NEUEVWAV"] * len(electrodes) + [b"NEUEVLBL"]
+    ext["body"] = np.concatenate([wav.view("V24"), lbl.view("V24")])
+    basic = np.zeros(1, _NEV_BASIC_HEADER)
+    basic["file_type"] = b"BREVENTS" if spec == "3.0" else b"NEURALEV"
+    basic["major"], basic["minor"] = map(int, spec.split("."))
+    basic["header_bytes"] = _NEV_BASIC_HEADER.itemsize + ext.nbytes
+    basic["packet_bytes"] = packet_bytes
+    basic["resolution"] = 1_000_000_000 if spec == "3.0" else 30000
+    basic["sample_resolution"] = 30000
+    basic["n_ext_headers"] = len(ext)
+    data = np.zeros(len(packets), [("timestamp", ts_type), ("packet_id", "<u2"), ("unit", "u1"), ("pad", f"V{97}")])
+    if packets:
+        data["timestamp"], data["packet_id"], data["unit"] = zip(*packets)
+    with open(path, "wb") as f:
+        f.write(basic.tobytes() + ext.tobytes() + data.tobytes())
+    return path
+
+
+async def _drain(prod, n):
+    return [await asyncio.wait_for(prod._produce(), timeout=1.0) for _ in range(n)]
+
+
+def _densify(data) -> np.ndarray:
+    return data.todense() if isinstance(data, sparse.COO) else data
+
+
+class TestNsxFile:
+    def test_packets_become_segments(self, tmp_path):
+        path = _write_nsx(tmp_path / "rec.ns5", [(100, _samples(0, 50)), (1000, _samples(50, 20))])
+        nsx = NsxFile(path)
+        assert nsx.sample_rate is SampleRate.SR_30kHz and nsx.n_samples == 70
+        assert [len(seg.samples) for seg in nsx.segments] == [50, 20]
+        np.testing.assert_array_equal(nsx.segments[1].samples, _samples(50, 20))
+        assert nsx.sample_ticks(nsx.segments[1], 0, 20) == (1000, 1019)
+
+    def test_packet_per_sample_is_one_strided_view(self, tmp_path):
+        packets = [(1_000_000 + i * 33_333, _samples(i, 1)) for i in range(40)]
+        nsx = NsxFile(_write_nsx(tmp_path / "rec.ns6", packets, spec="3.0"))
+        assert nsx.sample_rate is SampleRate.SR_RAW
+        (seg,) = nsx.segments
+        np.testing.assert_array_equal(seg.samples, _samples(0, 40))
+        assert nsx.sample_ticks(seg, 2, 5) == (1_066_666, 1_133_332)
+
+    def test_truncated_final_packet(self, tmp_path):
+        path = _write_nsx(tmp_path / "rec.ns2", [(0, _samples(0, 10))], period=30)
+        with open(path, "r+b") as f:
+            f.truncate(path.stat().st_size - 2 * N_CH - 1)
+        nsx = NsxFile(path)
+        assert nsx.sample_rate is SampleRate.SR_1kHz and nsx.n_samples == 8
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "rec.ns5"
+        path.write_bytes(b"NEURALSG" + bytes(400))
+        with pytest.raises(ValueError, match="unsupported"):
+            NsxFile(path)
+
+
+class TestNsxReplay:
+    def _producer(self, path, **kwargs):
+        kwargs.setdefault("pacing", ReplayPacing.FAST)
+        prod = NsxReplayProducer(settings=NsxReplaySettings(path=str(path), **kwargs))
+        prod._reset_state()
+        return prod
+
+    async def test_signal_contract(self, tmp_path):
+        path = _write_nsx(tmp_path / "rec.ns5", [(300, _samples(0, 50)), (3000, _samples(50, 20))])
+        prod = self._producer(path, chunk_dur=1e-3, cbtime=True)  # 30 samples
+        msgs = await _drain(prod, 3)
+        assert [len(m.data) for m in msgs] == [30, 20, 20]  # never across packets
+        assert prod.finished
+        first = msgs[0]
+        assert first.dims == ["time", "ch"] and first.key == "SR_30kHz"
+        assert first.attrs == {"unit": "uV", "manufacturer": "CereLink", "device": "rec.ns5"}
+        assert first.axes["ch"].data.dtype == CHANNEL_DTYPE
+        assert list(first.axes["ch"].data["label"]) == ["elec1", "elec2", "elec3"]
+        assert set(first.axes["ch"].data["bank"]) == {"B"}
+        np.testing.assert_allclose(first.data, _samples(0, 30) * 0.25)  # 8191 uV / 32764 counts
+        assert first.axes["time"].gain == pytest.approx(1 / 30000)
+        assert first.axes["time"].offset == pytest.approx(300 / 30000)
+        assert msgs[2].axes["time"].offset == pytest.approx(3000 / 30000)
+
+    async def test_raw_chunks_are_views_of_the_file(self, tmp_path):
+        packets = [(i * 33_333, _samples(i, 1)) for i in range(40)]
+        prod = self._producer(_write_nsx(tmp_path / "rec.ns6", packets, spec="3.0"), chunk_dur=1e-3, microvolts=False)
+        first, second = await _drain(prod, 2)
+        assert first.key == "SR_RAW" and first.attrs["unit"] == "raw"
+        assert first.data.dtype == np.int16 and not first.data.flags.writeable
+        assert np.shares_memory(first.data, prod.state.file.segments[0].samples)
+        np.testing.assert_array_equal(second.data, _samples(30, 10))
+
+    async def test_output_dtype(self, tmp_path):
+        path = _write_nsx(tmp_path / "rec.ns5", [(0, _samples(0, 30))])
+        (msg,) = await _drain(self._producer(path, output_dtype=OutputDType.FLOAT32), 1)
+        assert msg.data.dtype == np.float32
+        np.testing.assert_allclose(msg.data, _samples(0, 30) * 0.25, rtol=1e-6)
+
+    async def test_realtime_pacing(self, tmp_path):
+        path = _write_nsx(tmp_path / "rec.ns5", [(0, _samples(0, 1500))])
+        prod = self._producer(path, pacing=ReplayPacing.REALTIME, chunk_dur=0.01)  # 5 x 10 ms
+        t0 = time.monotonic()
+        msgs = await _drain(prod, 5)
+        assert time.monotonic() - t0 == pytest.approx(0.04, abs=0.02)  # the first is released at once
+        # The host timeline starts at the first release and follows the recording.
+        offsets = np.array([m.axes["time"].offset for m in msgs])
+        np.testing.assert_allclose(np.diff(offsets), 0.01, atol=1e-9)
+        assert t0 - 0.01 < offsets[0] < t0 + 0.01
+
+    async def test_idle_without_a_path(self):
+        prod = NsxReplayProducer(settings=NsxReplaySettings())
+        prod._reset_state()
+        assert await prod._produce() is None
+
+
+# 1 ms windows = 30 ticks at 30 kHz; window 0 starts at the first spike (tick 1000).
+NEV_PACKETS = [
+    (900, 0, 0),  # digital input before the first spike
+    (1000, 1, 0),
+    (1005, 2, 1),
+    (1005, 2, 1),
+    (1010, 3, 9),  # > 5 collapses into the noise bucket
+    (1012, 7, 0),  # electrode without a waveform header
+    (1020, 0xFFFF, 0),  # comment
+    (1029, 1, 2),
+    (1030, 2, 255),  # window 1
+    (1095, 3, 5),  # window 3 (window 2 is empty)
+]
+
+
+class TestNevFile:
+    def test_headers_and_packets(self, tmp_path):
+        nev = NevFile(_write_nev(tmp_path / "rec.nev", NEV_PACKETS))
+        assert list(nev.electrodes["electrode_id"]) == [1, 2, 3]
+        assert nev.labels == {1: "first"}
+        assert len(nev.packets) == len(NEV_PACKETS)
+        assert list(nev.packets["packet_id"][:3]) == [0, 1, 2]
+        assert nev.first_spike() == 1
+        assert nev.to_ns(30000) == 1_000_000_000
+
+    def test_spec_30_timestamps(self, tmp_path):
+        packets = [(ts * 33_333, pid, unit) for ts, pid, unit in NEV_PACKETS]
+        nev = NevFile(_write_nev(tmp_path / "rec.nev", packets, spec="3.0"))
+        assert nev.packets["timestamp"].dtype == np.dtype("<u8")
+        assert nev.to_ns(1234) == 1234
+
+    def test_rejects_other_files(self, tmp_path):
+        path = _write_nsx(tmp_path / "rec.ns5", [(0, _samples(0, 3))])
+        with pytest.raises(ValueError, match="unsupported NEV"):
+            NevFile(path)
+
+
+class TestNevReplay:
+    def _producer(self, path, **kwargs):
+        kwargs.setdefault("pacing", ReplayPacing.FAST)
+        kwargs.setdefault("spike_buffer_dur", 1e-3)
+        prod = NevReplayProducer(settings=NevReplaySettings(path=str(path), **kwargs))
+        prod._reset_state()
+        return prod
+
+    async def test_dense_windows(self, tmp_path):
+        prod = self._producer(_write_nev(tmp_path / "rec.nev", NEV_PACKETS), cbtime=True)
+        msgs = await _drain(prod, 4)
+        assert prod.finished
+        first = msgs[0]
+        assert first.dims == ["time", "ch", "unit"] and first.key == "SPIKES"
+        assert first.data.shape == (30, 3, 7) and first.data.dtype == np.uint8
+        assert first.attrs == {"unit": "count", "manufacturer": "CereLink", "device": "rec.nev"}
+        assert first.axes["ch"].data.dtype == CHANNEL_DTYPE
+        assert list(first.axes["ch"].data["label"]) == ["first", "ch2", "ch3"]
+        assert list(first.axes["ch"].data["bank"]) == ["A"] * 3
+        expected = np.zeros((30, 3, 7), np.uint8)
+        expected[0, 0, 0] = 1
+        expected[5, 1, 1] = 2
+        expected[10, 2, 6] = 1
+        expected[29, 0, 2] = 1
+        np.testing.assert_array_equal(first.data, expected)
+        assert msgs[1].data.sum() == 1 and msgs[1].data[0, 1, 6] == 1
+        assert msgs[2].data.sum() == 0
+        assert msgs[3].data[5, 2, 5] == 1
+        assert [m.axes["time"].offset for m in msgs] == pytest.approx([(1000 + 30 * w) / 30000 for w in range(4)])
+        assert first.axes["time"].gain == pytest.approx(1 / 30000)
+
+    async def test_sparse_matches_dense(self, tmp_path):
+        path = _write_nev(tmp_path / "rec.nev", NEV_PACKETS)
+        dense = await _drain(self._producer(path), 4)
+        sparse_msgs = await _drain(self._producer(path, output_format=SpikeFormat.SPARSE), 4)
+        for d, s in zip(dense, sparse_msgs):
+            assert isinstance(s.data, sparse.COO)
+            np.testing.assert_array_equal(s.data.todense(), d.data)
+
+    async def test_binned_and_grouped(self, tmp_path):
+        path = _write_nev(tmp_path / "rec.nev", NEV_PACKETS)
+        prod = self._producer(path, bin_width=1e-3 / 3, unit_groups=((0,), (1, 2, 3, 4, 5)))  # 10-tick bins
+        (msg,) = await _drain(prod, 1)
+        assert msg.data.shape == (3, 3, 2) and msg.data.dtype == np.uint16
+        assert list(msg.axes["unit"].data) == ["unsorted", "1+2+3+4+5"]
+        assert msg.axes["time"].gain == pytest.approx(1 / 3000)
+        np.testing.assert_array_equal(msg.data[:, :, 0].sum(axis=1), [1, 0, 0])
+        np.testing.assert_array_equal(msg.data[:, :, 1].sum(axis=1), [2, 0, 1])  # noise dropped
+
+    async def test_realtime_pacing(self, tmp_path):
+        packets = [(1000 + 300 * i, 1, 0) for i in range(4)]
+        prod = self._producer(
+            _write_nev(tmp_path / "paced.nev", packets), pacing=ReplayPacing.REALTIME, spike_buffer_dur=0.01
+        )
+        t0 = time.monotonic()
+        msgs = await _drain(prod, 4)
+        assert time.monotonic() - t0 == pytest.approx(0.04, abs=0.02)  # each window at its end
+        offsets = np.array([m.axes["time"].offset for m in msgs])
+        np.testing.assert_allclose(np.diff(offsets), 0.01, atol=1e-9)
+        assert [m.data.sum() for m in msgs] == [1, 1, 1, 1]
+
+    async def test_packet_before_the_window_is_dropped(self, tmp_path):
+        packets = [(1000, 1, 0), (1031, 2, 0), (1025, 3, 0)]  # the last is out of order: before window 1
+        for output_format in SpikeFormat:
+            msgs = await _drain(
+                self._producer(_write_nev(tmp_path / "rec.nev", packets), output_format=output_format), 2
+            )
+            assert "dropped_spikes" not in msgs[0].attrs and _densify(msgs[0].data)[0, 0, 0] == 1
+            assert msgs[1].attrs["dropped_spikes"] == 1
+            assert _densify(msgs[1].data).sum() == 1 and _densify(msgs[1].data)[1, 1, 0] == 1
+
+    async def test_no_spikes_is_idle(self, tmp_path):
+        prod = self._producer(_write_nev(tmp_path / "rec.nev", [(10, 0, 0)]))
+        assert prod.finished
+        assert await prod._produce() is None
@@ -0,0 +1,135 @@
+"""Unit tests for the process-wide Session registry, with pycbsdk's Session
+replaced by a recording fake (no hardware)."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from pycbsdk import ChannelType, DeviceType, SampleRate
+
+from ezmsg.blackrock import sessions
+from ezmsg.blackrock.sessions import acquire_session, active_sessions
+
+
+class _FakeSession:
+    instances: list["_FakeSession"] = []
+    fail_open = False
+
+    def __init__(self, device_type):
+        self.device_type = device_type
+        self.closed = False
+        self.syncs = 0
+        self.batch_callbacks: dict[int, list] = {}
+        self.event_callbacks: dict = {}
+        _FakeSession.instances.append(self)
+
+    def __enter__(self):
+        if _FakeSession.fail_open:
+            raise RuntimeError("no device")
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+    async def wait_until_running(self, timeout=10.0):
+        await asyncio.sleep(0.01)
+
+    def sync(self, timeout=5.0):
+        self.syncs += 1
+        time.sleep(0.05)
+
+    def on_group_batch(self, rate):
+        return lambda fn: self.batch_callbacks.setdefault(int(rate), []).append(fn)
+
+    def on_event(self, channel_type):
+        return lambda fn: self.event_callbacks.setdefault(channel_type, []).append(fn)
+
+    def get_group_channels(self, group):
+        return [1, 2, 3]
+
+
+@pytest.fixture(autouse=True)
+def fake_session(monkeypatch):
+    _FakeSession.instances = []
+    _FakeSession.fail_open = False
+    monkeypatch.setattr(sessions, "Session", _FakeSession)
+    yield
+    assert active_sessions() == {}
+
+
+async def test_one_session_per_device_closed_with_last_lease():
+    a, b = await asyncio.gather(acquire_session(DeviceType.NPLAY), acquire_session(DeviceType.NPLAY))
+    assert len(_FakeSession.instances) == 1
+    assert a.session is b.session
+    assert active_sessions() == {DeviceType.NPLAY: 2}
+    assert a.get_group_channels(6) == [1, 2, 3]  # falls through to the Session
+    a.close()
+    a.close()  # idempotent
+    assert not b.session.closed
+    session = b.session
+    b.close()
+    assert session.closed
+    assert active_sessions() == {}
+
+
+async def test_callbacks_fan_out_and_stop_on_release():
+    a = await acquire_session(DeviceType.NPLAY)
+    b = await acquire_session(DeviceType.NPLAY)
+    got_a, got_b = [], []
+    a.on_group_batch(SampleRate.SR_RAW)(lambda s, t: got_a.append(s))
+    b.on_group_batch(SampleRate.SR_RAW)(lambda s, t: got_b.append(s))
+    b.on_event(ChannelType.FRONTEND)(lambda h, d: None)
+    (dispatch,) = a.session.batch_callbacks[int(SampleRate.SR_RAW)]  # one library registration
+    dispatch("x", None)
+    a.close()
+    dispatch("y", None)
+    assert got_a == ["x"] and got_b == ["x", "y"]
+    b.close()
+
+
+async def test_concurrent_syncs_coalesce():
+    lease = await acquire_session(DeviceType.NPLAY)
+    threads = [threading.Thread(target=lease.sync) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # The first caller's sync, then (at most) one more for everyone who queued behind it.
+    assert 1 <= lease.session.syncs <= 2
+    lease.close()
+
+
+async def test_failed_open_propagates_and_unregisters():
+    _FakeSession.fail_open = True
+    with pytest.raises(RuntimeError, match="no device"):
+        await acquire_session(DeviceType.HUB1)
+    assert _FakeSession.instances[0].closed
+
+
+async def test_cancelled_waiter_returns_its_reference():
+    opener = asyncio.ensure_future(acquire_session(DeviceType.NPLAY))
+    await asyncio.sleep(0)  # registered, still opening
+    waiter = asyncio.ensure_future(acquire_session(DeviceType.NPLAY))
+    await asyncio.sleep(0)
+    assert active_sessions() == {DeviceType.NPLAY: 2}
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    lease = await opener
+    assert active_sessions() == {DeviceType.NPLAY: 1}
+    session = lease.session
+    lease.close()
+    assert session.closed
+
+
+async def test_waiter_on_a_failed_open_returns_its_reference():
+    _FakeSession.fail_open = True
+    opener = asyncio.ensure_future(acquire_session(DeviceType.NPLAY))
+    await asyncio.sleep(0)
+    shared = sessions._registry[DeviceType.NPLAY]
+    with pytest.raises(RuntimeError, match="Failed to open"):
+        await acquire_session(DeviceType.NPLAY)
+    with pytest.raises(RuntimeError, match="no device"):
+        await opener
+    assert shared.refs == 1  # only the opener's, dropped with the registry entry
@@ -3,6 +3,7 @@
 import pickle
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
 from pycbsdk import ChannelType, SampleRate
 
@@ -13,6 +14,7 @@ from ezmsg.blackrock.cerelink import (
     CereLinkSpikeProducer,
     CereLinkSpikeSettings,
     ChannelSelection,
+    OutputDType,
     SliceConfig,
 )
 
@@ -46,6 +48,16 @@ class TestSignalSettings:
         assert s.microvolts is True
         assert s.cont_buffer_dur == pytest.approx(0.5)
         assert s.cmp_configs == ()
+        assert s.output_dtype is None
+
+    def test_output_dtype_resolution(self):
+        assert CereLinkSignalSettings().sample_dtype == np.float64
+        assert CereLinkSignalSettings(microvolts=False).sample_dtype == np.int16
+        assert CereLinkSignalSettings(output_dtype=OutputDType.FLOAT32).sample_dtype == np.float32
+
+    def test_int16_with_microvolts_rejected(self):
+        with pytest.raises(ValueError, match="raw device counts"):
+            CereLinkSignalSettings(output_dtype=OutputDType.INT16, microvolts=True)
 
 
 class TestSpikeSettings:
@@ -0,0 +1,481 @@
+"""Unit tests for the CereLinkSignalProducer data path, driven through a mock
+pycbsdk Session (no hardware): batches are pushed into the registered
+``on_group_batch`` callback and messages are pulled with ``_produce``."""
+
+import asyncio
+import dataclasses
+import gc
+import time
+import typing
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from conftest import open_on_mock
+from pycbsdk import SampleRate
+
+from ezmsg.blackrock import clock
+from ezmsg.blackrock.cerelink import (
+    BufferOverrunError,
+    CereLinkSignalProducer,
+    CereLinkSignalSettings,
+    ChunkPolicy,
+    GapPolicy,
+    OutputDType,
+    OverflowPolicy,
+)
+
+PERIOD_NS = 1_000_000_000 // 30_000
+SCALING = {"digmin": -32764, "digmax": 32764, "anamin": -8191, "anamax": 8191, "anaunit": "uV"}
+
+
+def _signal_producer(n_ch: int = 4, loop=None, **kwargs) -> tuple[CereLinkSignalProducer, typing.Callable]:
+    """Producer with a mock Session already subscribed; returns it together
+    with the ``on_group_batch`` callback pycbsdk would invoke."""
+    sess = MagicMock()
+    sess.get_group_channels.return_value = list(range(1, n_ch + 1))
+    sess.get_channel_scaling.return_value = SCALING
+    sess.get_channel_label.side_effect = lambda ch_id: f"chan{ch_id}"
+    kwargs.setdefault("cbtime", True)
+    prod = CereLinkSignalProducer(
+        settings=CereLinkSignalSettings(subscribe_rate=SampleRate.SR_30kHz, cont_buffer_dur=0.01, **kwargs)
+    )
+    open_on_mock(prod, sess, loop)
+    callback = sess.on_group_batch.return_value.call_args.args[0]
+    return prod, callback
+
+
+def _batch(start: int, n: int, n_ch: int = 4) -> tuple[np.ndarray, np.ndarray]:
+    samples = (np.arange(start, start + n, dtype=np.int16)[:, None] * np.ones(n_ch, dtype=np.int16)).astype(np.int16)
+    timestamps = (np.arange(start, start + n, dtype=np.uint64) + 1) * PERIOD_NS
+    return samples, timestamps
+
+
+async def _drain(prod: CereLinkSignalProducer, n_messages: int) -> list:
+    return [await asyncio.wait_for(prod._produce(), timeout=1.0) for _ in range(n_messages)]
+
+
+class TestCopyMode:
+    async def test_emits_scaled_copy(self):
+        prod, cb = _signal_producer()
+        cb(*_batch(0, 30))
+        (msg,) = await _drain(prod, 1)
+        assert msg.data.shape == (30, 4)
+        np.testing.assert_allclose(msg.data[:, 0], np.arange(30) * (2 * 8191) / (2 * 32764))
+        assert msg.axes["time"].offset == pytest.approx(PERIOD_NS / 1e9)
+        assert msg.data.flags.writeable
+
+    async def test_monotonic_time_from_clock_model(self):
+        prod, cb = _signal_producer(cbtime=False)
+        sess = prod.state.session
+        sess.device_to_monotonic_batch.side_effect = lambda ns, sid=-1: [500.0 + d * 1e-9 for d in ns]
+        for k in range(3):
+            cb(*_batch(k * 30, 30))
+            (msg,) = await _drain(prod, 1)
+            assert msg.axes["time"].offset == pytest.approx(500.0 + (k * 30 + 1) * PERIOD_NS * 1e-9)
+        assert sess.device_to_monotonic_batch.call_count == 1  # one sync point, then O(1) evaluation
+
+    async def test_rate_correction_tiles_and_tracks_drift(self, monkeypatch):
+        monkeypatch.setattr(clock.time, "monotonic", lambda: 0.0)  # a single clock-model sync point
+        drift = 50e-6
+        prod, cb = _signal_producer(cbtime=False, rate_correction=True, max_rate_slew=1e-3)
+        sess = prod.state.session
+        sess.device_to_monotonic_batch.side_effect = lambda ns, sid=-1: [500.0 + (1 + drift) * d * 1e-9 for d in ns]
+        prod.state.clock._drift = drift  # as fitted
+        prev_end = None
+        for k in range(5):
+            cb(*_batch(k * 30, 30))
+            (msg,) = await _drain(prod, 1)
+            ax = msg.axes["time"]
+            # Within the slew bound of the drift-corrected period...
+            assert ax.gain == pytest.approx((1 + drift) / 30_000, rel=1e-3)
+            # ...and bent toward the device timestamps (whose period is truncated to 33333 ns).
+            assert ax.offset + 30 * ax.gain == pytest.approx(500.0 + (1 + drift) * (k * 30 + 31) * PERIOD_NS * 1e-9)
+            if prev_end is not None:
+                assert ax.offset == pytest.approx(prev_end, abs=1e-12)
+            prev_end = ax.offset + 30 * ax.gain
+
+    @pytest.mark.parametrize(
+        "output_dtype, microvolts, expected",
+        [
+            (None, True, np.float64),
+            (None, False, np.int16),
+            (OutputDType.FLOAT32, True, np.float32),
+            (OutputDType.FLOAT32, False, np.float32),
+            (OutputDType.INT16, False, np.int16),
+        ],
+    )
+    async def test_output_dtype(self, output_dtype, microvolts, expected):
+        prod, cb = _signal_producer(output_dtype=output_dtype, microvolts=microvolts)
+        assert prod.state.ring.columns()[0].dtype == expected  # converted on the receive thread
+        cb(*_batch(0, 12))
+        (msg,) = await _drain(prod, 1)
+        assert msg.data.dtype == expected
+        sf = prod.state.scale_factors[3] if microvolts else 1.0
+        np.testing.assert_allclose(msg.data[:, 3], np.arange(12) * sf, rtol=1e-6)
+
+    async def test_wrapped_batch_scaled_on_both_sides(self):
+        prod, cb = _signal_producer(output_dtype=OutputDType.FLOAT32)
+        buff_len = prod.state.ring.capacity
+        cb(*_batch(0, buff_len - 5))
+        await _drain(prod, 1)
+        cb(*_batch(buff_len - 5, 10))
+        tail, head = await _drain(prod, 2)
+        got = np.concatenate([tail.data[:, 0], head.data[:, 0]])
+        np.testing.assert_allclose(got, np.arange(buff_len - 5, buff_len + 5) * prod.state.scale_factors[0], rtol=1e-6)
+
+    async def test_contiguous_reads_emit_wrap_as_one_message(self):
+        prod, cb = _signal_producer(microvolts=False, contiguous_reads=True)
+        buff_len = prod.state.ring.capacity
+        cb(*_batch(0, buff_len - 5))
+        await _drain(prod, 1)
+        cb(*_batch(buff_len - 5, 10))
+        (msg,) = await _drain(prod, 1)
+        np.testing.assert_array_equal(msg.data[:, 0], np.arange(buff_len - 5, buff_len + 5, dtype=np.int16))
+        assert msg.axes["time"].offset == pytest.approx((buff_len - 4) * PERIOD_NS / 1e9)
+
+
+class TestOverflow:
+    """The writer laps the reader when ``_produce`` stalls for longer than
+    ``cont_buffer_dur`` (300 samples here)."""
+
+    async def test_drop_oldest_marks_and_counts(self):
+        prod, cb = _signal_producer(microvolts=False)
+        reports = []
+        prod.set_overrun_callback(reports.append)
+        cap = prod.state.ring.capacity
+        cb(*_batch(0, 200))
+        cb(*_batch(200, 150))  # 50 oldest unread samples must go
+        (msg,) = await _drain(prod, 1)
+        assert msg.attrs["dropped_samples"] == 350 - cap
+        assert int(msg.data[0, 0]) == 350 - cap
+        assert msg.axes["time"].offset == pytest.approx((350 - cap + 1) * PERIOD_NS / 1e9)
+        rest = await _drain(prod, 1)
+        assert "dropped_samples" not in rest[0].attrs
+        assert int(rest[0].data[-1, 0]) == 349
+        assert prod.state.overruns == 1
+        assert len(reports) == 1
+        assert reports[0].dropped_samples == 350 - cap
+        assert reports[0].policy is OverflowPolicy.DROP_OLDEST
+
+    async def test_drop_oldest_batch_larger_than_ring(self):
+        prod, cb = _signal_producer(microvolts=False)
+        cap = prod.state.ring.capacity
+        cb(*_batch(0, 10))
+        cb(*_batch(10, cap + 50))
+        msgs = await _drain(prod, 1)
+        if msgs[0].data.shape[0] < cap:
+            msgs += await _drain(prod, 1)
+        got = np.concatenate([m.data[:, 0] for m in msgs])
+        np.testing.assert_array_equal(got, np.arange(60, cap + 60, dtype=np.int16))
+        assert prod.state.dropped_samples == 60
+
+    async def test_grow_keeps_everything(self):
+        prod, cb = _signal_producer(microvolts=False, overflow_policy=OverflowPolicy.GROW)
+        buff_len = prod.state.ring.capacity
+        for k in range(4):
+            cb(*_batch(k * 100, 100))
+        assert prod.state.ring.capacity >= 2 * buff_len
+        msgs = await _drain(prod, 1)
+        np.testing.assert_array_equal(msgs[0].data[:, 0], np.arange(400, dtype=np.int16))
+        assert prod.state.overruns == 1
+        assert prod.state.dropped_samples == 0
+
+    async def test_error_raises_from_produce(self):
+        prod, cb = _signal_producer(overflow_policy=OverflowPolicy.ERROR)
+        cb(*_batch(0, 200))
+        cb(*_batch(200, 200))
+        with pytest.raises(BufferOverrunError, match="ring overrun"):
+            await prod._produce()
+
+    def test_grow_rejected_with_zero_copy(self):
+        with pytest.raises(ValueError, match="not supported with zero_copy"):
+            CereLinkSignalSettings(zero_copy=True, overflow_policy=OverflowPolicy.GROW)
+
+
+class TestChunking:
+    async def test_min_samples_waits_then_emits_all(self):
+        prod, cb = _signal_producer(microvolts=False, chunking=ChunkPolicy(min_samples=50))
+        cb(*_batch(0, 30))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(prod._produce(), timeout=0.05)
+        cb(*_batch(30, 30))
+        (msg,) = await _drain(prod, 1)
+        np.testing.assert_array_equal(msg.data[:, 0], np.arange(60, dtype=np.int16))
+
+    async def test_max_latency_flushes_partial_chunk(self):
+        prod, cb = _signal_producer(microvolts=False, chunking=ChunkPolicy(min_samples=200, max_latency=0.02))
+        cb(*_batch(0, 30))
+        (msg,) = await _drain(prod, 1)
+        assert msg.data.shape[0] == 30
+
+    @pytest.mark.parametrize("zero_copy", [False, True])
+    async def test_fixed_blocks_carry_remainder(self, zero_copy):
+        prod, cb = _signal_producer(microvolts=False, zero_copy=zero_copy, chunking=ChunkPolicy(fixed_samples=40))
+        for k in range(3):
+            cb(*_batch(k * 30, 30))
+        msgs = await _drain(prod, 2)
+        assert [m.data.shape[0] for m in msgs] == [40, 40]
+        cb(*_batch(90, 30))
+        msgs += await _drain(prod, 1)
+        got = np.concatenate([m.data[:, 0] for m in msgs])
+        np.testing.assert_array_equal(got, np.arange(120, dtype=np.int16))
+        assert msgs[-1].axes["time"].offset == pytest.approx(81 * PERIOD_NS / 1e9)
+
+    def test_fixed_exclusive(self):
+        with pytest.raises(ValueError, match="cannot be combined"):
+            ChunkPolicy(fixed_samples=10, min_samples=5)
+
+    def test_block_larger_than_buffer_rejected(self):
+        with pytest.raises(ValueError, match="exceeds"):
+            _signal_producer(chunking=ChunkPolicy(fixed_samples=1000))
+
+    async def test_live_update_larger_than_buffer_rejected(self):
+        # ``chunking`` is a non-reset field, so the subscription's own check
+        # never sees a live change; the settings reject it instead.
+        prod, cb = _signal_producer(microvolts=False)
+        prod.update_settings(dataclasses.replace(prod.settings, chunking=ChunkPolicy(fixed_samples=40)))
+        with pytest.raises(ValueError, match="exceeds the 300-sample buffer"):
+            prod.update_settings(dataclasses.replace(prod.settings, chunking=ChunkPolicy(fixed_samples=301)))
+        assert prod.settings.chunking.fixed_samples == 40
+        cb(*_batch(0, 45))
+        (msg,) = await _drain(prod, 1)
+        assert msg.data.shape[0] == 40
+
+
+class TestGaps:
+    async def test_regular_stream_has_no_annotation(self):
+        prod, cb = _signal_producer(microvolts=False)
+        cb(*_batch(0, 30))
+        cb(*_batch(30, 30))
+        msgs = await _drain(prod, 1)
+        assert "discontinuities" not in msgs[0].attrs
+        assert prod.state.discontinuities == 0
+
+    async def test_annotate_marks_gap_rows_and_counts(self):
+        prod, cb = _signal_producer(microvolts=False)
+        cb(*_batch(0, 30))
+        await _drain(prod, 1)
+        samples, ts = _batch(40, 30)  # 10 samples lost between messages
+        ts[20:] += 7 * PERIOD_NS  # and 7 more inside this batch
+        cb(samples, ts)
+        (msg,) = await _drain(prod, 1)
+        np.testing.assert_array_equal(msg.attrs["discontinuities"], [0, 20])
+        assert msg.attrs["discontinuity_count"] == 2
+        assert prod.state.missing_samples == 17
+
+    async def test_split_ends_message_at_gap(self):
+        prod, cb = _signal_producer(microvolts=False, gap_policy=GapPolicy.SPLIT)
+        samples, ts = _batch(0, 30)
+        ts[12:] += 100 * PERIOD_NS
+        cb(samples, ts)
+        first, second = await _drain(prod, 2)
+        assert first.data.shape[0] == 12 and "discontinuities" not in first.attrs
+        assert second.data.shape[0] == 18
+        np.testing.assert_array_equal(second.attrs["discontinuities"], [0])
+        assert second.axes["time"].offset == pytest.approx(int(ts[12]) / 1e9)
+
+    async def test_clock_reset_detected(self):
+        prod, cb = _signal_producer(microvolts=False)
+        cb(*_batch(1000, 30))
+        await _drain(prod, 1)
+        cb(*_batch(0, 30))
+        (msg,) = await _drain(prod, 1)
+        np.testing.assert_array_equal(msg.attrs["discontinuities"], [0])
+        assert prod.state.missing_samples == 0
+
+
+class TestZeroCopy:
+    async def test_views_share_pool_memory(self):
+        prod, cb = _signal_producer(zero_copy=True, microvolts=False)
+        cb(*_batch(0, 30))
+        (msg,) = await _drain(prod, 1)
+        assert msg.data.dtype == np.int16
+        assert not msg.data.flags.writeable
+        assert msg.data.base is prod.state.pool.data[prod.state.pool_slot]
+        np.testing.assert_array_equal(msg.data[:, 1], np.arange(30))
+
+    async def test_scaled_once_in_callback(self):
+        prod, cb = _signal_producer(zero_copy=True, microvolts=True)
+        cb(*_batch(0, 10))
+        (msg,) = await _drain(prod, 1)
+        assert msg.data.dtype == np.float64
+        np.testing.assert_allclose(msg.data[:, 2], np.arange(10) * prod.state.scale_factors[2])
+
+    async def test_slot_recycled_only_after_release(self):
+        prod, cb = _signal_producer(zero_copy=True, microvolts=False)
+        capacity = prod.state.pool.capacity  # 300 samples at 30 kHz x 0.01 s
+        n_slots = len(prod.state.pool)
+        held = []
+        for k in range(n_slots + 1):
+            cb(*_batch(k * capacity, capacity))
+            held.extend(await _drain(prod, 1))
+        # Every slot still has a live view downstream, so the pool had to grow.
+        assert len(prod.state.pool) > n_slots
+        for i, msg in enumerate(held):
+            np.testing.assert_array_equal(msg.data[:, 0], np.arange(i * capacity, (i + 1) * capacity, dtype=np.int16))
+
+        held.clear()
+        gc.collect()
+        n_before = len(prod.state.pool)
+        cb(*_batch(0, capacity))
+        await _drain(prod, 1)
+        assert len(prod.state.pool) == n_before
+
+    async def test_unread_rows_carried_to_next_slot(self):
+        prod, cb = _signal_producer(zero_copy=True, microvolts=False)
+        capacity = prod.state.pool.capacity
+        cb(*_batch(0, capacity - 10))
+        first = (await _drain(prod, 1))[0]
+        cb(*_batch(capacity - 10, 5))
+        cb(*_batch(capacity - 5, 20))  # overflows the slot before _produce runs
+        (msg,) = await _drain(prod, 1)
+        np.testing.assert_array_equal(msg.data[:, 0], np.arange(capacity - 10, capacity + 15, dtype=np.int16))
+        assert msg.data.base is not first.data.base
+
+    async def test_lag_beyond_a_slot_drops_oldest(self):
+        prod, cb = _signal_producer(zero_copy=True, microvolts=False)
+        capacity = prod.state.pool.capacity
+        cb(*_batch(0, capacity - 10))
+        cb(*_batch(capacity - 10, 20))
+        (msg,) = await _drain(prod, 1)
+        np.testing.assert_array_equal(msg.data[:, 0], np.arange(10, capacity + 10, dtype=np.int16))
+        assert msg.attrs["dropped_samples"] == 10
+        assert prod.state.overruns == 1
+
+
+class TestWakeups:
+    async def test_one_wakeup_in_flight(self):
+        prod, _ = _signal_producer()
+        loop = MagicMock()
+        loop.is_running.return_value = True
+        for start in range(0, 50, 10):
+            prod._handle_group_batch(*_batch(start, 10), loop)
+        assert loop.call_soon_threadsafe.call_count == 1
+        prod.state.data_event.set()  # what the scheduled callback does
+        (msg,) = await _drain(prod, 1)  # the consumer re-arms the wake-up
+        assert msg.data.shape[0] == 50
+        prod._handle_group_batch(*_batch(50, 10), loop)
+        assert loop.call_soon_threadsafe.call_count == 2
+
+
+class TestAssemblyQueue:
+    async def test_worker_builds_the_same_messages(self):
+        ref, ref_cb = _signal_producer(cbtime=False)
+        prod, cb = _signal_producer(cbtime=False, assembly_queue=4)
+        for p in (ref, prod):
+            p.state.session.device_to_monotonic_batch.side_effect = lambda ns, sid=-1: [500.0 + d * 1e-9 for d in ns]
+        try:
+            for start in (0, 30, 60):
+                ref_cb(*_batch(start, 30))
+                expected = await asyncio.wait_for(ref._produce(), timeout=1.0)
+                cb(*_batch(start, 30))
+                got = await asyncio.wait_for(prod._produce(), timeout=1.0)
+                np.testing.assert_array_equal(got.data, expected.data)
+                assert got.axes["time"].offset == expected.axes["time"].offset
+        finally:
+            prod.close()
+        assert prod.state.worker is None
+
+    async def test_full_queue_backs_up_into_the_buffer(self):
+        prod, cb = _signal_producer(assembly_queue=1)
+        try:
+            for start in range(0, 90, 30):
+                cb(*_batch(start, 30))
+                await asyncio.sleep(0.02)  # let the worker take each batch separately
+            assert prod.queue_depth == 1  # one queued; the worker holds the next
+            msgs = await _drain(prod, 3)
+            got = np.concatenate([m.data[:, 0] for m in msgs])
+            np.testing.assert_allclose(got, np.arange(90) * (2 * 8191) / (2 * 32764))
+        finally:
+            prod.close()
+
+    async def test_buffer_error_surfaces_in_produce(self):
+        prod, cb = _signal_producer(assembly_queue=1, overflow_policy=OverflowPolicy.ERROR)
+        try:
+            cb(*_batch(0, 400))  # larger than the 300-sample ring
+            with pytest.raises(BufferOverrunError):
+                await _drain(prod, 1)
+        finally:
+            prod.close()
+
+    async def test_async_teardown_tolerates_late_batches(self):
+        prod, cb = _signal_producer(assembly_queue=1)
+        worker = prod.state.worker
+        cb(*_batch(0, 30))
+        await prod._teardown_state()
+        assert prod.state.worker is None and not worker.is_alive()
+        cb(*_batch(30, 30))  # the receive thread may still deliver until unsubscribed
+
+
+class TestLatencyStats:
+    @pytest.mark.parametrize("assembly_queue", [0, 2])
+    async def test_reports_every_stage(self, assembly_queue):
+        prod, cb = _signal_producer(cbtime=False, latency_stats=1e-6, assembly_queue=assembly_queue)
+        reports = []
+        prod.set_latency_callback(reports.append)
+        host0 = time.monotonic()
+        # The last sample sent was timestamped 5 ms before the test started.
+        prod.state.session.device_to_monotonic_batch.side_effect = lambda ns, sid=-1: [
+            host0 - 0.005 + (d - 60 * PERIOD_NS) * 1e-9 for d in ns
+        ]
+        try:
+            for start in (0, 30):
+                cb(*_batch(start, 30))
+                await _drain(prod, 1)
+        finally:
+            prod.close()
+        stages = reports[-1].stages
+        assert reports[-1].stream == "SR_30kHz"
+        assert set(stages) == {
+            "device_to_callback",
+            "callback_to_commit",
+            "commit_to_wake",
+            "wake_to_publish",
+            "device_to_publish",
+        }
+        assert 0.005 <= stages["device_to_publish"].max < 0.5
+        assert stages["callback_to_commit"].p99 < stages["device_to_publish"].max
+
+    async def test_off_by_default(self):
+        prod, cb = _signal_producer()
+        prod.set_latency_callback(lambda report: pytest.fail("no latency_stats"))
+        cb(*_batch(0, 30))
+        await _drain(prod, 1)
+        assert prod.state.latency is None
+
+
+class TestSourceStats:
+    async def test_counts_over_a_period(self):
+        loop = MagicMock()
+        prod, cb = _signal_producer(stats_interval=1.0, loop=loop)
+        assert loop.call_later.call_args.args[0] == 1.0
+        reports = []
+        prod.set_stats_callback(reports.append)
+        prod.state.stats_since -= 2.0  # pretend the period was 2 s long
+        for start in (0, 30, 60):
+            cb(*_batch(start, 30))
+        await _drain(prod, 1)
+        cb(*_batch(90, 20))
+        await _drain(prod, 1)
+        cb(*_batch(110, 15))  # received, not yet emitted
+        prod._emit_stats(loop)
+        (report,) = reports
+        assert report.stream == "SR_30kHz"
+        assert report.received_rate == pytest.approx(125 / 2, rel=0.05)
+        assert report.callback_rate == pytest.approx(5 / 2, rel=0.05)
+        assert (report.messages, report.mean_chunk, report.max_chunk) == (2, 55.0, 90)
+        assert report.buffer_fill == pytest.approx(15 / 300)
+        assert report.overruns == report.dropped == report.queue_depth == 0
+        assert not report.clock_synced
+        assert loop.call_later.call_count == 2  # the next report is scheduled
+
+        prod._emit_stats(loop)
+        assert reports[-1].messages == 0 and reports[-1].max_chunk == 0
+
+    def test_timer_cancelled_on_close(self):
+        prod, _ = _signal_producer(stats_interval=1.0, loop=MagicMock())
+        timer = prod.state.stats_timer
+        prod.close()
+        timer.cancel.assert_called_once()
+        assert prod.state.stats_timer is None
@@ -0,0 +1,310 @@
+"""Unit tests for the CereLinkSpikeProducer data path, driven through a mock
+pycbsdk Session (no hardware): spike headers are pushed into the registered
+``on_event`` callback and windows are pulled with ``_produce``."""
+
+import asyncio
+import time
+import typing
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import cffi
+import numpy as np
+import pytest
+import sparse
+from conftest import open_on_mock
+from pycbsdk import SampleRate
+
+from ezmsg.blackrock.buffers import EventBuffer
+from ezmsg.blackrock.cerelink import CereLinkSpikeProducer, CereLinkSpikeSettings, SpikeFormat
+
+ORIGIN_NS = 1_000_000_000
+_ffi = cffi.FFI()
+
+
+def _spike_producer(n_ch: int = 4, **kwargs) -> tuple[CereLinkSpikeProducer, typing.Callable]:
+    """Producer with a mock Session already subscribed; returns it together
+    with a ``spike(sample, chid, unit)`` helper that invokes the ``on_event``
+    callback with a header ``sample`` spike-clock ticks after ``ORIGIN_NS``."""
+    sess = MagicMock()
+    sess.get_matching_channel_ids.return_value = list(range(1, n_ch + 1))
+    sess.get_channel_label.side_effect = lambda ch_id: f"chan{ch_id}"
+    sess.device_to_monotonic_batch.side_effect = RuntimeError("no sync")
+    sess.spike_length = 48
+    sess.spike_pretrigger = 10
+    sess.get_channel_scaling.side_effect = lambda ch_id: dict(
+        digmin=-32768, digmax=32767, anamin=-32768 * ch_id, anamax=32767 * ch_id, anaunit="uV"
+    )
+    kwargs.setdefault("cbtime", True)
+    kwargs.setdefault("spike_buffer_dur", 0.01)  # 300 samples
+    prod = CereLinkSpikeProducer(settings=CereLinkSpikeSettings(**kwargs))
+    open_on_mock(prod, sess)
+    callback = sess.on_event.return_value.call_args.args[0]
+
+    def spike(sample: int, chid: int, unit: int = 0, wave: np.ndarray | None = None) -> None:
+        elapsed_ns = -(-sample * 1_000_000_000 // 30_000)  # ceil: lands exactly on the sample
+        header = SimpleNamespace(time=ORIGIN_NS + elapsed_ns, chid=chid, type=unit)
+        payload = _ffi.new("uint8_t[1008]")
+        if wave is not None:
+            _ffi.memmove(payload + 16, wave.astype(np.int16).tobytes(), 2 * len(wave))
+        callback(header, payload)
+
+    return prod, spike
+
+
+async def _next_window(prod: CereLinkSpikeProducer):
+    return await asyncio.wait_for(prod._produce(), timeout=1.0)
+
+
+def _densify(data) -> np.ndarray:
+    return data.todense() if isinstance(data, sparse.COO) else data
+
+
+class TestFormats:
+    async def test_dense_window(self):
+        prod, spike = _spike_producer()
+        spike(0, 1, 0)
+        spike(10, 3, 2)
+        spike(10, 3, 2)
+        spike(20, 2, 9)  # >5 collapses into the noise bucket
+        msg = await _next_window(prod)
+        assert msg.data.shape == (300, 4, 7) and msg.data.dtype == np.uint8
+        assert msg.data[10, 2, 2] == 2 and msg.data[20, 1, 6] == 1 and msg.data.sum() == 4
+        assert msg.axes["time"].offset == ORIGIN_NS / 1e9
+
+    async def test_sparse_matches_dense(self):
+        dense_prod, dense_spike = _spike_producer()
+        sparse_prod, sparse_spike = _spike_producer(output_format=SpikeFormat.SPARSE)
+        for sample, chid, unit in [(0, 1, 0), (10, 3, 2), (10, 3, 2), (299, 4, 1)]:
+            dense_spike(sample, chid, unit)
+            sparse_spike(sample, chid, unit)
+        dense_msg, sparse_msg = await asyncio.gather(_next_window(dense_prod), _next_window(sparse_prod))
+        assert isinstance(sparse_msg.data, sparse.COO)
+        assert sparse_msg.data.nnz == 3
+        np.testing.assert_array_equal(sparse_msg.data.todense(), dense_msg.data)
+        assert all(isinstance(w, EventBuffer) for w in sparse_prod.state.windows)  # no dense tensor allocated
+
+    async def test_sparse_empty_window(self):
+        prod, spike = _spike_producer(output_format=SpikeFormat.SPARSE)
+        spike(0, 1)
+        await _next_window(prod)
+        msg = await _next_window(prod)
+        assert msg.data.shape == (300, 4, 7) and msg.data.nnz == 0
+
+
+class TestBinning:
+    async def test_bins_align_to_window_origin(self):
+        prod, spike = _spike_producer(bin_width=0.001)  # 30 samples per bin, 10 bins
+        for sample in (0, 29, 30, 299):
+            spike(sample, 1, 0)
+        msg = await _next_window(prod)
+        assert msg.data.shape == (10, 4, 7) and msg.data.dtype == np.uint16
+        np.testing.assert_array_equal(msg.data[:, 0, 0], [2, 1, 0, 0, 0, 0, 0, 0, 0, 1])
+        assert msg.axes["time"].gain == pytest.approx(0.001)
+        assert msg.axes["time"].offset == ORIGIN_NS / 1e9
+
+    async def test_unit_groups_collapse_and_drop(self):
+        prod, spike = _spike_producer(unit_groups=((0,), (1, 2, 3, 4, 5)))
+        for unit in (0, 1, 3, 5, 6, 9):
+            spike(0, 2, unit)
+        msg = await _next_window(prod)
+        assert list(msg.axes["unit"].data) == ["unsorted", "1+2+3+4+5"]
+        np.testing.assert_array_equal(msg.data[0, 1], [1, 3])
+        assert msg.data.sum() == 4  # noise dropped
+
+    async def test_sparse_binned_matches_dense(self):
+        kwargs = dict(bin_width=0.002, unit_groups=((0, 1, 2, 3, 4, 5),))
+        dense_prod, dense_spike = _spike_producer(**kwargs)
+        sparse_prod, sparse_spike = _spike_producer(output_format=SpikeFormat.SPARSE, **kwargs)
+        for sample, chid, unit in [(0, 1, 0), (10, 1, 2), (61, 3, 6), (299, 4, 1)]:
+            dense_spike(sample, chid, unit)
+            sparse_spike(sample, chid, unit)
+        dense_msg, sparse_msg = await asyncio.gather(_next_window(dense_prod), _next_window(sparse_prod))
+        assert sparse_msg.data.shape == (5, 4, 1)
+        np.testing.assert_array_equal(sparse_msg.data.todense(), dense_msg.data)
+        assert dense_msg.data[0, 0, 0] == 2
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            dict(max_latency=-1.0),
+            dict(spike_windows=0),
+            dict(bin_width=0.0),
+            dict(unit_groups=()),
+            dict(unit_groups=((0,), ())),
+            dict(unit_groups=((0, 1), (1,))),
+        ],
+    )
+    def test_invalid_settings(self, kwargs):
+        with pytest.raises(ValueError):
+            CereLinkSpikeSettings(**kwargs)
+
+
+class TestDoubleBuffer:
+    async def test_windows_do_not_share_storage(self):
+        for fmt in SpikeFormat:
+            prod, spike = _spike_producer(output_format=fmt)
+            spike(0, 1, 0)
+            first = await _next_window(prod)
+            spike(300, 1, 0)  # lands in the second window
+            spike(301, 2, 0)
+            second = await _next_window(prod)
+            third = await _next_window(prod)
+            assert _densify(first.data).sum() == 1 and _densify(first.data)[0, 0, 0] == 1
+            assert _densify(second.data).sum() == 2 and _densify(second.data)[0, 0, 0] == 1
+            assert _densify(third.data).sum() == 0
+
+
+class TestWindowRing:
+    async def test_spikes_ahead_land_in_later_windows(self):
+        prod, spike = _spike_producer()
+        spike(0, 1)
+        spike(450, 2)  # second window; the device clock is past the first
+        spike(650, 3)  # third window
+        first = await asyncio.wait_for(prod._produce(), timeout=0.005)  # no wall-clock wait
+        second = await asyncio.wait_for(prod._produce(), timeout=0.005)
+        assert first.data.sum() == 1 and second.data[150, 1, 0] == 1 and second.data.sum() == 1
+        third = await _next_window(prod)
+        assert third.data[50, 2, 0] == 1
+        assert "dropped_spikes" not in third.attrs
+        assert prod.state.late_spikes == prod.state.early_spikes == 0
+
+    async def test_drops_are_counted(self):
+        prod, spike = _spike_producer(spike_windows=2)
+        spike(0, 1)
+        spike(900, 1)  # window 3: beyond a two-window ring
+        assert (await _next_window(prod)).attrs["dropped_spikes"] == 1
+        spike(10, 1)  # window 0 was already emitted
+        assert (await _next_window(prod)).attrs["dropped_spikes"] == 1
+        assert prod.state.early_spikes == 1 and prod.state.late_spikes == 1
+        assert "dropped_spikes" not in (await _next_window(prod)).attrs
+
+    async def test_spike_before_the_window_is_dropped_not_wrapped(self):
+        for fmt in SpikeFormat:
+            prod, spike = _spike_producer(output_format=fmt)
+            spike(10, 1)  # anchors window 0
+            spike(5, 2)  # before the anchor: a negative row
+            spike(400, 3)  # closes window 0
+            first = await _next_window(prod)
+            assert first.attrs["dropped_spikes"] == 1
+            assert _densify(first.data).sum() == 1 and _densify(first.data)[0, 0, 0] == 1
+
+
+class TestEmission:
+    async def test_continuous_timestamps_close_windows(self):
+        prod, spike = _spike_producer(clock_rate=SampleRate.SR_1kHz)
+        on_batch = prod.state.session.on_group_batch.return_value.call_args.args[0]
+        spike(0, 1)
+        on_batch(np.zeros((1, 1), np.int16), np.array([ORIGIN_NS + 10_000_000], np.uint64))
+        msg = await asyncio.wait_for(prod._produce(), timeout=0.005)  # well inside max_latency
+        assert msg.data.sum() == 1
+
+    async def test_latency_bound_follows_clock_sync(self):
+        prod, spike = _spike_producer(spike_buffer_dur=0.005, max_latency=0.03)
+        t0 = time.monotonic()
+        # The device clock maps 0.2 s into the host future: after sync, windows
+        # wait for their mapped end rather than the wall-clock schedule.
+        sync = lambda ns, sid=-1: [t0 + 0.2 + (d - ORIGIN_NS) * 1e-9 for d in ns]  # noqa: E731
+        prod.state.session.device_to_monotonic_batch.side_effect = sync
+        spike(0, 1)
+        await _next_window(prod)  # first emission syncs the clock model
+        await _next_window(prod)
+        assert time.monotonic() - t0 >= 0.2 + 0.01 + 0.03 - 0.005
+
+
+class TestBatchedIngest:
+    async def test_many_spikes_match_reference(self):
+        rng = np.random.default_rng(0)
+        n = 1000  # several full stages
+        samples = np.sort(rng.integers(0, 600, n))
+        samples[0] = 0
+        chids = rng.integers(1, 6, n)  # chid 5 is not subscribed
+        units = rng.integers(0, 8, n)
+        expected = np.zeros((600, 4, 7), np.int64)
+        keep = chids <= 4
+        np.add.at(expected, (samples[keep], chids[keep] - 1, np.minimum(units[keep], 6)), 1)
+        for fmt in SpikeFormat:
+            prod, spike = _spike_producer(output_format=fmt)
+            for sample, chid, unit in zip(samples, chids, units):
+                spike(int(sample), int(chid), int(unit))
+            first, second = await _next_window(prod), await _next_window(prod)
+            got = np.concatenate([_densify(first.data), _densify(second.data)])
+            np.testing.assert_array_equal(got, expected)
+            assert prod.state.late_spikes == prod.state.early_spikes == 0
+
+
+class TestWaveforms:
+    async def test_snippets_follow_each_window(self):
+        prod, spike = _spike_producer(waveforms=True, unit_groups=((0, 1, 2, 3, 4, 5),))
+        emitted = []
+        prod.set_waveform_callback(emitted.append)
+        ramp = np.arange(48)
+        spike(0, 2, 1, wave=ramp)
+        spike(5, 3, 6, wave=ramp)  # noise: not in any unit group
+        spike(9, 4, 0, wave=-ramp)
+        await _next_window(prod)
+        await asyncio.sleep(0)  # emitted just after the count window
+        (msg,) = emitted
+        assert msg.dims == ["spike", "time"] and msg.data.shape == (2, 48) and msg.data.dtype == np.float32
+        np.testing.assert_allclose(msg.data[0], ramp * 2)  # channel 2: 2 uV per count
+        np.testing.assert_allclose(msg.data[1], -ramp * 4)
+        coords = msg.axes["spike"].data
+        np.testing.assert_array_equal(coords["ch"], [1, 3])
+        np.testing.assert_array_equal(coords["unit"], [0, 0])
+        assert coords["time"][0] == ORIGIN_NS / 1e9
+        assert msg.axes["time"].offset == -10 / 30_000
+
+        await _next_window(prod)
+        await asyncio.sleep(0)
+        assert len(emitted) == 1  # nothing captured, nothing emitted
+
+    async def test_raw_counts_and_drops(self):
+        prod, spike = _spike_producer(waveforms=True, microvolts=False, waveform_capacity=2)
+        emitted = []
+        prod.set_waveform_callback(emitted.append)
+        for i in range(3):
+            spike(i, 1, wave=np.full(48, i))
+        await _next_window(prod)
+        await asyncio.sleep(0)
+        (msg,) = emitted
+        assert msg.data.dtype == np.int16 and msg.attrs["unit"] == "count"
+        np.testing.assert_array_equal(msg.data[:, 0], [1, 2])
+        assert msg.attrs["dropped_waveforms"] == 1
+
+
+class TestLatencyStats:
+    async def test_reports_ingest_and_emission(self):
+        prod, spike = _spike_producer(latency_stats=1e-6)
+        reports = []
+        prod.set_latency_callback(reports.append)
+        t0 = time.monotonic()
+        sync = lambda ns, sid=-1: [t0 + (d - ORIGIN_NS) * 1e-9 for d in ns]  # noqa: E731
+        prod.state.session.device_to_monotonic_batch.side_effect = sync
+        spike(0, 1)
+        await _next_window(prod)  # syncs the clock model
+        spike(300, 2)
+        spike(600, 3)
+        await _next_window(prod)
+        stages = reports[-1].stages
+        assert reports[-1].stream == "SPIKES"
+        assert set(stages) == {"device_to_ingest", "window_end_to_publish"}
+
+
+class TestSourceStats:
+    async def test_spikes_per_window_and_drops(self):
+        prod, spike = _spike_producer(stats_interval=1.0)
+        reports = []
+        prod.set_stats_callback(reports.append)
+        for sample in (0, 10, 20, 300):
+            spike(sample, 1)
+        await _next_window(prod)
+        spike(700, 2)  # closes window 1
+        await _next_window(prod)
+        spike(100, 1)  # behind an emitted window; staged until ...
+        spike(950, 3)  # ... this one reaches window 2's end
+        prod._emit_stats(MagicMock())
+        (report,) = reports
+        assert report.stream == "SPIKES"
+        assert (report.messages, report.mean_chunk, report.max_chunk) == (2, 2.0, 3)
+        assert report.dropped == 1
+        assert report.buffer_fill == pytest.approx((950 - 600) / 300 / 4, rel=1e-4)
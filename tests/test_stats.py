@@ -0,0 +1,42 @@
+"""Unit tests for the latency histograms behind ``latency_stats``."""
+
+import numpy as np
+import pytest
+
+from ezmsg.blackrock.stats import LatencyHistogram, LatencyTracker
+
+
+def test_percentiles_within_bucket_precision():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(mean=13, sigma=1.5, size=20_000).astype(np.int64)  # ~0.5 ms, heavy tail
+    hist = LatencyHistogram()
+    for v in values:
+        hist.record(int(v))
+    assert hist.count == len(values) and hist.max == values.max()
+    for q in (50, 99, 99.9):
+        exact = np.percentile(values, q, method="inverted_cdf")
+        assert hist.percentile(q) == pytest.approx(exact, rel=2**-6)
+
+
+def test_small_values_are_exact_and_large_ones_saturate():
+    hist = LatencyHistogram(max_ns=1 << 20)
+    for v in (-5, 0, 1, 2, 3):
+        hist.record(v)
+    assert [hist.percentile(q) for q in (20, 40, 60, 80)] == [0, 0, 1, 2]
+    hist.record(1 << 30)
+    assert hist.percentile(100) == hist.max == 1 << 30
+    hist.reset()
+    assert hist.count == 0 and hist.percentile(50) == 0
+
+
+def test_tracker_reports_per_period():
+    tracker = LatencyTracker("SR_RAW", ("a", "b"), period=1.0)
+    tracker._started = 10.0
+    tracker.record("a", 2_000_000)
+    assert tracker.report(now=10.5) is None
+    report = tracker.report(now=11.25)
+    assert report.stream == "SR_RAW" and report.period == pytest.approx(1.25)
+    assert list(report.stages) == ["a"]  # nothing recorded for "b"
+    assert report.stages["a"].count == 1
+    assert report.stages["a"].p50 == pytest.approx(2e-3, rel=2**-6)
+    assert tracker.report(now=12.5).stages == {}  # histograms restart each period